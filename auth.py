@@ -1,17 +1,25 @@
 # auth.py
+import hmac
 import os
+import time
 from datetime import datetime, timedelta
 from typing import Dict, Optional
 
 import jwt
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from passlib.context import CryptContext
-from sqlalchemy.orm import Session
+from sqlalchemy import select, update
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session, make_transient_to_detached
 
-from database import get_db
+from database import get_db, student_session
 from modules.items.models import Student
 from modules.items.schema.schemas import Token
+from modules.items.services import hashing
+from modules.items.services.cache import TTLCache
+from modules.items.services.hashing import pwd_context  # noqa: F401 (re-export)
+from modules.items.services.ratelimit import TokenBucketLimiter
+from modules.items.services.versioning import current_data_version
 
 SECRET_KEY = os.getenv("JWT_SECRET_KEY", "change-me")
 ALGORITHM = "HS256"
@@ -20,20 +28,42 @@ ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "60")
 ADMIN_USERNAME = os.getenv("ADMIN_USERNAME", "admin")
 ADMIN_PASSWORD = os.getenv("ADMIN_PASSWORD", "admin123")
 
-pwd_context = CryptContext(
-    # pbkdf2_sha256 avoids bcrypt's 72-byte limit; bcrypt variants kept for backward compatibility if any
-    schemes=["pbkdf2_sha256", "bcrypt_sha256", "bcrypt"],
-    deprecated="auto",
-)
+# Cache token yang sudah diverifikasi dan student principal-nya supaya request
+# terautentikasi tidak perlu decode JWT + SELECT students setiap kali. Kunci
+# principal ikut versi data, jadi tulisan dari proses lain (import, worker lain)
+# yang menaikkan versi juga membuat nilai di principal kedaluwarsa.
+AUTH_CACHE_TTL_SECONDS = float(os.getenv("AUTH_CACHE_TTL", "60"))
+AUTH_TOKEN_CACHE_SIZE = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "10000"))
+AUTH_PRINCIPAL_CACHE_SIZE = int(os.getenv("AUTH_PRINCIPAL_CACHE_SIZE", "10000"))
+
+_token_cache = TTLCache(AUTH_TOKEN_CACHE_SIZE, AUTH_CACHE_TTL_SECONDS)
+_principal_cache = TTLCache(AUTH_PRINCIPAL_CACHE_SIZE, AUTH_CACHE_TTL_SECONDS)
+
+# Login: username yang tidak ada di-cache sebentar (kunci ikut versi data, jadi
+# student baru langsung bisa login), dan percobaan login dibatasi token bucket
+# per username dan per IP.
+AUTH_NEGATIVE_CACHE_TTL = float(os.getenv("AUTH_NEGATIVE_CACHE_TTL", "10"))
+AUTH_NEGATIVE_CACHE_SIZE = int(os.getenv("AUTH_NEGATIVE_CACHE_SIZE", "10000"))
+LOGIN_RATE_LIMIT_PER_USER = int(os.getenv("LOGIN_RATE_LIMIT_PER_USER", "10"))  # 0 = off
+LOGIN_RATE_LIMIT_PER_IP = int(os.getenv("LOGIN_RATE_LIMIT_PER_IP", "100"))  # 0 = off
+LOGIN_RATE_LIMIT_PERIOD = float(os.getenv("LOGIN_RATE_LIMIT_PERIOD", "60"))
+
+_missing_username_cache = TTLCache(AUTH_NEGATIVE_CACHE_SIZE, AUTH_NEGATIVE_CACHE_TTL)
+_user_login_limiter = TokenBucketLimiter(LOGIN_RATE_LIMIT_PER_USER, LOGIN_RATE_LIMIT_PERIOD)
+_ip_login_limiter = TokenBucketLimiter(LOGIN_RATE_LIMIT_PER_IP, LOGIN_RATE_LIMIT_PERIOD)
+# diverifikasi untuk username yang tidak ada, supaya waktunya sama dengan password salah
+DUMMY_PASSWORD_HASH = pwd_context.hash("dummy-password")
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 router = APIRouter(prefix="/auth", tags=["auth"])
 
+# hash/verify run in the bounded process pool (services/hashing.py); 429 when saturated
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return hashing.verify_and_update(plain_password, hashed_password)[0]
 
 def get_password_hash(password: str) -> str:
     # pbkdf2_sha256 handles long inputs without truncation
-    return pwd_context.hash(password)
+    return hashing.hash_password(password)
 
 def create_access_token(data: Dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
@@ -42,16 +72,42 @@ def create_access_token(data: Dict, expires_delta: Optional[timedelta] = None) -
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 def authenticate_admin(username: str, password: str) -> Optional[Dict]:
-    if username == ADMIN_USERNAME and password == ADMIN_PASSWORD:
+    # constant-time compare; both checked so a wrong username costs the same
+    username_ok = hmac.compare_digest(username.encode(), ADMIN_USERNAME.encode())
+    password_ok = hmac.compare_digest(password.encode(), ADMIN_PASSWORD.encode())
+    if username_ok and password_ok:
         return {"username": username, "role": "admin"}
     return None
 
-def authenticate_student(username: str, password: str, db: Session) -> Optional[Dict]:
-    student = db.query(Student).filter(Student.student_id == username).first()
-    if not student or not student.hashed_password:
-        return None
-    if not verify_password(password, student.hashed_password):
+def check_login_rate(username: str, client_host: Optional[str]) -> None:
+    """429 when this username or client IP has used up its login attempts."""
+    wait = _user_login_limiter.acquire(username.casefold())
+    if client_host:
+        wait = max(wait, _ip_login_limiter.acquire(client_host))
+    if wait > 0:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts, retry later",
+            headers={"Retry-After": str(int(wait) + 1)},
+        )
+
+def lookup_student_credentials(username: str, db: Session, version: Optional[int] = None) -> Optional[Row]:
+    """
+    ``(id, student_id, hashed_password)`` for a login, or None. Misses are
+    cached briefly per data ``version`` (read here unless the caller passes it).
+    """
+    missing_key = (current_data_version() if version is None else version, username)
+    if _missing_username_cache.get(missing_key):
         return None
+    with student_session(db, username) as shard_db:
+        student = shard_db.execute(
+            select(Student.id, Student.student_id, Student.hashed_password).where(Student.student_id == username)
+        ).first()
+    if student is None:
+        _missing_username_cache.set(missing_key, True)
+    return student
+
+def student_identity(username: str, student: Row) -> Dict:
     return {
         "username": username,
         "role": "student",
@@ -59,20 +115,78 @@ def authenticate_student(username: str, password: str, db: Session) -> Optional[
         "student_id": student.student_id,
     }
 
+def store_rehashed_password(db: Session, student_db_id: int, new_hash: str) -> None:
+    """Persist a hash upgraded on login (rounds/scheme changed); the principal cache is evicted."""
+    with student_session(db, id=student_db_id) as shard_db:
+        shard_db.execute(update(Student).where(Student.id == student_db_id).values(hashed_password=new_hash))
+        shard_db.commit()
+    invalidate_principal(student_db_id)
+
+def authenticate_student(username: str, password: str, db: Session) -> Optional[Dict]:
+    student = lookup_student_credentials(username, db)
+    if not student or not student.hashed_password:
+        hashing.verify_and_update(password, DUMMY_PASSWORD_HASH)
+        return None
+    valid, new_hash = hashing.verify_and_update(password, student.hashed_password)
+    if not valid:
+        return None
+    if new_hash:
+        store_rehashed_password(db, student.id, new_hash)
+    return student_identity(username, student)
+
 def authenticate_user(username: str, password: str, db: Session) -> Optional[Dict]:
     admin_user = authenticate_admin(username, password)
     if admin_user:
         return admin_user
     return authenticate_student(username, password, db)
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> Dict:
+def invalidate_principal(student_db_id: Optional[int] = None) -> None:
+    """Drop cached principals after a student row changes (all of them when id is None)."""
+    if student_db_id is None:
+        _principal_cache.clear()
+    else:
+        _principal_cache.pop((current_data_version(), student_db_id))
+
+def _decode_token(token: str) -> Dict:
+    payload = _token_cache.get(token)
+    if payload is None:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        exp = payload.get("exp")
+        ttl = exp - time.time() if exp is not None else None
+        _token_cache.set(token, payload, ttl)
+    return payload
+
+def _detached_copy(student: Student) -> Student:
+    copy = Student(**{attr.key: getattr(student, attr.key) for attr in Student.__mapper__.column_attrs})
+    make_transient_to_detached(copy)
+    return copy
+
+def _load_principal(db: Session, student_db_id: Optional[int]) -> Optional[Student]:
+    if student_db_id is None:
+        return None
+    key = (current_data_version(), student_db_id)
+    cached = _principal_cache.get(key)
+    if cached is not None:
+        # masukkan ke identity map session request ini tanpa SELECT;
+        # handler yang memanggil db.get(Student, id) memakai objek yang sama
+        return db.merge(cached, load=False)
+    with student_session(db, id=student_db_id) as shard_db:
+        student = shard_db.get(Student, student_db_id)
+        if student is None:
+            return None
+        cached = _detached_copy(student)
+    _principal_cache.set(key, cached)
+    # tanpa sharding: objek yang sama yang baru dimuat ke identity map db
+    return db.merge(cached, load=False)
+
+def resolve_current_user(token: str, db: Session) -> Dict:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = _decode_token(token)
         username: str = payload.get("sub")
         role: str = payload.get("role")
         student_db_id = payload.get("student_db_id")
@@ -91,13 +205,28 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
         return {"username": username, "role": "admin"}
 
     if role == "student":
-        student = db.query(Student).filter(Student.id == student_db_id).first()
+        student = _load_principal(db, student_db_id)
         if not student:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Student not found")
         return {"username": username, "role": "student", "student": student}
 
     raise credentials_exception
 
+def admin_from_token(token: Optional[str]) -> Optional[Dict]:
+    """Admin principal for a valid admin token, else None. Never raises, no DB access."""
+    if not token:
+        return None
+    try:
+        payload = _decode_token(token)
+    except jwt.InvalidTokenError:
+        return None
+    if payload.get("role") != "admin" or payload.get("sub") is None:
+        return None
+    return {"username": payload["sub"], "role": "admin"}
+
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> Dict:
+    return resolve_current_user(token, db)
+
 def get_current_admin(current_user: Dict = Depends(get_current_user)) -> Dict:
     if current_user.get("role") != "admin":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin privileges required")
@@ -108,9 +237,7 @@ def get_current_student(current_user: Dict = Depends(get_current_user)) -> Stude
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Student privileges required")
     return current_user["student"]
 
-@router.post("/login", response_model=Token)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = authenticate_user(form_data.username, form_data.password, db)
+def issue_token(user: Optional[Dict]) -> Dict:
     if not user:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Incorrect username or password")
 
@@ -124,6 +251,11 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
     )
     return {"access_token": access_token, "token_type": "bearer", "role": user["role"]}
 
+@router.post("/login", response_model=Token)
+def login(request: Request, form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+    check_login_rate(form_data.username, request.client.host if request.client else None)
+    return issue_token(authenticate_user(form_data.username, form_data.password, db))
+
 @router.get("/me")
 def read_me(current_user: Dict = Depends(get_current_user)):
     payload = {"username": current_user["username"], "role": current_user["role"]}
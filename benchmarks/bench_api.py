@@ -0,0 +1,360 @@
+# benchmarks/bench_api.py
+"""
+End-to-end API benchmark: synthetic student tables (``benchmarks.synthetic``,
+fitted to the Kaggle CSV) at several sizes, every students / participations /
+analytics / auth route driven through an in-process client, throughput and
+p50/p95/p99 latency per route, peak memory, results written as JSON and
+compared against a baseline run.
+
+    python -m benchmarks.bench_api                                   # 10k rows, SQLite
+    python -m benchmarks.bench_api --rows 10000 100000 1000000 --requests 30
+    python -m benchmarks.bench_api --out new.json --baseline old.json --threshold 0.25
+    python -m benchmarks.bench_api --database-url mysql+pymysql://root:pw@127.0.0.1/bench_db
+
+Each size is loaded once through the importer's batched upsert (summary,
+sketches, trigram index and data version maintained as in production) into
+``--data-dir/students_<rows>_seed<seed>.db`` and every run works on a fresh
+copy, so write routes never leak into the next run. ``--database-url`` points
+at a scratch database instead; it is DROPPED and reloaded on every run.
+
+Exit status is 1 when ``--baseline`` is given and a route's ``--metric``
+got slower by more than ``--threshold`` (and by at least ``--min-delta-ms``).
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Windows: no peak RSS
+    resource = None
+
+LOAD_CHUNK_SIZE = 5000
+BENCH_PASSWORD = "bench-password"
+
+
+# --- phase 1: load a synthetic table into DATABASE_URL (own process) ---
+def prepare(rows: int, seed: int) -> dict:
+    from sqlalchemy import func, select
+
+    from benchmarks.synthetic import fit, generate
+    from database import Base, SessionLocal, engine
+    from modules.items.migrations import run_migrations
+    from modules.items.models import Student
+
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    run_migrations(engine)
+
+    # imported after the reset: the importer creates tables/migrates at import time
+    from import_students import _chunk_to_rows
+    from modules.items.services.bulk import upsert_students
+
+    started = time.perf_counter()
+    with SessionLocal() as db:
+        for chunk in generate(fit(), rows, chunk_size=LOAD_CHUNK_SIZE, seed=seed):
+            upsert_students(db, _chunk_to_rows(chunk))
+            db.commit()
+        loaded = db.execute(select(func.count(Student.id))).scalar()
+    elapsed = time.perf_counter() - started
+    return {"rows": loaded, "load_seconds": elapsed, "load_rows_per_second": loaded / max(elapsed, 1e-9)}
+
+
+# --- phase 2: drive the API (own process) ---
+def _route_specs(sample_student_id: str, first_name: str, rows: int, counter):
+    """(name, method, path, request kwargs or fn(i) -> kwargs, role). Reads first, writes last."""
+    def bulk_body(i):
+        base = 1000 + (i * 100) % max(rows - 100, 1)
+        return {"json": [
+            {"student_id": f"S{base + j}", "study_hours_per_week": round(5 + (i + j) % 30 + 0.5, 1)} for j in range(100)
+        ]}
+
+    def new_student(i):
+        return {"json": {
+            "student_id": f"BENCH{next(counter):08d}", "first_name": "Bench", "last_name": "Runner",
+            "department": "CS", "midterm_score": 60.0, "final_score": 70.0, "participation_score": 55.0,
+        }}
+
+    sid = sample_student_id
+    return [
+        ("GET /students/", "GET", "/students/?limit=100", {}, "admin"),
+        ("GET /students/search", "GET", f"/students/search?q={first_name[:4].lower()}", {}, "admin"),
+        ("GET /students/id/{id}", "GET", "/students/id/1", {}, "admin"),
+        ("GET /students/{student_id}", "GET", f"/students/{sid}", {}, "admin"),
+        ("GET /participations/", "GET", "/participations/?limit=100", {}, "admin"),
+        ("GET /participations/very-good", "GET", "/participations/very-good?limit=100", {}, "admin"),
+        ("GET /participations/good", "GET", "/participations/good?limit=100", {}, "admin"),
+        ("GET /participations/average", "GET", "/participations/average?limit=100", {}, "admin"),
+        ("GET /participations/bad", "GET", "/participations/bad?limit=100", {}, "admin"),
+        ("GET /participations/overview", "GET", "/participations/overview", {}, "admin"),
+        ("GET /analytics/study-duration", "GET", "/analytics/study-duration", {}, "admin"),
+        ("GET /analytics/study-duration/{department}", "GET", "/analytics/study-duration/Mathematics?limit=100", {}, "admin"),
+        ("GET /analytics/study-duration/{department}/{student_name}", "GET",
+         f"/analytics/study-duration/Mathematics/{first_name.lower()}", {}, "admin"),
+        ("GET /analytics/activity-correlation/final-score", "GET", "/analytics/activity-correlation/final-score", {}, "admin"),
+        ("GET /analytics/low-activity", "GET", "/analytics/low-activity?limit=100", {}, "admin"),
+        ("GET /analytics/activity-trend", "GET", "/analytics/activity-trend", {}, "admin"),
+        ("GET /analytics/activity-trend/{student_id}", "GET", f"/analytics/activity-trend/{sid}", {}, "admin"),
+        ("GET /students/{student_id} (self)", "GET", f"/students/{sid}", {}, "student"),
+        ("GET /participations/me", "GET", "/participations/me", {}, "student"),
+        ("GET /analytics/final-grade/me", "GET", "/analytics/final-grade/me", {}, "student"),
+        ("GET /auth/me", "GET", "/auth/me", {}, "student"),
+        ("POST /auth/login (admin)", "POST", "/auth/login",
+         {"data": {"username": os.getenv("ADMIN_USERNAME", "admin"), "password": os.getenv("ADMIN_PASSWORD", "admin123")}}, None),
+        ("POST /auth/login (student)", "POST", "/auth/login", {"data": {"username": sid, "password": BENCH_PASSWORD}}, None),
+        ("POST /students/", "POST", "/students/", new_student, "admin"),
+        ("POST /students/bulk", "POST", "/students/bulk", bulk_body, "admin"),
+        ("POST /students/{student_id}/password", "POST", f"/students/{sid}/password",
+         {"json": {"password": BENCH_PASSWORD}}, "admin"),
+    ]
+
+
+def _measure_route(client, method, path, kwargs, headers, requests, max_seconds, warmup, concurrency):
+    def call(i):
+        extra = kwargs(i) if callable(kwargs) else kwargs
+        started = time.perf_counter()
+        response = client.request(method, path, headers=headers, **extra)
+        return time.perf_counter() - started, response.status_code
+
+    for i in range(warmup):
+        call(i)
+
+    latencies, statuses = [], []
+    lock = threading.Lock()
+    issued = iter(range(warmup, warmup + requests))
+    deadline = time.perf_counter() + max_seconds
+
+    def worker():
+        while time.perf_counter() < deadline:
+            with lock:
+                i = next(issued, None)
+            if i is None:
+                return
+            seconds, status = call(i)
+            with lock:
+                latencies.append(seconds)
+                statuses.append(status)
+
+    started = time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(concurrency) as pool:
+            for _ in range(concurrency):
+                pool.submit(worker)
+    else:
+        worker()
+    elapsed = time.perf_counter() - started
+
+    # one more call under tracemalloc: peak Python allocation of a single request
+    tracemalloc.start()
+    call(warmup + requests)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    ms = np.asarray(latencies) * 1000
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99]) if len(ms) else (None, None, None)
+    return {
+        "requests": len(latencies),
+        "errors": sum(1 for s in statuses if s >= 400),
+        "statuses": sorted(set(statuses)),
+        "throughput_rps": len(latencies) / elapsed if elapsed > 0 else None,
+        "mean_ms": float(ms.mean()) if len(ms) else None,
+        "p50_ms": float(p50) if p50 is not None else None,
+        "p95_ms": float(p95) if p95 is not None else None,
+        "p99_ms": float(p99) if p99 is not None else None,
+        "peak_alloc_kb": peak / 1024,
+    }
+
+
+def measure(rows: int, requests: int, max_seconds: float, warmup: int, concurrency: int, only) -> dict:
+    from itertools import count
+
+    from fastapi.testclient import TestClient
+
+    import main
+
+    results = {}
+    with TestClient(main.app) as client:
+        admin = client.post("/auth/login", data={
+            "username": os.getenv("ADMIN_USERNAME", "admin"), "password": os.getenv("ADMIN_PASSWORD", "admin123"),
+        }).json()["access_token"]
+        admin_headers = {"Authorization": f"Bearer {admin}"}
+        sample = client.get("/students/?limit=1", headers=admin_headers).json()[0]
+        client.post(f"/students/{sample['student_id']}/password", headers=admin_headers, json={"password": BENCH_PASSWORD})
+        student = client.post("/auth/login", data={"username": sample["student_id"], "password": BENCH_PASSWORD}).json()
+        headers = {"admin": admin_headers, "student": {"Authorization": f"Bearer {student['access_token']}"}, None: {}}
+
+        specs = _route_specs(sample["student_id"], sample.get("first_name") or "a", rows, count())
+        covered = {name.split(" (")[0] for name, *_ in specs}
+        routes = {
+            f"{method} {route.path}"
+            for route in main.app.routes
+            for method in getattr(route, "methods", ())
+            if route.path.startswith(("/students", "/participations", "/analytics", "/auth"))
+        }
+        for name, method, path, kwargs, role in specs:
+            if only and not any(o in name for o in only):
+                continue
+            results[name] = _measure_route(
+                client, method, path, kwargs, headers[role], requests, max_seconds, warmup, concurrency,
+            )
+            r = results[name]
+            print(f"  {name:<58} {r['throughput_rps']:>8.1f}/s  p50 {r['p50_ms']:>8.1f}  p95 {r['p95_ms']:>8.1f}"
+                  f"  p99 {r['p99_ms']:>8.1f} ms  peak {r['peak_alloc_kb']:>9.0f} kB  {r['statuses']}", flush=True)
+
+    peak_rss = None
+    if resource is not None:
+        peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    return {"endpoints": results, "peak_rss_mb": peak_rss, "uncovered_routes": sorted(routes - covered)}
+
+
+# --- parent: orchestrate sizes, write JSON, compare ---
+def _run_phase(phase: str, database_url: str, args, rows: int, env_extra=None) -> dict:
+    fd, out_path = tempfile.mkstemp(suffix=".json")
+    os.close(fd)
+    env = {
+        **os.environ,
+        "DATABASE_URL": database_url,
+        # measure the routes themselves: no response cache hits, no login throttling
+        "RESPONSE_CACHE_BACKEND": os.environ.get("RESPONSE_CACHE_BACKEND", "memory" if args.response_cache else "off"),
+        "LOGIN_RATE_LIMIT_PER_USER": "0",
+        "LOGIN_RATE_LIMIT_PER_IP": "0",
+        **(env_extra or {}),
+    }
+    command = [
+        sys.executable, "-m", "benchmarks.bench_api", "--phase", phase, "--phase-out", out_path,
+        "--rows", str(rows), "--seed", str(args.seed), "--requests", str(args.requests),
+        "--max-seconds", str(args.max_seconds), "--warmup", str(args.warmup), "--concurrency", str(args.concurrency),
+    ]
+    if args.only:
+        command += ["--only", *args.only]
+    try:
+        subprocess.run(command, env=env, check=True)
+        with open(out_path) as fh:
+            return json.load(fh)
+    finally:
+        os.remove(out_path)
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: dict, baseline: dict, threshold: float, metric: str, min_delta_ms: float):
+    """``(size, route, old, new)`` for every route slower than ``baseline`` beyond the threshold."""
+    regressions = []
+    for size, run in results["runs"].items():
+        old_run = baseline.get("runs", {}).get(size)
+        if not old_run:
+            continue
+        for route, stats in run["endpoints"].items():
+            old, new = old_run["endpoints"].get(route, {}).get(metric), stats.get(metric)
+            if old is None or new is None:
+                continue
+            if new > old * (1 + threshold) and new - old >= min_delta_ms:
+                regressions.append((size, route, old, new))
+    return regressions
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_api", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000], help="table sizes, e.g. 10000 100000 1000000 10000000")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--requests", type=int, default=50, help="measured requests per route")
+    parser.add_argument("--max-seconds", type=float, default=10.0, help="time budget per route")
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--concurrency", type=int, default=1, help="client threads per route")
+    parser.add_argument("--only", nargs="*", help="only routes whose name contains one of these")
+    parser.add_argument("--response-cache", action="store_true", help="keep the response cache on (default off)")
+    parser.add_argument("--database-url", help="scratch database to use instead of SQLite files (wiped every run)")
+    parser.add_argument("--data-dir", default=os.path.join(tempfile.gettempdir(), "bench_api"))
+    parser.add_argument("--out", default="bench_api_results.json")
+    parser.add_argument("--baseline", help="earlier --out file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed relative slowdown (0.25 = 25%%)")
+    parser.add_argument("--metric", default="p95_ms", choices=["p50_ms", "p95_ms", "p99_ms", "mean_ms"])
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="ignore slowdowns smaller than this")
+    parser.add_argument("--phase", choices=["prepare", "measure"], help=argparse.SUPPRESS)
+    parser.add_argument("--phase-out", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.phase:
+        rows = args.rows[0]
+        if args.phase == "prepare":
+            out = prepare(rows, args.seed)
+        else:
+            out = measure(rows, args.requests, args.max_seconds, args.warmup, args.concurrency, args.only)
+        with open(args.phase_out, "w") as fh:
+            json.dump(out, fh)
+        return 0
+
+    results = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "database": "custom" if args.database_url else "sqlite",
+            "seed": args.seed,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "response_cache": args.response_cache,
+        },
+        "runs": {},
+    }
+    os.makedirs(args.data_dir, exist_ok=True)
+    for rows in args.rows:
+        print(f"== {rows:,} rows")
+        if args.database_url:
+            load = _run_phase("prepare", args.database_url, args, rows)
+            database_url = args.database_url
+        else:
+            golden = os.path.join(args.data_dir, f"students_{rows}_seed{args.seed}.db")
+            load = None
+            if not os.path.exists(golden):
+                building = f"{golden}.building"
+                if os.path.exists(building):
+                    os.remove(building)
+                load = _run_phase("prepare", f"sqlite:///{building}", args, rows)
+                os.replace(building, golden)
+            working = os.path.join(args.data_dir, f"students_{rows}_seed{args.seed}.run.db")
+            shutil.copyfile(golden, working)
+            database_url = f"sqlite:///{working}"
+        if load:
+            print(f"  loaded {load['rows']:,} rows in {load['load_seconds']:.1f}s ({load['load_rows_per_second']:,.0f} rows/s)")
+        run = _run_phase("measure", database_url, args, rows)
+        run["load"] = load
+        if run["uncovered_routes"]:
+            print(f"  not benchmarked: {', '.join(run['uncovered_routes'])}")
+        results["runs"][str(rows)] = run
+
+    with open(args.out, "w") as fh:
+        json.dump(results, fh, indent=1)
+    print(f"results -> {args.out}")
+
+    if args.baseline:
+        with open(args.baseline) as fh:
+            regressions = compare(results, json.load(fh), args.threshold, args.metric, args.min_delta_ms)
+        for size, route, old, new in regressions:
+            print(f"REGRESSION {size} rows  {route}: {args.metric} {old:.1f} -> {new:.1f} ms ({new / old - 1:+.0%})")
+        if regressions:
+            return 1
+        print(f"no {args.metric} regression above {args.threshold:.0%} vs {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
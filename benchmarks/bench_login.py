@@ -0,0 +1,97 @@
+# benchmarks/bench_login.py
+"""
+Login load test: ``POST /auth/login`` through the real app (in-process
+TestClient, threads as concurrent clients) against a throwaway SQLite file.
+Reports logins/sec and latency for a valid student, a wrong password, an
+unknown username and the admin. Unknown and wrong-password latencies should
+be close (dummy verify); the rate limiter is switched off for the run.
+
+    python -m benchmarks.bench_login                 # 8 clients, 3 s per scenario
+    python -m benchmarks.bench_login 16 5            # clients, seconds
+    ASYNC_DB_ENABLED=1 python -m benchmarks.bench_login
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+_tmpdir = tempfile.mkdtemp(prefix="bench_login_")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_tmpdir}/bench.db")
+os.environ["LOGIN_RATE_LIMIT_PER_USER"] = "0"
+os.environ["LOGIN_RATE_LIMIT_PER_IP"] = "0"
+
+STUDENTS = 200
+
+
+def _scenarios():
+    return {
+        "student ok": lambda i: (f"B{i % STUDENTS:05d}", "secret"),
+        "wrong password": lambda i: (f"B{i % STUDENTS:05d}", "wrong"),
+        "unknown user": lambda i: (f"X{i:07d}", "secret"),
+        "admin": lambda i: (os.getenv("ADMIN_USERNAME", "admin"), os.getenv("ADMIN_PASSWORD", "admin123")),
+    }
+
+
+def _run(client, credentials, clients, seconds):
+    latencies, statuses = [], []
+    lock = threading.Lock()
+    counter = iter(range(10 ** 9))
+    deadline = time.perf_counter() + seconds
+
+    def worker():
+        mine, codes = [], []
+        while time.perf_counter() < deadline:
+            with lock:
+                i = next(counter)
+            username, password = credentials(i)
+            started = time.perf_counter()
+            r = client.post("/auth/login", data={"username": username, "password": password})
+            mine.append(time.perf_counter() - started)
+            codes.append(r.status_code)
+        with lock:
+            latencies.extend(mine)
+            statuses.extend(codes)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(clients) as pool:
+        for _ in range(clients):
+            pool.submit(worker)
+    elapsed = time.perf_counter() - started
+    return len(latencies) / elapsed, np.asarray(latencies) * 1000, sorted(set(statuses))
+
+
+def main(argv):
+    clients = int(argv[0]) if argv else 8
+    seconds = float(argv[1]) if len(argv) > 1 else 3.0
+
+    from fastapi.testclient import TestClient
+
+    import main as app_main
+    from modules.items.services import hashing
+
+    with TestClient(app_main.app) as client:
+        token = client.post(
+            "/auth/login",
+            data={"username": os.getenv("ADMIN_USERNAME", "admin"), "password": os.getenv("ADMIN_PASSWORD", "admin123")},
+        ).json()["access_token"]
+        client.post(
+            "/students/bulk",
+            headers={"Authorization": f"Bearer {token}"},
+            json=[{"student_id": f"B{i:05d}", "password": "secret"} for i in range(STUDENTS)],
+        )
+
+        print(f"clients={clients} seconds={seconds} hash_workers={hashing.PASSWORD_HASH_WORKERS} "
+              f"rounds={hashing.PASSWORD_HASH_ROUNDS} async={os.getenv('ASYNC_DB_ENABLED', '0')}")
+        print(f"{'scenario':<16} {'logins/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}  status")
+        for name, credentials in _scenarios().items():
+            rate, ms, codes = _run(client, credentials, clients, seconds)
+            p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+            print(f"{name:<16} {rate:>9.1f} {p50:>8.1f} {p95:>8.1f} {p99:>8.1f}  {codes}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
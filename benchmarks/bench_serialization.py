@@ -0,0 +1,108 @@
+# benchmarks/bench_serialization.py
+"""
+List-response serialization: FastAPI's ``response_model`` path (ORM entities
+-> ``List[StudentOut]`` validation -> JSON) vs the fast path used by the list
+endpoints (projected row dicts -> ``FastJSONResponse``). Rows live in an
+in-memory SQLite database so the ORM load cost is included.
+
+    python -m benchmarks.bench_serialization          # 1k, 5k, 20k rows
+    python -m benchmarks.bench_serialization 50000    # custom sizes
+"""
+import sys
+import time
+from typing import List
+
+import numpy as np
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from database import Base
+from modules.items.models import Student
+from modules.items.schema.schemas import StudentOut
+from modules.items.services.projections import STUDENT_OUT
+from modules.items.services.serialization import FastJSONResponse, orjson, row_dicts
+
+_adapter = TypeAdapter(List[StudentOut])
+
+
+def _timed(fn, repeat=3):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def _populate(db: Session, n: int, seed: int = 42) -> None:
+    rng = np.random.default_rng(seed)
+    scores = rng.uniform(0, 100, size=(n, 8)).round(2)
+    db.execute(
+        Student.__table__.insert(),
+        [
+            {
+                "student_id": f"S{i:07d}",
+                "first_name": f"First{i}",
+                "last_name": f"Last{i}",
+                "email": f"s{i}@example.com",
+                "gender": "Female" if i % 2 else "Male",
+                "age": 18 + i % 8,
+                "department": ("CS", "Engineering", "Business", "Mathematics")[i % 4],
+                "attendance_percent": s[0],
+                "midterm_score": s[1],
+                "final_score": s[2],
+                "assignments_avg": s[3],
+                "quizzes_avg": s[4],
+                "participation_score": s[5] / 10,
+                "projects_score": s[6],
+                "total_score": s[7],
+                "grade": "B",
+                "study_hours_per_week": 10.5,
+                "extracurricular_activities": "Yes",
+                "internet_access_at_home": "No",
+                "parent_education_level": "Bachelor's",
+                "family_income_level": "Medium",
+                "stress_level": i % 10,
+                "sleep_hours_per_night": 7.0,
+            }
+            for i, s in enumerate(scores.tolist())
+        ],
+    )
+    db.commit()
+
+
+def run(n):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        _populate(db, n)
+
+        def response_model_path():
+            db.expunge_all()
+            students = db.query(Student).order_by(Student.id).all()
+            validated = _adapter.validate_python(students, from_attributes=True)
+            return JSONResponse(_adapter.dump_python(validated, mode="json")).body
+
+        def fast_path():
+            rows = row_dicts(STUDENT_OUT.all(db))
+            return FastJSONResponse(rows).body
+
+        t_old, body_old = _timed(response_model_path)
+        t_new, body_new = _timed(fast_path)
+    engine.dispose()
+    return n, t_old, t_new, len(body_old), len(body_new)
+
+
+def main(argv):
+    sizes = [int(a) for a in argv] or [1_000, 5_000, 20_000]
+    print(f"encoder: {'orjson' if orjson is not None else 'json (orjson not installed)'}")
+    print(f"{'rows':>8} {'response_model ms':>18} {'fast path ms':>13} {'speedup':>8} {'bytes':>10}")
+    for n, t_old, t_new, size_old, size_new in map(run, sizes):
+        print(f"{n:>8} {t_old * 1000:>18.1f} {t_new * 1000:>13.1f} {t_old / t_new:>7.1f}x {size_new:>10}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
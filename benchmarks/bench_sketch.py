@@ -0,0 +1,56 @@
+# benchmarks/bench_sketch.py
+"""
+KLL sketch (``modules.items.services.sketch``) vs an exact sort: build time,
+query time, memory (items kept) and observed rank error of the 25th/50th/75th
+percentiles, with the sketch fed in import-sized batches.
+
+    python -m benchmarks.bench_sketch            # 10k, 100k, 1M rows
+    python -m benchmarks.bench_sketch 50000      # custom sizes
+"""
+import sys
+import time
+
+import numpy as np
+
+from modules.items.services import stats
+from modules.items.services.sketch import KLLSketch
+
+BATCH_SIZE = 5000
+QS = [0.25, 0.5, 0.75]
+
+
+def run(n, k=200, seed=42):
+    values = np.random.default_rng(seed).normal(70, 15, size=n)
+
+    started = time.perf_counter()
+    sketch = KLLSketch(k=k, seed=seed)
+    for start in range(0, n, BATCH_SIZE):
+        sketch.update(values[start:start + BATCH_SIZE])
+    t_build = time.perf_counter() - started
+
+    started = time.perf_counter()
+    approx = sketch.quantiles(QS)
+    t_sketch = time.perf_counter() - started
+
+    started = time.perf_counter()
+    stats.quantiles(values, QS)
+    t_exact = time.perf_counter() - started
+
+    ordered = np.sort(values)
+    error = max(abs(np.searchsorted(ordered, v) / n - q) for q, v in zip(QS, approx))
+    items = sum(len(level) for level in sketch.levels)
+    return n, t_build, t_sketch, t_exact, items, error, sketch.rank_error()
+
+
+def main(argv):
+    sizes = [int(a) for a in argv] or [10_000, 100_000, 1_000_000]
+    print(f"{'rows':>10} {'build ms':>9} {'query ms':>9} {'exact ms':>9} {'items':>6} {'rank err':>9} {'bound':>7}")
+    for n, t_build, t_sketch, t_exact, items, error, bound in map(run, sizes):
+        print(
+            f"{n:>10} {t_build * 1000:>9.1f} {t_sketch * 1000:>9.2f} {t_exact * 1000:>9.2f}"
+            f" {items:>6} {error:>9.4f} {bound:>7.4f}"
+        )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
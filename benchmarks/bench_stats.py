@@ -0,0 +1,109 @@
+# benchmarks/bench_stats.py
+"""
+Microbenchmark: legacy pure-Python analytics helpers vs ``modules.items.services.stats``.
+
+    python -m benchmarks.bench_stats            # 10k, 100k, 1M rows
+    python -m benchmarks.bench_stats 50000      # custom sizes
+"""
+import math
+import sys
+import time
+
+import numpy as np
+
+from modules.items.services import stats
+
+
+# --- legacy implementations (as they were in routes/analytics.py) ---
+def _mean(values):
+    return sum(values) / len(values) if values else None
+
+def _pearson(xs, ys):
+    if len(xs) < 2 or len(ys) < 2 or len(xs) != len(ys):
+        return None
+    mx, my = _mean(xs), _mean(ys)
+    num = sum((x - mx) * (y - my) for x, y in zip(xs, ys))
+    den_x = math.sqrt(sum((x - mx) ** 2 for x in xs))
+    den_y = math.sqrt(sum((y - my) ** 2 for y in ys))
+    if den_x == 0 or den_y == 0:
+        return None
+    return num / (den_x * den_y)
+
+def _percentile(values, q):
+    if not values:
+        return None
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * q
+    f = math.floor(k)
+    c = math.ceil(k)
+    if f == c:
+        return ordered[int(k)]
+    return ordered[f] + (ordered[c] - ordered[f]) * (k - f)
+
+
+def _timed(fn, repeat=3):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def _dataset(n, seed=42):
+    rng = np.random.default_rng(seed)
+    metrics = rng.normal(70, 15, size=(n, 5))
+    metrics[rng.random((n, 5)) < 0.02] = np.nan  # ~2% NULL per column
+    final = metrics[:, 0] * 0.4 + rng.normal(40, 10, size=n)
+    return metrics, final
+
+
+def run(n):
+    metrics, final = _dataset(n)
+    rows = []
+
+    def legacy_corr():
+        out = []
+        for j in range(metrics.shape[1]):
+            pairs = [(x, y) for x, y in zip(metrics[:, j].tolist(), final.tolist())
+                     if not math.isnan(x) and not math.isnan(y)]
+            xs = [p[0] for p in pairs]
+            ys = [p[1] for p in pairs]
+            out.append(_pearson(xs, ys))
+        return out
+
+    def kernel_corr():
+        result = stats.correlation_with(final, {str(j): metrics[:, j] for j in range(metrics.shape[1])})
+        return [result[str(j)]["pearson_r"] for j in range(metrics.shape[1])]
+
+    values = [v for v in metrics[:, 0].tolist() if not math.isnan(v)]
+    qs = [0.25, 0.5, 0.75, 0.9]
+
+    def legacy_quantiles():
+        return [_percentile(values, q) for q in qs]
+
+    def kernel_quantiles():
+        return stats.quantiles(metrics[:, 0], qs)
+
+    for label, legacy, kernel in [
+        ("correlation x5", legacy_corr, kernel_corr),
+        ("quantiles x4", legacy_quantiles, kernel_quantiles),
+    ]:
+        t_old, r_old = _timed(legacy)
+        t_new, r_new = _timed(kernel)
+        assert np.allclose(r_old, r_new, rtol=1e-9), (label, r_old, r_new)
+        rows.append((n, label, t_old, t_new))
+    return rows
+
+
+def main(argv):
+    sizes = [int(a) for a in argv] or [10_000, 100_000, 1_000_000]
+    print(f"{'rows':>10}  {'operation':<16} {'legacy ms':>10} {'numpy ms':>10} {'speedup':>8}")
+    for n in sizes:
+        for rows, label, t_old, t_new in run(n):
+            print(f"{rows:>10}  {label:<16} {t_old * 1000:>10.1f} {t_new * 1000:>10.1f} {t_old / t_new:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,231 @@
+# benchmarks/synthetic.py
+"""
+Synthetic student tables shaped like ``data/students_kaggle.csv``.
+
+``fit`` learns each column's marginal distribution (empirical quantiles for
+numbers, frequencies for categories, missing-value rate) and the rank
+correlation between columns; ``generate`` draws any number of rows from a
+Gaussian copula over those marginals, in chunks, so 10M rows never sit in
+memory at once. Columns that are exact functions of others in the CSV
+(``Total_Score`` = weighted scores, ``Grade`` = band of ``Total_Score``) are
+detected and recomputed instead of sampled. Output chunks are DataFrames with the CSV's column names and
+go through the importer's own ``_chunk_to_rows`` + ``upsert_students`` path.
+
+    python -m benchmarks.synthetic 100000 out.csv     # write a CSV
+"""
+import math
+import sys
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+KAGGLE_CSV = "data/students_kaggle.csv"
+ID_COLUMN = "Student_ID"
+# regenerated per row instead of sampled (unique per student)
+UNIQUE_COLUMNS = ("Student_ID", "Email")
+# sampled independently: names carry no signal and the importer replaces them by default
+INDEPENDENT_COLUMNS = ("First_Name", "Last_Name")
+
+
+@dataclass
+class Marginal:
+    name: str
+    values: np.ndarray       # sorted observed values (numbers) or categories (alphabetical)
+    numeric: bool
+    decimals: int
+    missing_rate: float
+    cumulative: Optional[np.ndarray] = None  # categories: cumulative frequency, same order as values
+
+
+@dataclass
+class LinearColumn:
+    """``name`` = intercept + sum(coefficient * input), exact in the source data."""
+    name: str
+    inputs: List[str]
+    coefficients: np.ndarray
+    intercept: float
+    decimals: int
+
+
+@dataclass
+class BandedColumn:
+    """Category picked by which ``cuts`` interval ``source`` falls in (e.g. Grade by Total_Score)."""
+    name: str
+    source: str
+    cuts: np.ndarray
+    labels: np.ndarray
+
+
+@dataclass
+class StudentModel:
+    columns: List[str]
+    marginals: Dict[str, Marginal]
+    copula_columns: List[str]
+    cholesky: np.ndarray
+    independent: Dict[str, pd.Series]   # value -> frequency
+    linear: List[LinearColumn]
+    banded: List[BandedColumn]
+
+
+def _decimals(values: np.ndarray) -> int:
+    for decimals in range(6):
+        if np.allclose(values, np.round(values, decimals), rtol=0, atol=1e-6):
+            return decimals
+    return 6
+
+
+def _norm_cdf(z: np.ndarray) -> np.ndarray:
+    """Standard normal CDF via the Numerical Recipes erfc approximation (|error| < 1.2e-7)."""
+    x = np.abs(z) / math.sqrt(2.0)
+    t = 1.0 / (1.0 + 0.5 * x)
+    poly = -x * x - 1.26551223 + t * (1.00002368 + t * (0.37409196 + t * (0.09678418 + t * (
+        -0.18628806 + t * (0.27886807 + t * (-1.13520398 + t * (1.48851587 + t * (
+            -0.82215223 + t * 0.17087277))))))))
+    erfc = t * np.exp(poly)
+    return np.where(z >= 0, 1.0 - 0.5 * erfc, 0.5 * erfc)
+
+
+def _nearest_correlation(matrix: np.ndarray) -> np.ndarray:
+    """Clip negative eigenvalues so pairwise estimates form a valid correlation matrix."""
+    eigenvalues, eigenvectors = np.linalg.eigh(matrix)
+    fixed = eigenvectors @ np.diag(np.clip(eigenvalues, 1e-6, None)) @ eigenvectors.T
+    scale = np.sqrt(np.diag(fixed))
+    return fixed / np.outer(scale, scale)
+
+
+def _find_linear(df: pd.DataFrame, numeric: List[str]) -> List[LinearColumn]:
+    """Numeric columns that are an exact linear combination of other numeric columns."""
+    found: List[LinearColumn] = []
+    complete = df[numeric].dropna()
+    # later columns first: a total is derived from its parts, not a part from the total
+    for name in reversed(numeric):
+        inputs = [c for c in numeric if c != name and c not in {d.name for d in found}]
+        if not inputs or len(complete) <= len(inputs) + 1:
+            continue
+        X = np.c_[complete[inputs].to_numpy(dtype=float), np.ones(len(complete))]
+        y = complete[name].to_numpy(dtype=float)
+        solution = np.linalg.lstsq(X, y, rcond=None)[0]
+        if np.abs(X @ solution - y).max() > 1e-6 * max(1.0, np.abs(y).max()):
+            continue
+        coefficients = np.round(solution[:-1], 8)
+        used = np.abs(coefficients) > 1e-8
+        found.append(LinearColumn(
+            name, [c for c, keep in zip(inputs, used) if keep], coefficients[used],
+            float(np.round(solution[-1], 8)), _decimals(y),
+        ))
+    return found
+
+
+def _find_banded(df: pd.DataFrame, name: str, numeric: List[str]) -> Optional[BandedColumn]:
+    """A categorical column whose categories occupy disjoint ranges of one numeric column."""
+    for source in numeric:
+        ranges = df.dropna(subset=[name, source]).groupby(name)[source].agg(["min", "max"]).sort_values("min")
+        if len(ranges) < 2 or (ranges["min"].to_numpy()[1:] <= ranges["max"].to_numpy()[:-1]).any():
+            continue
+        cuts = []
+        for low_max, high_min in zip(ranges["max"].to_numpy()[:-1], ranges["min"].to_numpy()[1:]):
+            # roundest number separating the two bands (60 rather than 60.0032)
+            cut = next(
+                c for c in (round((low_max + high_min) / 2, d) for d in range(8)) if low_max < c <= high_min
+            )
+            cuts.append(cut)
+        return BandedColumn(name, source, np.asarray(cuts), ranges.index.to_numpy())
+    return None
+
+
+def fit(csv_path: str = KAGGLE_CSV) -> StudentModel:
+    df = pd.read_csv(csv_path, dtype={ID_COLUMN: str})
+    numeric = [c for c in df.columns if c not in UNIQUE_COLUMNS and pd.api.types.is_numeric_dtype(df[c])]
+    linear = _find_linear(df, numeric)
+    banded = [
+        b for b in (
+            _find_banded(df, c, numeric) for c in df.columns
+            if c not in UNIQUE_COLUMNS and c not in INDEPENDENT_COLUMNS and c not in numeric
+        ) if b is not None
+    ]
+    derived = {d.name for d in linear} | {b.name for b in banded}
+
+    marginals: Dict[str, Marginal] = {}
+    copula_columns: List[str] = []
+    ordinal = {}
+    for name in df.columns:
+        if name in UNIQUE_COLUMNS or name in INDEPENDENT_COLUMNS or name in derived:
+            continue
+        series = df[name]
+        observed = series.dropna()
+        numeric = pd.api.types.is_numeric_dtype(series)
+        if numeric:
+            values = np.sort(observed.to_numpy(dtype=float))
+            marginals[name] = Marginal(name, values, True, _decimals(values), float(series.isna().mean()))
+            ordinal[name] = series.astype(float)
+        else:
+            freq = observed.astype(str).value_counts(normalize=True).sort_index()
+            values = freq.index.to_numpy()
+            marginals[name] = Marginal(name, values, False, 0, float(series.isna().mean()), np.cumsum(freq.to_numpy()))
+            ordinal[name] = series.map({v: i for i, v in enumerate(values)}).astype(float)
+        copula_columns.append(name)
+
+    # Spearman -> Pearson of the latent normals (exact for a Gaussian copula)
+    spearman = pd.DataFrame(ordinal)[copula_columns].corr(method="spearman").fillna(0).to_numpy()
+    latent = 2 * np.sin(np.pi * spearman / 6)
+    np.fill_diagonal(latent, 1.0)
+    cholesky = np.linalg.cholesky(_nearest_correlation(latent))
+
+    independent = {name: df[name].value_counts(normalize=True) for name in INDEPENDENT_COLUMNS if name in df}
+    return StudentModel(list(df.columns), marginals, copula_columns, cholesky, independent, linear, banded)
+
+
+def _from_uniform(marginal: Marginal, u: np.ndarray):
+    m = len(marginal.values)
+    if marginal.numeric:
+        grid = (np.arange(m) + 0.5) / m
+        out = np.round(np.interp(u, grid, marginal.values), marginal.decimals)
+        return out.astype(np.int64) if marginal.decimals == 0 else out
+    return marginal.values[np.minimum(np.searchsorted(marginal.cumulative, u, side="right"), m - 1)]
+
+
+def generate(model: StudentModel, n: int, chunk_size: int = 5000, seed: int = 42, start_id: int = 1000) -> Iterator[pd.DataFrame]:
+    """Yield ``n`` synthetic rows as CSV-shaped DataFrames of at most ``chunk_size`` rows."""
+    rng = np.random.default_rng(seed)
+    for start in range(0, n, chunk_size):
+        size = min(chunk_size, n - start)
+        u = _norm_cdf(rng.standard_normal((size, len(model.copula_columns))) @ model.cholesky.T)
+        ids = np.arange(start_id + start, start_id + start + size)
+        data = {}
+        for name in model.columns:
+            if name == ID_COLUMN:
+                data[name] = pd.Series(ids).map("S{}".format)
+            elif name == "Email":
+                data[name] = pd.Series(ids - start_id).map("student{}@university.com".format)
+            elif name in model.independent:
+                freq = model.independent[name]
+                data[name] = rng.choice(freq.index.to_numpy(), size=size, p=freq.to_numpy())
+            elif name in model.marginals:
+                marginal = model.marginals[name]
+                column = pd.Series(_from_uniform(marginal, u[:, model.copula_columns.index(name)]))
+                if marginal.missing_rate:
+                    column = column.mask(rng.random(size) < marginal.missing_rate)
+                data[name] = column
+        for column in model.linear:
+            inputs = np.column_stack([data[c].to_numpy(dtype=float) for c in column.inputs])
+            data[column.name] = pd.Series(np.round(inputs @ column.coefficients + column.intercept, column.decimals))
+        for column in model.banded:
+            source = data[column.source]
+            data[column.name] = pd.Series(column.labels[np.searchsorted(column.cuts, source.to_numpy(), side="right")])
+            data[column.name] = data[column.name].mask(source.isna())
+        yield pd.DataFrame(data, columns=model.columns)
+
+
+def main(argv):
+    n = int(argv[0]) if argv else 10_000
+    out = argv[1] if len(argv) > 1 else f"students_synthetic_{n}.csv"
+    model = fit()
+    for i, chunk in enumerate(generate(model, n, chunk_size=100_000)):
+        chunk.to_csv(out, mode="w" if i == 0 else "a", header=i == 0, index=False)
+    print(f"{n} rows -> {out}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,8 +1,24 @@
 # database.py
+import contextvars
+import itertools
 import os
+import threading
+import time
+import zlib
+from bisect import bisect_left
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, TypeVar
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import declarative_base, sessionmaker
+from fastapi import Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import column, create_engine, event, exc, select, table
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+T = TypeVar("T")
 
 # Prefer DATABASE_URL if provided; fall back to individual pieces for local dev
 MYSQL_USER = os.getenv("MYSQL_USER", "root")
@@ -18,11 +34,174 @@ DATABASE_URL = os.getenv(
     f"{MYSQL_HOST}:{MYSQL_PORT}/{MYSQL_DB}",
 )
 
+# ✅ pool tuning (lihat README): ukuran, overflow, recycle, timeout, strategi pre-ping
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# always = ping setiap checkout, idle = ping hanya jika koneksi idle > DB_POOL_PRE_PING_IDLE detik, off = tanpa ping
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "idle")
+DB_POOL_PRE_PING_IDLE = float(os.getenv("DB_POOL_PRE_PING_IDLE", "30"))
+
+# upper bounds (seconds) of the checkout wait-time histogram buckets
+POOL_WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class PoolStats:
+    """Counters for one engine's connection pool (see ``get_pool_stats``)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkout_timeouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.pre_pings = 0
+        self.pre_ping_failures = 0
+        self.wait_seconds_total = 0.0
+        self.wait_buckets = [0] * (len(POOL_WAIT_BUCKETS) + 1)
+
+    def record_wait(self, seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.checkout_timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_seconds_total += seconds
+            self.wait_buckets[bisect_left(POOL_WAIT_BUCKETS, seconds)] += 1
+
+    def incr(self, field: str) -> None:
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+
+class _WaitTimingPool:
+    """Mixin timing how long ``checkout`` waits for a free pooled connection."""
+
+    stats: PoolStats
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            self.stats.record_wait(time.perf_counter() - started, timed_out=True)
+            raise
+        self.stats.record_wait(time.perf_counter() - started)
+        return conn
+
+
+_pool_stats: Dict[str, PoolStats] = {}
+_engines: Dict[str, object] = {}
+
+
+def _is_memory_sqlite(url: str) -> bool:
+    parsed = make_url(url)
+    return parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:")
+
+
+def _instrument_pool(name: str, pool, stats: PoolStats) -> None:
+    @event.listens_for(pool, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        stats.incr("connects")
+        connection_record.info["checked_in_at"] = time.monotonic()
+
+    @event.listens_for(pool, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        connection_record.info["checked_in_at"] = time.monotonic()
+
+    @event.listens_for(pool, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        stats.incr("invalidations")
+
+    @event.listens_for(pool, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        if DB_POOL_PRE_PING == "off":
+            return
+        idle = time.monotonic() - connection_record.info.get("checked_in_at", 0.0)
+        if DB_POOL_PRE_PING == "idle" and idle < DB_POOL_PRE_PING_IDLE:
+            return
+        stats.incr("pre_pings")
+        try:
+            cursor = dbapi_connection.cursor()
+            cursor.execute("SELECT 1")
+            cursor.close()
+        except Exception:
+            stats.incr("pre_ping_failures")
+            # pool membuang koneksi ini dan mencoba koneksi baru
+            raise exc.DisconnectionError()
+
+
+def create_instrumented_engine(name: str, url: str, async_engine: bool = False):
+    """
+    Create an engine with the ``DB_POOL_*`` settings applied and its pool
+    registered under ``name`` in ``get_pool_stats()``.
+    """
+    stats = _pool_stats.setdefault(name, PoolStats())
+    kwargs = {}
+    if not _is_memory_sqlite(url):
+        base_pool = AsyncAdaptedQueuePool if async_engine else QueuePool
+        kwargs.update(
+            poolclass=type(f"Instrumented{base_pool.__name__}", (_WaitTimingPool, base_pool), {"stats": stats}),
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_recycle=DB_POOL_RECYCLE,
+            pool_timeout=DB_POOL_TIMEOUT,
+        )
+
+    if async_engine:
+        from sqlalchemy.ext.asyncio import create_async_engine
+
+        new_engine = create_async_engine(url, **kwargs)
+        _instrument_pool(name, new_engine.sync_engine.pool, stats)
+    else:
+        new_engine = create_engine(url, **kwargs)
+        _instrument_pool(name, new_engine.pool, stats)
+    _engines[name] = new_engine
+    return new_engine
+
+
+def get_pool_stats() -> Dict[str, Dict]:
+    """Live gauges + cumulative counters for every registered engine pool."""
+    out = {}
+    for name, registered in _engines.items():
+        pool = getattr(registered, "sync_engine", registered).pool
+        stats = _pool_stats[name]
+        gauges = {}
+        if isinstance(pool, QueuePool):
+            gauges = {
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+                "max_overflow": pool._max_overflow,
+            }
+        buckets = {}
+        cumulative = 0
+        for bound, count in zip(list(POOL_WAIT_BUCKETS) + [float("inf")], stats.wait_buckets):
+            cumulative += count
+            buckets["+Inf" if bound == float("inf") else str(bound)] = cumulative
+        out[name] = {
+            "pool_class": type(pool).__name__,
+            **gauges,
+            "checkouts": stats.checkouts,
+            "checkout_timeouts": stats.checkout_timeouts,
+            "connects": stats.connects,
+            "invalidations": stats.invalidations,
+            "pre_ping_strategy": DB_POOL_PRE_PING,
+            "pre_pings": stats.pre_pings,
+            "pre_ping_failures": stats.pre_ping_failures,
+            "checkout_wait_seconds": {
+                "sum": stats.wait_seconds_total,
+                "count": stats.checkouts + stats.checkout_timeouts,
+                "buckets": buckets,
+            },
+        }
+    return out
+
+
 # ✅ engine: dipakai oleh Base.metadata.create_all dan SessionLocal
-engine = create_engine(
-    DATABASE_URL,
-    pool_pre_ping=True,
-)
+engine = create_instrumented_engine("primary", DATABASE_URL)
 
 # ✅ Base: inilah yang di-import di main.py & models.py
 Base = declarative_base()
@@ -36,3 +215,326 @@ def get_db():
         yield db
     finally:
         db.close()
+
+# ✅ Async mode (opsional): ASYNC_DB_ENABLED=1 memasang router async (main.py)
+# yang memakai AsyncSession di atas driver async (aiomysql / aiosqlite).
+ASYNC_DB_ENABLED = os.getenv("ASYNC_DB_ENABLED", "0") == "1"
+
+_ASYNC_DRIVERS = {
+    "mysql": "mysql+aiomysql",
+    "mysql+pymysql": "mysql+aiomysql",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+}
+
+def _to_async_url(url: str) -> str:
+    scheme, sep, rest = url.partition("://")
+    return f"{_ASYNC_DRIVERS.get(scheme, scheme)}{sep}{rest}"
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or _to_async_url(DATABASE_URL)
+
+async_engine = None
+AsyncSessionLocal = None
+if ASYNC_DB_ENABLED:
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+
+    async_engine = create_instrumented_engine("primary_async", ASYNC_DATABASE_URL, async_engine=True)
+    # expire_on_commit=False: response_model membaca atribut setelah commit di luar greenlet
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+# ✅ Read replicas (opsional): DATABASE_REPLICA_URLS=url1,url2. Route yang hanya
+# membaca (analytics, list, search) memakai get_read_db; tulisan, login dan
+# lookup satu baris tetap ke primary. Tanpa replika get_read_db = get_db.
+DATABASE_REPLICA_URLS = [u.strip() for u in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if u.strip()]
+# round_robin | least_connections (sesi baca yang sedang terbuka per replika)
+DB_REPLICA_STRATEGY = os.getenv("DB_REPLICA_STRATEGY", "round_robin")
+# replika yang tertinggal lebih lama dari ini (detik) dilewati; 0 = harus sama dengan primary
+DB_REPLICA_MAX_LAG_SECONDS = float(os.getenv("DB_REPLICA_MAX_LAG_SECONDS", "5"))
+DB_REPLICA_LAG_CHECK_SECONDS = float(os.getenv("DB_REPLICA_LAG_CHECK_SECONDS", "1"))
+
+# models.DataVersion, dibaca tanpa import models (models mengimpor Base dari sini)
+_data_version = table("data_version", column("id"), column("version"))
+_version_query = select(_data_version.c.version).where(_data_version.c.id == 1)
+
+
+class Replica:
+    """
+    One read replica: its engines, open read sessions and replication lag.
+
+    Lag is measured against the primary's ``data_version``: it is the time
+    since the earliest check at which the primary had a version the replica
+    still lacks (accurate to ``DB_REPLICA_LAG_CHECK_SECONDS``, no DB clocks
+    compared). A replica that keeps up with a steady write stream trails by
+    a version or two but its lag stays small. An unreachable replica is
+    skipped until a later check succeeds.
+    """
+
+    # bounds the (check time, primary version) samples kept while behind
+    max_samples = 256
+
+    def __init__(self, index: int, url: str):
+        self.name = f"replica_{index}"
+        self.engine = create_instrumented_engine(self.name, url)
+        self.session_factory = sessionmaker(autocommit=False, autoflush=False, bind=self.engine, info={"read_only": True})
+        self.async_session_factory = None
+        if ASYNC_DB_ENABLED:
+            async_replica = create_instrumented_engine(f"{self.name}_async", _to_async_url(url), async_engine=True)
+            self.async_session_factory = async_sessionmaker(
+                async_replica, autoflush=False, expire_on_commit=False, info={"read_only": True}
+            )
+        self.in_flight = 0
+        self.version = None
+        self.behind_since = None
+        self.error = None
+        self._behind_samples = deque()
+
+    def check(self, primary_version: int, now: float) -> None:
+        try:
+            with self.engine.connect() as conn:
+                self.version = conn.execute(_version_query).scalar() or 0
+            self.error = None
+        except exc.SQLAlchemyError as e:
+            self.version, self.behind_since, self.error = None, None, str(e)
+            self._behind_samples.clear()
+            return
+        samples = self._behind_samples
+        if self.version >= primary_version:
+            samples.clear()
+            self.behind_since = None
+            return
+        if not samples or samples[-1][1] < primary_version:
+            if len(samples) < self.max_samples:
+                samples.append((now, primary_version))
+            else:
+                # full: fold into the newest sample (keeps its older time, so lag is over- not under-estimated)
+                samples[-1] = (samples[-1][0], primary_version)
+        # versions the replica has replicated since no longer count
+        while samples[0][1] <= self.version:
+            samples.popleft()
+        self.behind_since = samples[0][0]
+
+    def lag(self) -> float:
+        if self.error is not None:
+            return float("inf")
+        return 0.0 if self.behind_since is None else time.monotonic() - self.behind_since
+
+    def usable(self) -> bool:
+        if self.behind_since is None:
+            return self.error is None
+        return self.lag() < DB_REPLICA_MAX_LAG_SECONDS
+
+
+_replicas = [Replica(i, url) for i, url in enumerate(DATABASE_REPLICA_URLS)]
+_replica_lock = threading.Lock()
+_replica_turn = itertools.count()
+_replicas_checked_at: Optional[float] = None
+
+
+def _check_replicas() -> None:
+    global _replicas_checked_at
+    now = time.monotonic()
+    if _replicas_checked_at is not None and now - _replicas_checked_at < DB_REPLICA_LAG_CHECK_SECONDS:
+        return
+    with _replica_lock:
+        if _replicas_checked_at is not None and now - _replicas_checked_at < DB_REPLICA_LAG_CHECK_SECONDS:
+            return
+        with engine.connect() as conn:
+            primary_version = conn.execute(_version_query).scalar() or 0
+        for replica in _replicas:
+            replica.check(primary_version, now)
+        _replicas_checked_at = now
+
+
+def _acquire_replica() -> Optional[Replica]:
+    """Pick a replica within the lag tolerance (None = use the primary) and count the session on it."""
+    if not _replicas:
+        return None
+    _check_replicas()
+    usable = [r for r in _replicas if r.usable()]
+    if not usable:
+        return None
+    with _replica_lock:
+        start = next(_replica_turn) % len(usable)
+        rotated = usable[start:] + usable[:start]
+        replica = min(rotated, key=lambda r: r.in_flight) if DB_REPLICA_STRATEGY == "least_connections" else rotated[0]
+        replica.in_flight += 1
+    return replica
+
+
+def _release_replica(replica: Optional[Replica]) -> None:
+    if replica is not None:
+        with _replica_lock:
+            replica.in_flight -= 1
+
+
+def _mark_read_version(request: Optional[Request], replica: Optional[Replica]) -> None:
+    # response_cache tidak menyimpan jawaban dari replika yang versinya di bawah kunci cache
+    if request is not None and replica is not None:
+        request.state.read_version = replica.version
+
+
+@contextmanager
+def read_session(request: Optional[Request] = None) -> Iterator[Session]:
+    """Session on a replica picked by ``DB_REPLICA_STRATEGY``, or on the primary when none is usable."""
+    replica = _acquire_replica()
+    _mark_read_version(request, replica)
+    db = replica.session_factory() if replica is not None else SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+        _release_replica(replica)
+
+
+def get_read_db(request: Request):
+    """``get_db`` for read-only routes: declaring it routes the request to a read replica."""
+    with read_session(request) as db:
+        yield db
+
+
+async def get_async_read_db(request: Request):
+    # the lag check may query every replica -> keep it off the event loop
+    replica = await run_in_threadpool(_acquire_replica)
+    _mark_read_version(request, replica)
+    try:
+        factory = replica.async_session_factory if replica is not None else AsyncSessionLocal
+        async with factory() as db:
+            yield db
+    finally:
+        _release_replica(replica)
+
+
+async def run_in_read_session(request: Request, fn: Callable[[Session], T]) -> T:
+    """
+    ``fn`` with a sync read session on a threadpool thread. For async handlers
+    whose shared sync code takes thread locks or queries the sync engine
+    (snapshot, reports, data version): inside ``AsyncSession.run_sync`` that
+    would block the event loop.
+    """
+    def call():
+        with read_session(request) as db:
+            return fn(db)
+
+    return await run_in_threadpool(call)
+
+
+@contextmanager
+def primary_session(db: Session) -> Iterator[Session]:
+    """``db`` itself, or a short-lived primary session when ``db`` reads from a replica (for writes)."""
+    if not db.info.get("read_only"):
+        yield db
+        return
+    writer = SessionLocal()
+    try:
+        yield writer
+    finally:
+        writer.close()
+
+
+def get_replica_status() -> List[Dict]:
+    return [
+        {
+            "name": r.name,
+            "version": r.version,
+            "lag_seconds": None if r.error else r.lag(),
+            "usable": r.usable(),
+            "in_flight": r.in_flight,
+            "error": r.error,
+        }
+        for r in _replicas
+    ]
+
+# ✅ Sharding (opsional): DATABASE_SHARD_URLS=url0,url1,... membagi mahasiswa per
+# crc32(student_id) % jumlah shard. Tiap shard memegang tabel students beserta
+# analytics_summary/sketches, indeks nama dan data_version untuk mahasiswanya
+# (DATABASE_URL tidak dipakai untuk data mahasiswa). Urutan URL = nomor shard.
+DATABASE_SHARD_URLS = [u.strip() for u in os.getenv("DATABASE_SHARD_URLS", "").split(",") if u.strip()]
+# id mahasiswa dibagikan dari rentang milik shard: shard i -> i * RANGE + 1 .. (i + 1) * RANGE
+DB_SHARD_ID_RANGE = int(os.getenv("DB_SHARD_ID_RANGE", "100000000"))
+DB_SHARD_SCATTER_WORKERS = int(os.getenv("DB_SHARD_SCATTER_WORKERS", str(4 * len(DATABASE_SHARD_URLS))))
+SHARDING_ENABLED = bool(DATABASE_SHARD_URLS)
+if SHARDING_ENABLED and (ASYNC_DB_ENABLED or DATABASE_REPLICA_URLS):
+    raise RuntimeError("DATABASE_SHARD_URLS cannot be combined with ASYNC_DB_ENABLED or DATABASE_REPLICA_URLS")
+
+shard_engines = [create_instrumented_engine(f"shard_{i}", url) for i, url in enumerate(DATABASE_SHARD_URLS)]
+_shard_session_factories = [
+    sessionmaker(autocommit=False, autoflush=False, bind=shard_engine, info={"shard": i})
+    for i, shard_engine in enumerate(shard_engines)
+]
+_scatter_executor = (
+    ThreadPoolExecutor(max_workers=DB_SHARD_SCATTER_WORKERS, thread_name_prefix="shard") if SHARDING_ENABLED else None
+)
+
+
+def shard_for_student_id(student_id: str) -> int:
+    return zlib.crc32(student_id.encode()) % len(shard_engines) if SHARDING_ENABLED else 0
+
+
+def shard_for_id(student_db_id: int) -> int:
+    index = (student_db_id - 1) // DB_SHARD_ID_RANGE
+    # an id outside every range is looked up (and not found) on shard 0
+    return index if 0 <= index < len(shard_engines) else 0
+
+
+def group_by_shard(items: Iterable[T], student_id: Callable[[T], str]) -> Dict[int, List[T]]:
+    """``items`` bucketed by shard, input order kept (one bucket ``0`` without sharding)."""
+    groups: Dict[int, List[T]] = {}
+    for item in items:
+        groups.setdefault(shard_for_student_id(student_id(item)), []).append(item)
+    return groups
+
+
+@contextmanager
+def student_session(db: Session, student_id: Optional[str] = None, id: Optional[int] = None) -> Iterator[Session]:
+    """
+    Session holding the student with ``student_id`` (or db ``id``): ``db``
+    itself without sharding, else a session on that student's shard. The
+    caller commits, as with ``db``.
+    """
+    if not SHARDING_ENABLED:
+        yield db
+        return
+    index = shard_for_student_id(student_id) if student_id is not None else shard_for_id(id)
+    with _shard_session_factories[index]() as shard_db:
+        yield shard_db
+
+
+def scatter(db: Session, fn: Callable[[Session], T]) -> List[T]:
+    """
+    ``[fn(db)]`` without sharding; else ``fn`` run on every shard in parallel,
+    each with its own session. Results come back in shard order as partials
+    for the caller to merge. ``fn`` must not scatter again.
+    """
+    if not SHARDING_ENABLED:
+        return [fn(db)]
+
+    def run(factory):
+        with factory() as shard_db:
+            return fn(shard_db)
+
+    # copy_context: queries still count towards the request profile
+    futures = [
+        _scatter_executor.submit(contextvars.copy_context().run, run, factory) for factory in _shard_session_factories
+    ]
+    return [future.result() for future in futures]
+
+
+@contextmanager
+def read_sessions() -> Iterator[List[Session]]:
+    """One session per shard (a single ``read_session()`` without sharding), for streamed merges."""
+    if not SHARDING_ENABLED:
+        with read_session() as db:
+            yield [db]
+        return
+    sessions = [factory() for factory in _shard_session_factories]
+    try:
+        yield sessions
+    finally:
+        for shard_db in sessions:
+            shard_db.close()
@@ -1,30 +1,67 @@
 # import_students.py
+import json
 import os
+import time
+from operator import itemgetter
+
+import numpy as np
 import pandas as pd
 from sqlalchemy.orm import Session
 
-from database import SessionLocal, engine, Base
-from modules.items.models import Student
+from database import SessionLocal, engine, Base, group_by_shard, student_session
+from modules.items.migrations import migrate_shards, run_migrations
+from modules.items.services.bulk import upsert_students
+from modules.items.services.categories import category_array
 
 Base.metadata.create_all(bind=engine)
+run_migrations(engine)
+migrate_shards()
 
-CSV_PATH = "data/students_kaggle.csv"
+CSV_PATH = os.getenv("IMPORT_CSV_PATH", "data/students_kaggle.csv")
 USE_FAKE_NAMES = os.getenv("USE_FAKE_NAMES", "1") == "1"
-
-def to_int(v):
-    if pd.isna(v):
-        return None
-    return int(v)
-
-def to_float(v):
-    if pd.isna(v):
-        return None
-    return float(v)
-
-def to_str(v):
-    if pd.isna(v):
-        return None
-    return str(v)
+# rows per read_csv chunk; each chunk is one batched upsert + one commit
+CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "5000"))
+# checkpoint file lets a failed/killed run resume after the last committed chunk
+CHECKPOINT_PATH = os.getenv("IMPORT_CHECKPOINT_PATH", f"{CSV_PATH}.checkpoint")
+RESUME = os.getenv("IMPORT_RESUME", "1") == "1"
+
+COLUMN_MAP = {
+    "Student_ID": "student_id",
+    "First_Name": "first_name",
+    "Last_Name": "last_name",
+    "Email": "email",
+    "Gender": "gender",
+    "Age": "age",
+    "Department": "department",
+    "Attendance (%)": "attendance_percent",
+    "Midterm_Score": "midterm_score",
+    "Final_Score": "final_score",
+    "Assignments_Avg": "assignments_avg",
+    "Quizzes_Avg": "quizzes_avg",
+    "Participation_Score": "participation_score",
+    "Projects_Score": "projects_score",
+    "Total_Score": "total_score",
+    "Grade": "grade",
+    "Study_Hours_per_Week": "study_hours_per_week",
+    "Extracurricular_Activities": "extracurricular_activities",
+    "Internet_Access_at_Home": "internet_access_at_home",
+    "Parent_Education_Level": "parent_education_level",
+    "Family_Income_Level": "family_income_level",
+    "Stress_Level (1-10)": "stress_level",
+    "Sleep_Hours_per_Night": "sleep_hours_per_night",
+}
+
+INT_COLUMNS = ["age", "stress_level"]
+FLOAT_COLUMNS = [
+    "attendance_percent", "midterm_score", "final_score", "assignments_avg", "quizzes_avg",
+    "participation_score", "projects_score", "total_score", "study_hours_per_week",
+    "sleep_hours_per_night",
+]
+STR_COLUMNS = [
+    "student_id", "first_name", "last_name", "email", "gender", "department", "grade",
+    "extracurricular_activities", "internet_access_at_home", "parent_education_level",
+    "family_income_level",
+]
 
 # 50 x 100 = 5000 unique name combinations to cover the full dataset deterministically
 FIRST_NAMES = [
@@ -64,82 +101,126 @@ def generate_fake_identity(student_id: str):
     email = f"{first.lower()}.{last.lower()}_{str(student_id).lower()}@example.edu"
     return first, last, email
 
-def import_students():
-    df = pd.read_csv(CSV_PATH)
-
-    df = df.rename(columns={
-        "Student_ID": "student_id",
-        "First_Name": "first_name",
-        "Last_Name": "last_name",
-        "Email": "email",
-        "Gender": "gender",
-        "Age": "age",
-        "Department": "department",
-        "Attendance (%)": "attendance_percent",
-        "Midterm_Score": "midterm_score",
-        "Final_Score": "final_score",
-        "Assignments_Avg": "assignments_avg",
-        "Quizzes_Avg": "quizzes_avg",
-        "Participation_Score": "participation_score",
-        "Projects_Score": "projects_score",
-        "Total_Score": "total_score",
-        "Grade": "grade",
-        "Study_Hours_per_Week": "study_hours_per_week",
-        "Extracurricular_Activities": "extracurricular_activities",
-        "Internet_Access_at_Home": "internet_access_at_home",
-        "Parent_Education_Level": "parent_education_level",
-        "Family_Income_Level": "family_income_level",
-        "Stress_Level (1-10)": "stress_level",
-        "Sleep_Hours_per_Night": "sleep_hours_per_night",
-    })
+def _str_column(series: pd.Series) -> list:
+    values = series.astype(str).astype(object)
+    values[series.isna().to_numpy()] = None
+    return values.tolist()
+
+def _float_column(series: pd.Series) -> list:
+    values = pd.to_numeric(series, errors="coerce").to_numpy(dtype=float)
+    out = values.astype(object)
+    out[np.isnan(values)] = None
+    return out.tolist()
+
+def _int_column(series: pd.Series) -> list:
+    values = pd.to_numeric(series, errors="coerce").to_numpy(dtype=float)
+    missing = np.isnan(values)
+    out = np.trunc(np.where(missing, 0, values)).astype(np.int64).astype(object)
+    out[missing] = None
+    return out.tolist()
+
+def _fake_identity_columns(student_ids: pd.Series):
+    """Vectorized ``generate_fake_identity`` for a whole chunk."""
+    digits = student_ids.str.replace(r"\D", "", regex=True)
+    idx = pd.to_numeric(digits.where(digits != ""), errors="coerce")
+    no_digits = idx.isna()
+    if no_digits.any():
+        idx[no_digits] = [abs(hash(sid)) for sid in student_ids[no_digits]]
+    idx = idx.astype(np.int64).to_numpy()
+
+    first = np.asarray(FIRST_NAMES, dtype=object)[idx % len(FIRST_NAMES)]
+    last = np.asarray(LAST_NAMES, dtype=object)[(idx // len(FIRST_NAMES)) % len(LAST_NAMES)]
+    email = (
+        pd.Series(first).str.lower() + "." + pd.Series(last).str.lower()
+        + "_" + student_ids.str.lower().to_numpy() + "@example.edu"
+    )
+    return first.tolist(), last.tolist(), email.tolist()
+
+def _chunk_to_rows(df: pd.DataFrame) -> list:
+    df = df.rename(columns=COLUMN_MAP).reindex(columns=list(COLUMN_MAP.values()))
+    df = df[df["student_id"].notna()]
+
+    columns = {}
+    for col in STR_COLUMNS:
+        columns[col] = _str_column(df[col])
+    for col in FLOAT_COLUMNS:
+        columns[col] = _float_column(df[col])
+    for col in INT_COLUMNS:
+        columns[col] = _int_column(df[col])
+    columns["participation_category"] = category_array(
+        pd.to_numeric(df["participation_score"], errors="coerce").to_numpy(dtype=float)
+    )
+
+    if USE_FAKE_NAMES:
+        student_ids = pd.Series(columns["student_id"], dtype=object)
+        columns["first_name"], columns["last_name"], columns["email"] = _fake_identity_columns(student_ids)
+
+    names = list(columns.keys())
+    return [dict(zip(names, values)) for values in zip(*columns.values())]
+
+def _read_checkpoint() -> int:
+    if not RESUME or not os.path.exists(CHECKPOINT_PATH):
+        return 0
+    with open(CHECKPOINT_PATH) as fh:
+        state = json.load(fh)
+    if state.get("csv_path") != CSV_PATH:
+        return 0
+    return int(state.get("rows_done", 0))
+
+def _write_checkpoint(rows_done: int) -> None:
+    tmp_path = f"{CHECKPOINT_PATH}.tmp"
+    with open(tmp_path, "w") as fh:
+        json.dump({"csv_path": CSV_PATH, "rows_done": rows_done}, fh)
+    os.replace(tmp_path, CHECKPOINT_PATH)
+
+def _clear_checkpoint() -> None:
+    if os.path.exists(CHECKPOINT_PATH):
+        os.remove(CHECKPOINT_PATH)
 
+def import_students():
+    """
+    Stream ``CSV_PATH`` in ``CHUNK_SIZE`` chunks and upsert each chunk on
+    ``student_id`` with one batched statement + one commit. Re-running is
+    idempotent; after a failure the next run resumes from the checkpoint.
+    """
+    rows_done = _read_checkpoint()
+    if rows_done:
+        print(f"↻ Melanjutkan import dari baris {rows_done}")
+
+    reader = pd.read_csv(
+        CSV_PATH,
+        chunksize=CHUNK_SIZE,
+        dtype={"Student_ID": str},
+        skiprows=range(1, rows_done + 1) if rows_done else None,
+    )
+
+    started = time.perf_counter()
+    imported = 0
     db: Session = SessionLocal()
     try:
-        for _, row in df.iterrows():
-            student_id = to_str(row.get("student_id"))
-
-            if USE_FAKE_NAMES:
-                fake_first, fake_last, fake_email = generate_fake_identity(student_id)
-                first_name = fake_first
-                last_name = fake_last
-                email = fake_email
-            else:
-                first_name = to_str(row.get("first_name"))
-                last_name = to_str(row.get("last_name"))
-                email = to_str(row.get("email"))
-
-            student = Student(
-                student_id=student_id,
-                first_name=first_name,
-                last_name=last_name,
-                email=email,
-                gender=to_str(row.get("gender")),
-                age=to_int(row.get("age")),
-                department=to_str(row.get("department")),
-                attendance_percent=to_float(row.get("attendance_percent")),
-                midterm_score=to_float(row.get("midterm_score")),
-                final_score=to_float(row.get("final_score")),
-                assignments_avg=to_float(row.get("assignments_avg")),
-                quizzes_avg=to_float(row.get("quizzes_avg")),
-                participation_score=to_float(row.get("participation_score")),
-                projects_score=to_float(row.get("projects_score")),
-                total_score=to_float(row.get("total_score")),
-                grade=to_str(row.get("grade")),
-                study_hours_per_week=to_float(row.get("study_hours_per_week")),
-                extracurricular_activities=to_str(row.get("extracurricular_activities")),
-                internet_access_at_home=to_str(row.get("internet_access_at_home")),
-                parent_education_level=to_str(row.get("parent_education_level")),
-                family_income_level=to_str(row.get("family_income_level")),
-                stress_level=to_int(row.get("stress_level")),
-                sleep_hours_per_night=to_float(row.get("sleep_hours_per_night")),
-            )
-            db.add(student)
-
-        db.commit()
-        print("✅ Import selesai")
+        for chunk in reader:
+            chunk_started = time.perf_counter()
+            rows = _chunk_to_rows(chunk)
+            # satu upsert + commit per shard (satu saja tanpa sharding)
+            for shard_rows in group_by_shard(rows, itemgetter("student_id")).values():
+                with student_session(db, shard_rows[0]["student_id"]) as shard_db:
+                    upsert_students(shard_db, shard_rows)
+                    shard_db.commit()
+
+            rows_done += len(chunk)
+            imported += len(rows)
+            _write_checkpoint(rows_done)
+
+            chunk_elapsed = time.perf_counter() - chunk_started
+            print(f"  chunk {len(rows)} baris, {len(rows) / max(chunk_elapsed, 1e-9):,.0f} rows/s (total {rows_done})")
+
+        _clear_checkpoint()
+        elapsed = time.perf_counter() - started
+        print(f"✅ Import selesai: {imported} baris dalam {elapsed:.1f}s ({imported / max(elapsed, 1e-9):,.0f} rows/s)")
+        return {"rows": imported, "seconds": elapsed}
     except Exception as e:
         db.rollback()
-        print("❌ Error saat import:", e)
+        print(f"❌ Error saat import (berhenti di baris {rows_done}, jalankan ulang untuk melanjutkan):", e)
     finally:
         db.close()
 
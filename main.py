@@ -1,17 +1,44 @@
 # main.py
 from fastapi import FastAPI
-from database import Base, engine
-from auth import router as auth_router
-from modules.items.routes.students import router as students_router
-from modules.items.routes.analytics import router as analytics_router
-from modules.items.routes.participations import router as participations_router
+from database import ASYNC_DB_ENABLED, Base, engine
 
-# create all tables
+if ASYNC_DB_ENABLED:
+    # handler async (AsyncSession + driver async) yang memanggil handler sync
+    # yang sama lewat AsyncSession.run_sync -> tanpa antrean threadpool
+    from modules.items.routes.aio.auth import router as auth_router
+    from modules.items.routes.aio.students import router as students_router
+    from modules.items.routes.aio.analytics import router as analytics_router
+    from modules.items.routes.aio.participations import router as participations_router
+else:
+    from auth import router as auth_router
+    from modules.items.routes.students import router as students_router
+    from modules.items.routes.analytics import router as analytics_router
+    from modules.items.routes.participations import router as participations_router
+from modules.items.routes.metrics import router as metrics_router
+from modules.items.routes.system import router as system_router
+from modules.items.migrations import migrate_shards, run_migrations
+from modules.items.services.hashing import shutdown_hashing_pool
+from modules.items.services.profiling import PROFILING_ENABLED, ProfilingMiddleware
+from modules.items.services.reports import start_report_worker, stop_report_worker
+from modules.items.services.serialization import TimedJSONResponse
+
+# create all tables (on every shard too when DATABASE_SHARD_URLS is set)
 Base.metadata.create_all(bind=engine)
+run_migrations(engine)
+migrate_shards()
 
-app = FastAPI(title="E-Learning Activity Tracker")
+app = FastAPI(title="E-Learning Activity Tracker", default_response_class=TimedJSONResponse)
+app.add_event_handler("shutdown", shutdown_hashing_pool)
+# precomputes /analytics/low-activity & /activity-correlation in the background
+app.add_event_handler("startup", start_report_worker)
+app.add_event_handler("shutdown", stop_report_worker)
+if PROFILING_ENABLED:
+    # latency/query/serialization per route -> GET /metrics
+    app.add_middleware(ProfilingMiddleware)
 
 app.include_router(auth_router)
 app.include_router(students_router)
 app.include_router(analytics_router)
 app.include_router(participations_router)
+app.include_router(system_router)
+app.include_router(metrics_router)
@@ -0,0 +1,112 @@
+# modules/items/migrations.py
+from typing import Optional
+
+from sqlalchemy import exists, func, inspect, select, text, update
+from sqlalchemy.orm import Session
+
+from database import DB_SHARD_ID_RANGE, Base, shard_engines
+from modules.items.models import Student, StudentNameTrigram
+from modules.items.services.categories import category_case
+from modules.items.services.search import rebuild_name_index
+from modules.items.services.versioning import ensure_data_version_row
+
+
+def _ensure_participation_category(engine) -> None:
+    """
+    Add ``participation_category`` + its indexes to a ``students`` table
+    created before the column existed, then backfill rows missing it.
+    """
+    table = Student.__table__
+    columns = {c["name"] for c in inspect(engine).get_columns(table.name)}
+    with engine.begin() as conn:
+        if "participation_category" not in columns:
+            conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN participation_category VARCHAR(20)"))
+        for index in table.indexes:
+            if any(c.name.startswith("participation_") for c in index.columns):
+                index.create(conn, checkfirst=True)
+        conn.execute(
+            update(table)
+            .where(table.c.participation_score.isnot(None), table.c.participation_category.is_(None))
+            .values(participation_category=category_case(table.c.participation_score))
+        )
+
+
+def _ensure_score_delta(engine) -> None:
+    """
+    Add the generated ``score_delta`` column + its index to a ``students``
+    table that predates it (the database computes it, no backfill).
+    """
+    table = Student.__table__
+    columns = {c["name"] for c in inspect(engine).get_columns(table.name)}
+    # PostgreSQL only has stored generated columns; MySQL and SQLite can add a virtual one in place
+    storage = "STORED" if engine.dialect.name == "postgresql" else "VIRTUAL"
+    with engine.begin() as conn:
+        if "score_delta" not in columns:
+            conn.execute(text(
+                f"ALTER TABLE {table.name} ADD COLUMN score_delta FLOAT "
+                f"GENERATED ALWAYS AS (final_score - midterm_score) {storage}"
+            ))
+        for index in table.indexes:
+            if "score_delta" in index.columns:
+                index.create(conn, checkfirst=True)
+
+
+def _ensure_name_index(engine) -> None:
+    """Build the name-search trigram index for students that predate it."""
+    with Session(engine) as db:
+        has_students = db.execute(select(exists().where(Student.id.isnot(None)))).scalar()
+        has_index = db.execute(select(exists().where(StudentNameTrigram.id.isnot(None)))).scalar()
+        if has_students and not has_index:
+            rebuild_name_index(db)
+            db.commit()
+
+
+def _ensure_data_version(engine) -> None:
+    with Session(engine) as db:
+        ensure_data_version_row(db)
+        db.commit()
+
+
+def _ensure_shard_id_range(engine, shard: int) -> None:
+    """
+    Start ``students.id`` at the shard's range so ids stay unique across
+    shards (a row's shard follows from its id). Refuses a shard holding ids
+    of another range, e.g. a pre-sharding database listed as shard 1.
+    """
+    table = Student.__table__
+    low, high = shard * DB_SHARD_ID_RANGE, (shard + 1) * DB_SHARD_ID_RANGE
+    with engine.begin() as conn:
+        min_id, max_id = conn.execute(select(func.min(table.c.id), func.max(table.c.id))).one()
+        if min_id is not None and (min_id <= low or max_id > high):
+            raise RuntimeError(
+                f"shard {shard} holds students.id {min_id}..{max_id} outside {low + 1}..{high}; re-import it"
+            )
+        if shard == 0 or max_id is not None:
+            return
+        dialect = engine.dialect.name
+        if dialect == "sqlite":
+            conn.execute(text("DELETE FROM sqlite_sequence WHERE name = :name"), {"name": table.name})
+            conn.execute(text("INSERT INTO sqlite_sequence (name, seq) VALUES (:name, :seq)"), {"name": table.name, "seq": low})
+        elif dialect == "mysql":
+            conn.execute(text(f"ALTER TABLE {table.name} AUTO_INCREMENT = {low + 1}"))
+        elif dialect == "postgresql":
+            conn.execute(text(f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), {low})"))
+        else:
+            raise RuntimeError(f"cannot set the students.id start on {dialect}")
+
+
+def run_migrations(engine, shard: Optional[int] = None) -> None:
+    """Idempotent schema upgrades that ``Base.metadata.create_all`` cannot do."""
+    _ensure_score_delta(engine)
+    _ensure_participation_category(engine)
+    _ensure_name_index(engine)
+    _ensure_data_version(engine)
+    if shard is not None:
+        _ensure_shard_id_range(engine, shard)
+
+
+def migrate_shards() -> None:
+    """``create_all`` + ``run_migrations`` on every ``DATABASE_SHARD_URLS`` shard (no-op without sharding)."""
+    for shard, shard_engine in enumerate(shard_engines):
+        Base.metadata.create_all(bind=shard_engine)
+        run_migrations(shard_engine, shard=shard)
@@ -1,9 +1,18 @@
 # modules/items/models.py
-from sqlalchemy import Column, Integer, String, Float
-from database import Base  # database.py di root
+from sqlalchemy import BigInteger, Boolean, Column, Computed, DateTime, Double, Index, Integer, String, Float, Text, event
+from database import SHARDING_ENABLED, Base  # database.py di root
+from modules.items.services.categories import score_to_category
 
 class Student(Base):
     __tablename__ = "students"
+    __table_args__ = (
+        # /participations/{category}: filter kategori + urut skor langsung dari index
+        Index("ix_students_participation_category_score", "participation_category", "participation_score"),
+        # /analytics/activity-trend: top-N naik/turun dibaca dari ujung index, LIMIT berhenti lebih awal
+        Index("ix_students_score_delta", "score_delta"),
+        # SQLite hanya bisa memulai id dari rentang shard (migrations.py) lewat sqlite_sequence
+        {"sqlite_autoincrement": SHARDING_ENABLED},
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     student_id = Column(String(50), unique=True, index=True, nullable=False)
@@ -20,9 +29,14 @@ class Student(Base):
     attendance_percent = Column(Float, nullable=True)
     midterm_score = Column(Float, nullable=True)
     final_score = Column(Float, nullable=True)
+    # final_score - midterm_score, dihitung DB sendiri (generated column) jadi semua
+    # jalur tulis -- termasuk import_students.py -- otomatis menjaganya
+    score_delta = Column(Float, Computed("final_score - midterm_score"), nullable=True)
     assignments_avg = Column(Float, nullable=True)
     quizzes_avg = Column(Float, nullable=True)
-    participation_score = Column(Float, nullable=True)
+    participation_score = Column(Float, nullable=True, index=True)
+    # turunan dari participation_score (lihat services/categories.py), dijaga saat insert/update
+    participation_category = Column(String(20), nullable=True)
     projects_score = Column(Float, nullable=True)
     total_score = Column(Float, nullable=True)
     grade = Column(String(2), nullable=True)
@@ -34,3 +48,68 @@ class Student(Base):
     family_income_level = Column(String(20), nullable=True)
     stress_level = Column(Integer, nullable=True)
     sleep_hours_per_night = Column(Float, nullable=True)
+
+
+class AnalyticsSummary(Base):
+    """
+    Running sums per (metric, final_score)-style pair, kept up to date by the
+    write paths so Pearson r and means are O(1) reads (services/summary.py).
+    """
+    __tablename__ = "analytics_summary"
+
+    metric = Column(String(50), primary_key=True)
+    n = Column(Integer, nullable=False, default=0)
+    sum_x = Column(Double, nullable=False, default=0.0)
+    sum_y = Column(Double, nullable=False, default=0.0)
+    sum_xy = Column(Double, nullable=False, default=0.0)
+    sum_x2 = Column(Double, nullable=False, default=0.0)
+    sum_y2 = Column(Double, nullable=False, default=0.0)
+    updated_at = Column(DateTime, nullable=True)
+
+
+class AnalyticsSketch(Base):
+    """
+    Serialized KLL quantile sketch per metric column (services/sketch.py).
+    Inserts are folded in incrementally; a write that replaces or removes a
+    value marks the sketch ``stale`` and the next read rebuilds it.
+    """
+    __tablename__ = "analytics_sketches"
+
+    metric = Column(String(50), primary_key=True)
+    n = Column(Integer, nullable=False, default=0)
+    data = Column(Text, nullable=False)
+    stale = Column(Boolean, nullable=False, default=False)
+    updated_at = Column(DateTime, nullable=True)
+
+
+class StudentNameTrigram(Base):
+    """
+    Trigram index over lower-cased "first last" names (services/search.py),
+    maintained by every write path so name search never scans ``students``.
+    """
+    __tablename__ = "student_name_trigrams"
+    __table_args__ = (
+        Index("ix_student_name_trigrams_trigram", "trigram", "student_id"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    trigram = Column(String(3), nullable=False)
+    student_id = Column(String(50), nullable=False, index=True)
+
+
+class DataVersion(Base):
+    """
+    Single-row counter bumped in every transaction that writes ``students``
+    (API and importer alike); caches key on it (services/versioning.py).
+    """
+    __tablename__ = "data_version"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=True)
+
+
+@event.listens_for(Student, "before_insert")
+@event.listens_for(Student, "before_update")
+def _sync_participation_category(mapper, connection, target):
+    target.participation_category = score_to_category(target.participation_score)
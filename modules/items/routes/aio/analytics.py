@@ -0,0 +1,98 @@
+# modules/items/routes/aio/analytics.py
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import get_async_read_db, run_in_read_session
+from modules.items.models import Student
+from modules.items.routes import analytics
+from modules.items.routes.aio.auth import get_current_admin, get_current_student
+from modules.items.services.response_cache import CachedRoute
+
+router = APIRouter(
+    prefix="/analytics",
+    tags=["analytics"],
+    route_class=CachedRoute,
+)
+
+@router.get("/study-duration")
+async def study_duration(
+    db: AsyncSession = Depends(get_async_read_db),
+    current_admin: dict = Depends(get_current_admin),
+):
+    return await db.run_sync(lambda s: analytics.study_duration(db=s, current_admin=current_admin))
+
+@router.get("/final-grade/me")
+async def final_grade_me(current_student: Student = Depends(get_current_student)):
+    # no DB access: the handler only reads the loaded principal
+    return analytics.final_grade_me(current_student=current_student)
+
+@router.get("/study-duration/{department}")
+async def study_duration_by_department(
+    department: str,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    format: Literal["json", "ndjson"] = "json",
+    db: AsyncSession = Depends(get_async_read_db),
+    current_admin: dict = Depends(get_current_admin),
+):
+    return await db.run_sync(lambda s: analytics.study_duration_by_department(
+        department, limit, cursor, format, db=s, current_admin=current_admin,
+    ))
+
+@router.get("/study-duration/{department}/{student_name}")
+async def study_duration_by_department_and_student(
+    department: str,
+    student_name: str,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_admin: dict = Depends(get_current_admin),
+):
+    return await db.run_sync(lambda s: analytics.study_duration_by_department_and_student(
+        department, student_name, db=s, current_admin=current_admin,
+    ))
+
+@router.get("/activity-correlation/final-score")
+async def activity_correlation_final_score(
+    request: Request,
+    exact: bool = False,
+    fresh: bool = False,
+    current_admin: dict = Depends(get_current_admin),
+):
+    # report lock + data version (sync engine): off the event loop
+    return await run_in_read_session(request, lambda s: analytics.activity_correlation_final_score(
+        request, exact, fresh, db=s, current_admin=current_admin,
+    ))
+
+@router.get("/low-activity")
+async def low_activity_students(
+    request: Request,
+    min_low_metrics: int = 2,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    format: Literal["json", "ndjson"] = "json",
+    exact: bool = False,
+    fresh: bool = False,
+    current_admin: dict = Depends(get_current_admin),
+):
+    return await run_in_read_session(request, lambda s: analytics.low_activity_students(
+        request, min_low_metrics, limit, cursor, format, exact, fresh, db=s, current_admin=current_admin,
+    ))
+
+@router.get("/activity-trend")
+async def activity_trend(
+    request: Request,
+    top_n: int = 10,
+    exact: bool = False,
+    current_admin: dict = Depends(get_current_admin),
+):
+    # the stored summary may be rebuilt on read (on a primary session when reading from a replica)
+    return await run_in_read_session(request, lambda s: analytics.activity_trend(top_n, exact, db=s, current_admin=current_admin))
+
+@router.get("/activity-trend/{student_id}")
+async def activity_trend_student(
+    student_id: str,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_admin: dict = Depends(get_current_admin),
+):
+    return await db.run_sync(lambda s: analytics.activity_trend_student(student_id, db=s, current_admin=current_admin))
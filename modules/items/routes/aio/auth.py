@@ -0,0 +1,52 @@
+# modules/items/routes/aio/auth.py
+from typing import Dict
+
+from fastapi import APIRouter, Depends, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import auth
+from database import get_async_db
+from modules.items.models import Student
+from modules.items.schema.schemas import Token
+from modules.items.services import hashing
+from modules.items.services.versioning import current_data_version
+
+router = APIRouter(prefix="/auth", tags=["auth"])
+
+async def get_current_user(
+    token: str = Depends(auth.oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db),
+) -> Dict:
+    return await db.run_sync(lambda s: auth.resolve_current_user(token, s))
+
+async def get_current_admin(current_user: Dict = Depends(get_current_user)) -> Dict:
+    return auth.get_current_admin(current_user)
+
+async def get_current_student(current_user: Dict = Depends(get_current_user)) -> Student:
+    return auth.get_current_student(current_user)
+
+@router.post("/login", response_model=Token)
+async def login(request: Request, form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
+    auth.check_login_rate(form_data.username, request.client.host if request.client else None)
+    user = auth.authenticate_admin(form_data.username, form_data.password)
+    if not user:
+        # the data version is read through the sync engine -> threadpool, not the event loop
+        version = await run_in_threadpool(current_data_version)
+        student = await db.run_sync(lambda s: auth.lookup_student_credentials(form_data.username, s, version))
+        if not student or not student.hashed_password:
+            # same cost as a wrong password, so unknown usernames don't answer faster
+            await hashing.averify_and_update(form_data.password, auth.DUMMY_PASSWORD_HASH)
+        else:
+            # pbkdf2 is CPU-bound: verified in the hashing process pool, awaited without a thread
+            valid, new_hash = await hashing.averify_and_update(form_data.password, student.hashed_password)
+            if valid:
+                if new_hash:
+                    await db.run_sync(lambda s: auth.store_rehashed_password(s, student.id, new_hash))
+                user = auth.student_identity(form_data.username, student)
+    return auth.issue_token(user)
+
+@router.get("/me")
+async def read_me(current_user: Dict = Depends(get_current_user)):
+    return auth.read_me(current_user)
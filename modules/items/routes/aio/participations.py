@@ -0,0 +1,94 @@
+# modules/items/routes/aio/participations.py
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import get_async_read_db, run_in_read_session
+from modules.items.models import Student
+from modules.items.routes import participations
+from modules.items.routes.aio.auth import get_current_admin, get_current_student
+from modules.items.services.response_cache import CachedRoute
+
+router = APIRouter(
+    prefix="/participations",
+    tags=["participations"],
+    route_class=CachedRoute,
+)
+
+@router.get("/")
+async def list_participations(
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    format: Literal["json", "ndjson"] = "json",
+    db: AsyncSession = Depends(get_async_read_db),
+    current_admin: dict = Depends(get_current_admin),
+):
+    return await db.run_sync(lambda s: participations.list_participations(
+        limit, cursor, format, db=s, current_admin=current_admin,
+    ))
+
+@router.get("/very-good")
+async def participations_very_good(
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    format: Literal["json", "ndjson"] = "json",
+    db: AsyncSession = Depends(get_async_read_db),
+    current_admin: dict = Depends(get_current_admin),
+):
+    return await db.run_sync(lambda s: participations.participations_very_good(
+        limit, cursor, format, db=s, current_admin=current_admin,
+    ))
+
+@router.get("/good")
+async def participations_good(
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    format: Literal["json", "ndjson"] = "json",
+    db: AsyncSession = Depends(get_async_read_db),
+    current_admin: dict = Depends(get_current_admin),
+):
+    return await db.run_sync(lambda s: participations.participations_good(
+        limit, cursor, format, db=s, current_admin=current_admin,
+    ))
+
+@router.get("/average")
+async def participations_average(
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    format: Literal["json", "ndjson"] = "json",
+    db: AsyncSession = Depends(get_async_read_db),
+    current_admin: dict = Depends(get_current_admin),
+):
+    return await db.run_sync(lambda s: participations.participations_average(
+        limit, cursor, format, db=s, current_admin=current_admin,
+    ))
+
+@router.get("/bad")
+async def participations_bad(
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    format: Literal["json", "ndjson"] = "json",
+    db: AsyncSession = Depends(get_async_read_db),
+    current_admin: dict = Depends(get_current_admin),
+):
+    return await db.run_sync(lambda s: participations.participations_bad(
+        limit, cursor, format, db=s, current_admin=current_admin,
+    ))
+
+@router.get("/overview")
+async def participations_overview(
+    request: Request,
+    top_n: int = Query(5, ge=0),
+    bin_width: float = Query(10, gt=0, le=100),
+    current_admin: dict = Depends(get_current_admin),
+):
+    # shared snapshot: lock + data version (sync engine), off the event loop
+    return await run_in_read_session(request, lambda s: participations.participations_overview(
+        top_n, bin_width, db=s, current_admin=current_admin,
+    ))
+
+@router.get("/me")
+async def participations_me(current_student: Student = Depends(get_current_student)):
+    # no DB access: the handler only reads the loaded principal
+    return participations.participations_me(current_student=current_student)
@@ -0,0 +1,90 @@
+# modules/items/routes/aio/students.py
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, Depends, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import get_async_db, get_async_read_db
+from modules.items.routes import students
+from modules.items.routes.aio.auth import get_current_admin, get_current_user
+from modules.items.schema.schemas import PasswordUpdate, StudentCreate, StudentOut
+from modules.items.services import hashing
+from modules.items.services.serialization import FastJSONResponse
+
+router = APIRouter(
+    prefix="/students",
+    tags=["students"],
+)
+
+@router.get("/", response_model=List[StudentOut])
+async def list_students(
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    format: Literal["json", "ndjson"] = "json",
+    db: AsyncSession = Depends(get_async_read_db),
+    current_admin: dict = Depends(get_current_admin),
+):
+    return await db.run_sync(lambda s: students.list_students(
+        skip, limit, cursor, format, db=s, current_admin=current_admin,
+    ))
+
+@router.get("/search", response_model=List[StudentOut])
+async def search_students_by_name(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(50, ge=1, le=1000),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_admin: dict = Depends(get_current_admin),
+):
+    return await db.run_sync(lambda s: students.search_students_by_name(q, limit, db=s, current_admin=current_admin))
+
+@router.get("/id/{id}", response_model=StudentOut)
+async def get_student_by_id(
+    id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_admin: dict = Depends(get_current_admin),
+):
+    return await db.run_sync(lambda s: students.get_student_by_id(id, db=s, current_admin=current_admin))
+
+@router.get("/{student_id}", response_model=StudentOut)
+async def get_student_by_student_id(
+    student_id: str,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: dict = Depends(get_current_user),
+):
+    return await db.run_sync(lambda s: students.get_student_by_student_id(
+        student_id, db=s, current_user=current_user,
+    ))
+
+@router.post("/", response_model=StudentOut)
+async def create_student(
+    student_in: StudentCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_admin: dict = Depends(get_current_admin),
+):
+    await db.run_sync(lambda s: students.ensure_student_id_free(s, student_in.student_id))
+    # pbkdf2 awaited in the hashing pool; run_sync would block the event loop on it
+    hashed_password = await hashing.ahash_password(student_in.password) if student_in.password else None
+    return await db.run_sync(lambda s: students.insert_student(s, student_in, hashed_password))
+
+@router.post("/bulk")
+async def bulk_write(
+    request: Request,
+    mode: Literal["upsert", "create", "update"] = "upsert",
+    db: AsyncSession = Depends(get_async_db),
+    current_admin: dict = Depends(get_current_admin),
+):
+    records = students.parse_bulk_payload(await request.body(), request.headers.get("content-type", ""))
+    results, valid = students.validate_bulk_records(records)
+    students.set_password_hashes(valid, await hashing.ahash_passwords(students.bulk_passwords(valid)))
+    return FastJSONResponse(await db.run_sync(lambda s: students.write_valid_students(s, results, valid, mode)))
+
+@router.post("/{student_id}/password", response_model=StudentOut)
+async def set_student_password(
+    student_id: str,
+    payload: PasswordUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_admin: dict = Depends(get_current_admin),
+):
+    hashed_password = await hashing.ahash_password(payload.password)
+    return await db.run_sync(lambda s: students.store_student_password(s, student_id, hashed_password))
@@ -1,105 +1,91 @@
 # modules/items/routes/analytics.py
-import math
+from operator import attrgetter
+from typing import Literal, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import func, or_
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 
 from auth import get_current_admin, get_current_student
-from database import get_db
+from database import get_read_db, student_session
 from modules.items.models import Student
+from modules.items.services import reports, stats
+from modules.items.services.aggregates import AggregateQuery
+from modules.items.services.pagination import decode_cursor, encode_cursor, merged_rows, ndjson_response, stream_query_ndjson
+from modules.items.services.projections import STUDY, TREND, TREND_DETAIL
+from modules.items.services.response_cache import CachedRoute
+from modules.items.services.search import search_students
+from modules.items.services.serialization import FastJSONResponse
+from modules.items.services.snapshot import get_student_snapshot
+from modules.items.services.summary import get_sketches, get_summary
 
 router = APIRouter(
     prefix="/analytics",
     tags=["analytics"],
+    route_class=CachedRoute,
 )
 
 def _to_float(v):
     return float(v) if v is not None else None
 
-def _mean(values):
-    return sum(values) / len(values) if values else None
-
-def _pearson(xs, ys):
-    if len(xs) < 2 or len(ys) < 2 or len(xs) != len(ys):
-        return None
-    mx, my = _mean(xs), _mean(ys)
-    num = sum((x - mx) * (y - my) for x, y in zip(xs, ys))
-    den_x = math.sqrt(sum((x - mx) ** 2 for x in xs))
-    den_y = math.sqrt(sum((y - my) ** 2 for y in ys))
-    if den_x == 0 or den_y == 0:
-        return None
-    return num / (den_x * den_y)
+def _department_profiles(db: Session, *filters):
+    """Every department's study-hours profile from a single grouped SELECT."""
+    return (
+        AggregateQuery(Student.department)
+        .add("student_count", "count", Student.study_hours_per_week)
+        .add("sum_hours_per_week", "sum", Student.study_hours_per_week)
+        .add("avg_hours_per_week", "avg", Student.study_hours_per_week)
+        .add("avg_attendance_percent", "avg", Student.attendance_percent)
+        .add("avg_midterm_score", "avg", Student.midterm_score)
+        .add("avg_final_score", "avg", Student.final_score)
+        .add("avg_stress_level", "avg", Student.stress_level)
+        .add("avg_sleep_hours_per_night", "avg", Student.sleep_hours_per_night)
+        .run(db, *filters)
+    )
 
-def _percentile(values, q):
-    if not values:
-        return None
-    ordered = sorted(values)
-    k = (len(ordered) - 1) * q
-    f = math.floor(k)
-    c = math.ceil(k)
-    if f == c:
-        return ordered[int(k)]
-    return ordered[f] + (ordered[c] - ordered[f]) * (k - f)
+def _study_payload(s):
+    return {
+        "id": s.id,
+        "student_id": s.student_id,
+        "name": " ".join(filter(None, [s.first_name, s.last_name])),
+        "study_hours_per_week": _to_float(s.study_hours_per_week),
+        "attendance_percent": _to_float(s.attendance_percent),
+        "midterm_score": _to_float(s.midterm_score),
+        "final_score": _to_float(s.final_score),
+        "grade": s.grade,
+        "stress_level": _to_float(s.stress_level),
+        "sleep_hours_per_night": _to_float(s.sleep_hours_per_night),
+    }
 
 @router.get("/study-duration")
 def study_duration(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_admin: dict = Depends(get_current_admin),
 ):
-    overall = (
-        db.query(func.avg(Student.study_hours_per_week))
-        .filter(Student.study_hours_per_week.isnot(None))
-        .scalar()
-    )
+    profiles = _department_profiles(db)
 
-    by_department = (
-        db.query(
-            Student.department,
-            func.avg(Student.study_hours_per_week),
-            func.count(Student.id),
-        )
-        .filter(Student.department.isnot(None), Student.study_hours_per_week.isnot(None))
-        .group_by(Student.department)
-        .all()
-    )
+    # overall average over every row (NULL department included), from the same grouped result
+    total_count = sum(p["student_count"] for p in profiles.values())
+    total_hours = sum(p["sum_hours_per_week"] or 0.0 for p in profiles.values())
+    overall = total_hours / total_count if total_count else None
 
     return {
-        "overall_avg_hours_per_week": _to_float(overall),
+        "overall_avg_hours_per_week": overall,
         "by_department": [
             {
                 "department": dept,
-                "avg_hours_per_week": _to_float(avg),
-                "student_count": count,
+                "avg_hours_per_week": profile["avg_hours_per_week"],
+                "student_count": profile["student_count"],
             }
-            for dept, avg, count in by_department
+            for dept, profile in profiles.items()
+            if dept is not None and profile["student_count"]
         ],
     }
 
 @router.get("/final-grade/me")
-def final_grade_me(
-    db: Session = Depends(get_db),
-    current_student: Student = Depends(get_current_student),
-):
-    student = db.query(Student).filter(Student.id == current_student.id).first()
-    if not student:
-        return {
-            "student_id": current_student.student_id,
-            "name": _name(current_student),
-            "final_score": None,
-            "midterm_score": None,
-            "assignments_avg": None,
-            "quizzes_avg": None,
-            "participation_score": None,
-            "projects_score": None,
-            "total_score": None,
-            "activity_grades": {
-                "study_hours_per_week": None,
-                "extracurricular_activities": None,
-                "stress_level": None,
-            },
-            "note": "Student not found.",
-        }
+def final_grade_me(current_student: Student = Depends(get_current_student)):
+    # the principal is the full Student row (loaded from its shard by get_current_student)
+    student = current_student
 
     payload = {
         "student_id": student.student_id,
@@ -126,211 +112,135 @@ def final_grade_me(
 @router.get("/study-duration/{department}")
 def study_duration_by_department(
     department: str,
-    db: Session = Depends(get_db),
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    format: Literal["json", "ndjson"] = "json",
+    db: Session = Depends(get_read_db),
     current_admin: dict = Depends(get_current_admin),
 ):
-    students = (
-        db.query(Student)
-        .filter(
-            Student.department == department,
-            Student.study_hours_per_week.isnot(None),
-        )
-        .all()
-    )
-
-    if not students:
+    profile = _department_profiles(db, Student.department == department).get(department)
+    if not profile or not profile["student_count"]:
         raise HTTPException(status_code=404, detail="No students found for this department")
 
-    avg_hours = (
-        db.query(func.avg(Student.study_hours_per_week))
-        .filter(
-            Student.department == department,
-            Student.study_hours_per_week.isnot(None),
-        )
-        .scalar()
-    )
-    avg_attendance = (
-        db.query(func.avg(Student.attendance_percent))
-        .filter(
-            Student.department == department,
-            Student.attendance_percent.isnot(None),
-        )
-        .scalar()
-    )
-    avg_midterm = (
-        db.query(func.avg(Student.midterm_score))
-        .filter(
-            Student.department == department,
-            Student.midterm_score.isnot(None),
-        )
-        .scalar()
-    )
-    avg_final = (
-        db.query(func.avg(Student.final_score))
-        .filter(
-            Student.department == department,
-            Student.final_score.isnot(None),
-        )
-        .scalar()
-    )
-    avg_stress = (
-        db.query(func.avg(Student.stress_level))
-        .filter(
-            Student.department == department,
-            Student.stress_level.isnot(None),
-        )
-        .scalar()
-    )
-    avg_sleep = (
-        db.query(func.avg(Student.sleep_hours_per_night))
-        .filter(
-            Student.department == department,
-            Student.sleep_hours_per_night.isnot(None),
-        )
-        .scalar()
-    )
+    # keyset pagination on id; no limit/cursor returns every student (old behaviour)
+    after = decode_cursor(cursor, "id")
+    filters = [Student.department == department, Student.study_hours_per_week.isnot(None)]
+    if after:
+        filters.append(Student.id > after["id"])
 
-    return {
+    if format == "ndjson":
+        return stream_query_ndjson(STUDY.select().where(*filters).order_by(Student.id), _study_payload, attrgetter("id"))
+
+    students = STUDY.all(db, *filters, limit=limit)
+
+    next_cursor = None
+    if limit is not None and students and len(students) == limit:
+        next_cursor = encode_cursor({"id": students[-1].id})
+
+    return FastJSONResponse({
         "department": department,
-        "avg_hours_per_week": _to_float(avg_hours),
-        "student_count": len(students),
+        "avg_hours_per_week": profile["avg_hours_per_week"],
+        "student_count": profile["student_count"],
         "related_metrics": {
-            "avg_attendance_percent": _to_float(avg_attendance),
-            "avg_midterm_score": _to_float(avg_midterm),
-            "avg_final_score": _to_float(avg_final),
-            "avg_stress_level": _to_float(avg_stress),
-            "avg_sleep_hours_per_night": _to_float(avg_sleep),
+            "avg_attendance_percent": profile["avg_attendance_percent"],
+            "avg_midterm_score": profile["avg_midterm_score"],
+            "avg_final_score": profile["avg_final_score"],
+            "avg_stress_level": profile["avg_stress_level"],
+            "avg_sleep_hours_per_night": profile["avg_sleep_hours_per_night"],
         },
-        "students": [
-            {
-                "id": s.id,
-                "student_id": s.student_id,
-                "name": " ".join(filter(None, [s.first_name, s.last_name])),
-                "study_hours_per_week": _to_float(s.study_hours_per_week),
-                "attendance_percent": _to_float(s.attendance_percent),
-                "midterm_score": _to_float(s.midterm_score),
-                "final_score": _to_float(s.final_score),
-                "grade": s.grade,
-                "stress_level": _to_float(s.stress_level),
-                "sleep_hours_per_night": _to_float(s.sleep_hours_per_night),
-            }
-            for s in students
-        ],
-    }
+        "students": [_study_payload(s) for s in students],
+        "next_cursor": next_cursor,
+    })
 
 @router.get("/study-duration/{department}/{student_name}")
 def study_duration_by_department_and_student(
     department: str,
     student_name: str,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_admin: dict = Depends(get_current_admin),
 ):
-    # simple case-insensitive match on first/last/full name
-    name_like = f"%{student_name}%"
-    matches = (
-        db.query(Student)
-        .filter(
-            Student.department == department,
-            Student.study_hours_per_week.isnot(None),
-            or_(
-                Student.first_name.ilike(name_like),
-                Student.last_name.ilike(name_like),
-                func.concat(Student.first_name, " ", Student.last_name).ilike(name_like),
-            ),
-        )
-        .all()
+    # case-insensitive match on first/last/full name via the trigram index (services/search.py)
+    matches = search_students(
+        db,
+        student_name,
+        Student.department == department,
+        Student.study_hours_per_week.isnot(None),
+        columns=STUDY.columns,
     )
 
     if not matches:
         raise HTTPException(status_code=404, detail="No matching students found in this department")
 
-    avg_hours = sum([s.study_hours_per_week for s in matches if s.study_hours_per_week is not None]) / len(matches)
+    avg_hours = stats.mean([s.study_hours_per_week for s in matches])
 
-    return {
+    return FastJSONResponse({
         "department": department,
         "query": student_name,
-        "avg_hours_per_week": _to_float(avg_hours),
+        "avg_hours_per_week": avg_hours,
         "student_count": len(matches),
-        "students": [
-            {
-                "id": s.id,
-                "student_id": s.student_id,
-                "name": " ".join(filter(None, [s.first_name, s.last_name])),
-                "study_hours_per_week": _to_float(s.study_hours_per_week),
-                "attendance_percent": _to_float(s.attendance_percent),
-                "midterm_score": _to_float(s.midterm_score),
-                "final_score": _to_float(s.final_score),
-                "grade": s.grade,
-                "stress_level": _to_float(s.stress_level),
-                "sleep_hours_per_night": _to_float(s.sleep_hours_per_night),
-            }
-            for s in matches
-        ],
-    }
+        "students": [_study_payload(s) for s in matches],
+    })
 
-def _name(student: Student):
+def _name(student):
     return " ".join(filter(None, [student.first_name, student.last_name]))
 
-def _to_binary_yes_no(value):
-    if value is None:
-        return None
-    v = str(value).strip().lower()
-    if v == "yes":
-        return 1
-    if v == "no":
-        return 0
-    return None
-
 @router.get("/activity-correlation/final-score")
 def activity_correlation_final_score(
-    db: Session = Depends(get_db),
+    request: Request,
+    exact: bool = False,
+    fresh: bool = False,
+    db: Session = Depends(get_read_db),
     current_admin: dict = Depends(get_current_admin),
 ):
-    return _activity_correlation_final_score(db)
-
-def _activity_correlation_final_score(db: Session):
-    records = db.query(
-        Student.quizzes_avg,
-        Student.study_hours_per_week,
-        Student.extracurricular_activities,
-        Student.attendance_percent,
-        Student.sleep_hours_per_night,
-        Student.final_score,
-    ).all()
-
-    def collect(metric_getter):
-        pairs = []
-        for rec in records:
-            x = metric_getter(rec)
-            y = rec.final_score
-            if x is None or y is None:
-                continue
-            pairs.append((float(x), float(y)))
-        return pairs
-
-    metrics = [
-        ("quizzes_avg", lambda r: r.quizzes_avg, "Average quiz score"),
-        ("study_hours_per_week", lambda r: r.study_hours_per_week, "Study hours per week"),
-        ("extracurricular_activities", lambda r: _to_binary_yes_no(r.extracurricular_activities), "Extracurricular (Yes=1, No=0)"),
-        ("attendance_percent", lambda r: r.attendance_percent, "Attendance percent"),
-        ("sleep_hours_per_night", lambda r: r.sleep_hours_per_night, "Sleep hours per night"),
-    ]
+    # precomputed by the report worker (services/reports.py); fresh=true recomputes now
+    report = reports.get_report(db, "activity-correlation", exact, fresh=fresh)
+    reports.mark_report_version(request, report)
+    return {**report.data, **report.meta()}
+
+CORRELATION_METRICS = [
+    ("quizzes_avg", "Average quiz score"),
+    ("study_hours_per_week", "Study hours per week"),
+    ("extracurricular_activities", "Extracurricular (Yes=1, No=0)"),
+    ("attendance_percent", "Attendance percent"),
+    ("sleep_hours_per_night", "Sleep hours per night"),
+]
+
+def _correlations_from_summary(db: Session):
+    summary = get_summary(db)
+    return {
+        key: {
+            "count": summary[key].n,
+            "pearson_r": summary[key].pearson(),
+            "mean_x": summary[key].mean_x(),
+            "mean_y": summary[key].mean_y(),
+        }
+        for key, _ in CORRELATION_METRICS
+    }
+
+def _activity_correlation_final_score(db: Session, exact: bool = False):
+    """
+    Default: O(1) read of the materialized running sums (services/summary.py).
+    ``exact=True`` recomputes from the columnar snapshot for verification.
+    """
+    if exact:
+        snapshot = get_student_snapshot(db)
+        correlations = stats.correlation_with(
+            snapshot.values["final_score"],
+            {key: snapshot.values[key] for key, _ in CORRELATION_METRICS},
+        )
+    else:
+        correlations = _correlations_from_summary(db)
 
     payload = []
-    for key, getter, label in metrics:
-        pairs = collect(getter)
-        if not pairs:
-            payload.append({"metric": key, "description": label, "count": 0, "pearson_r": None, "mean_metric": None, "mean_final_score": None})
-            continue
-        xs = [p[0] for p in pairs]
-        ys = [p[1] for p in pairs]
+    for key, label in CORRELATION_METRICS:
+        result = correlations[key]
         payload.append({
             "metric": key,
             "description": label,
-            "count": len(pairs),
-            "pearson_r": _to_float(_pearson(xs, ys)),
-            "mean_metric": _to_float(_mean(xs)),
-            "mean_final_score": _to_float(_mean(ys)),
+            "count": result["count"],
+            "pearson_r": result["pearson_r"],
+            "mean_metric": result["mean_x"],
+            "mean_final_score": result["mean_y"],
         })
 
     return {
@@ -339,113 +249,176 @@ def _activity_correlation_final_score(db: Session):
         "note": "Pearson correlation; extracurricular_activities converted to Yes=1, No=0.",
     }
 
+LOW_ACTIVITY_METRICS = ["attendance_percent", "study_hours_per_week", "quizzes_avg", "sleep_hours_per_night"]
+
+class LowActivityRanking:
+    """Every student ranked by (low_metric_count desc, id asc) against the 25th-percentile thresholds."""
+
+    def __init__(self, snapshot, thresholds, rank_error):
+        self.snapshot = snapshot
+        self.thresholds = thresholds
+        self.rank_error = rank_error
+        self.low_masks = {}
+        for key in LOW_ACTIVITY_METRICS:
+            if thresholds[key] is None:
+                self.low_masks[key] = np.zeros(snapshot.size, dtype=bool)
+            else:
+                self.low_masks[key] = snapshot.present[key] & (snapshot.values[key] <= thresholds[key])
+        self.low_counts = np.sum([self.low_masks[key] for key in LOW_ACTIVITY_METRICS], axis=0, dtype=np.int64)
+        # snapshot rows are ordered by id -> a stable sort keeps ids ascending within a count
+        self.order = np.argsort(-self.low_counts, kind="stable")
+        self.counts = self.low_counts[self.order]
+        self.ids = snapshot.ids[self.order]
+
+    def window(self, min_low_metrics: int, after: Optional[dict]):
+        """(start, end) positions in ``order``: end = students with >= min_low_metrics, start = after the cursor."""
+        end = int(np.searchsorted(-self.counts, -min_low_metrics, side="right"))
+        if not after:
+            return 0, end
+        lo = int(np.searchsorted(-self.counts, -after["low_metric_count"], side="left"))
+        hi = int(np.searchsorted(-self.counts, -after["low_metric_count"], side="right"))
+        return lo + int(np.searchsorted(self.ids[lo:hi], after["id"], side="right")), end
+
+    def record(self, i: int) -> dict:
+        snapshot = self.snapshot
+        return {
+            "id": int(snapshot.ids[i]),
+            "student_id": snapshot.student_ids[i],
+            "name": snapshot.name(i),
+            "low_metric_count": int(self.low_counts[i]),
+            "low_metrics": [key for key in LOW_ACTIVITY_METRICS if self.low_masks[key][i]],
+            "metrics": {key: snapshot.value(key, i) for key in LOW_ACTIVITY_METRICS},
+        }
+
+def _low_activity_ranking(db: Session, exact: bool = False) -> LowActivityRanking:
+    """The full-table part of ``/low-activity``, run by the report worker."""
+    snapshot = get_student_snapshot(db)
+    if exact:
+        thresholds = {
+            key: stats.percentile(snapshot.values[key], 0.25, mask=snapshot.present[key])
+            for key in LOW_ACTIVITY_METRICS
+        }
+        return LowActivityRanking(snapshot, thresholds, 0.0)
+    # KLL sketch: the threshold's true rank is within 25% ± rank_error
+    sketches = get_sketches(db)
+    thresholds = {key: sketches[key].quantile(0.25) for key in LOW_ACTIVITY_METRICS}
+    return LowActivityRanking(snapshot, thresholds, max(sketches[key].rank_error() for key in LOW_ACTIVITY_METRICS))
+
 @router.get("/low-activity")
 def low_activity_students(
+    request: Request,
     min_low_metrics: int = 2,
-    db: Session = Depends(get_db),
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    format: Literal["json", "ndjson"] = "json",
+    exact: bool = False,
+    fresh: bool = False,
+    db: Session = Depends(get_read_db),
     current_admin: dict = Depends(get_current_admin),
 ):
-    students = db.query(Student).all()
-
-    attendance_vals = [s.attendance_percent for s in students if s.attendance_percent is not None]
-    study_vals = [s.study_hours_per_week for s in students if s.study_hours_per_week is not None]
-    quiz_vals = [s.quizzes_avg for s in students if s.quizzes_avg is not None]
-    sleep_vals = [s.sleep_hours_per_night for s in students if s.sleep_hours_per_night is not None]
-
-    thresholds = {
-        "attendance_percent": _to_float(_percentile(attendance_vals, 0.25)),
-        "study_hours_per_week": _to_float(_percentile(study_vals, 0.25)),
-        "quizzes_avg": _to_float(_percentile(quiz_vals, 0.25)),
-        "sleep_hours_per_night": _to_float(_percentile(sleep_vals, 0.25)),
-    }
-
-    low_students = []
-    for s in students:
-        metrics = {
-            "attendance_percent": _to_float(s.attendance_percent),
-            "study_hours_per_week": _to_float(s.study_hours_per_week),
-            "quizzes_avg": _to_float(s.quizzes_avg),
-            "sleep_hours_per_night": _to_float(s.sleep_hours_per_night),
-        }
-        low_flags = [
-            key for key, value in metrics.items()
-            if value is not None and thresholds[key] is not None and value <= thresholds[key]
-        ]
-        if len(low_flags) >= min_low_metrics:
-            low_students.append({
-                "id": s.id,
-                "student_id": s.student_id,
-                "name": _name(s),
-                "low_metric_count": len(low_flags),
-                "low_metrics": low_flags,
-                "metrics": metrics,
-            })
-
-    low_students.sort(key=lambda x: x["low_metric_count"], reverse=True)
-
-    return {
-        "thresholds_25th_percentile": thresholds,
+    report = reports.get_report(db, "low-activity", exact, fresh=fresh)
+    reports.mark_report_version(request, report)
+    ranking: LowActivityRanking = report.data
+
+    # keyset on (low_metric_count desc, id asc) -- the order of the ranking
+    start, end = ranking.window(min_low_metrics, decode_cursor(cursor, "low_metric_count", "id"))
+    total_flagged = end
+    if limit is not None and format == "json":
+        end = min(end, start + max(limit, 0))
+    low_students = [ranking.record(i) for i in ranking.order[start:end].tolist()]
+
+    if format == "ndjson":
+        return ndjson_response(low_students)
+
+    next_cursor = None
+    if limit is not None and low_students and len(low_students) == limit:
+        last = low_students[-1]
+        next_cursor = encode_cursor({"low_metric_count": last["low_metric_count"], "id": last["id"]})
+
+    return FastJSONResponse({
+        "thresholds_25th_percentile": ranking.thresholds,
+        "threshold_mode": "exact" if exact else "sketch",
+        "threshold_rank_error": ranking.rank_error,
         "min_low_metrics": min_low_metrics,
         "low_students": low_students,
-        "total_flagged": len(low_students),
-    }
+        "total_flagged": total_flagged,
+        "next_cursor": next_cursor,
+        **report.meta(),
+    })
 
 def _percent_change(old, new):
     if old is None or new is None or old == 0:
         return None
     return ((new - old) / old) * 100
 
+def _trend_record(row):
+    return {
+        "id": row.id,
+        "student_id": row.student_id,
+        "name": _name(row),
+        "midterm_score": _to_float(row.midterm_score),
+        "final_score": _to_float(row.final_score),
+        "delta_score": _to_float(row.score_delta),
+        "percent_change": _to_float(_percent_change(row.midterm_score, row.final_score)),
+    }
+
 @router.get("/activity-trend")
 def activity_trend(
     top_n: int = 10,
-    db: Session = Depends(get_db),
+    exact: bool = False,
+    db: Session = Depends(get_read_db),
     current_admin: dict = Depends(get_current_admin),
 ):
-    students = (
-        db.query(Student)
-        .filter(Student.midterm_score.isnot(None), Student.final_score.isnot(None))
-        .all()
+    delta = Student.score_delta
+
+    # counts from the materialized sums (services/summary.py), no scan of students
+    summary = get_summary(db)
+    trend = summary["midterm_final"]
+    improving_count, declining_count = summary["final_midterm_direction"].sign_counts()
+
+    if exact:
+        totals = (
+            AggregateQuery()
+            .add("mean_delta", "avg", delta)
+            .add("median_delta", "percentile", delta, q=0.5)
+            .run(db)[None]
+        )
+        mean_delta, median_delta = totals["mean_delta"], totals["median_delta"]
+    else:
+        # mean(final - midterm) = mean_y - mean_x of the materialized midterm/final sums;
+        # median from the final - midterm KLL sketch (rank error: sketch.rank_error())
+        mean_delta = trend.mean_y() - trend.mean_x() if trend.n else None
+        median_delta = get_sketches(db)["final_minus_midterm"].quantile(0.5)
+
+    # top-N read off ix_students_score_delta: ORDER BY score_delta LIMIT top_n (id breaks ties)
+    top_improving = merged_rows(
+        db, TREND.select().where(delta > 0).order_by(delta.desc(), Student.id),
+        lambda row: (-row.score_delta, row.id), limit=top_n,
+    )
+    top_declining = merged_rows(
+        db, TREND.select().where(delta < 0).order_by(delta, Student.id),
+        lambda row: (row.score_delta, row.id), limit=top_n,
     )
 
-    records = []
-    deltas = []
-    for s in students:
-        delta = float(s.final_score) - float(s.midterm_score)
-        deltas.append(delta)
-        records.append({
-            "id": s.id,
-            "student_id": s.student_id,
-            "name": _name(s),
-            "midterm_score": _to_float(s.midterm_score),
-            "final_score": _to_float(s.final_score),
-            "delta_score": _to_float(delta),
-            "percent_change": _to_float(_percent_change(s.midterm_score, s.final_score)),
-        })
-
-    improving = [r for r in records if r["delta_score"] is not None and r["delta_score"] > 0]
-    declining = [r for r in records if r["delta_score"] is not None and r["delta_score"] < 0]
-
-    improving_sorted = sorted(improving, key=lambda r: r["delta_score"], reverse=True)[:top_n]
-    declining_sorted = sorted(declining, key=lambda r: r["delta_score"])[:top_n]
-
-    return {
+    return FastJSONResponse({
         "note": "Midterm vs Final score used as proxy for trend across semester.",
-        "count": len(records),
-        "mean_delta": _to_float(_mean(deltas)),
-        "median_delta": _to_float(_percentile(deltas, 0.5)),
-        "improving_count": len(improving),
-        "declining_count": len(declining),
-        "top_improving": improving_sorted,
-        "top_declining": declining_sorted,
-    }
+        "count": trend.n,
+        "mean_delta": mean_delta,
+        "median_delta": median_delta,
+        "improving_count": improving_count,
+        "declining_count": declining_count,
+        "top_improving": [_trend_record(row) for row in top_improving],
+        "top_declining": [_trend_record(row) for row in top_declining],
+    })
 
 @router.get("/activity-trend/{student_id}")
 def activity_trend_student(
     student_id: str,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_admin: dict = Depends(get_current_admin),
 ):
-    student = db.query(Student).filter(Student.student_id == student_id).first()
+    with student_session(db, student_id) as shard_db:
+        student = TREND_DETAIL.first(shard_db, Student.student_id == student_id)
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
     if student.midterm_score is None or student.final_score is None:
@@ -469,3 +442,6 @@ def activity_trend_student(
         },
         "note": "Midterm vs Final score used as proxy for trend across semester.",
     }
+
+reports.register("activity-correlation", _activity_correlation_final_score, warm=[(False,)])
+reports.register("low-activity", _low_activity_ranking, warm=[(False,)])
@@ -1,70 +1,120 @@
 # modules/items/routes/participations.py
-from fastapi import APIRouter, Depends
+from typing import Literal, Optional
+
+import numpy as np
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import and_, func, or_
 
 from auth import get_current_admin, get_current_student
-from database import get_db
+from database import get_read_db, scatter
 from modules.items.models import Student
+from modules.items.services.aggregates import AggregateQuery
+from modules.items.services.categories import (
+    AVERAGE_MIN_PERCENT,
+    GOOD_MIN_PERCENT,
+    PARTICIPATION_CATEGORIES,
+    VERY_GOOD_MIN_PERCENT,
+    score_to_category,
+)
+from modules.items.services.pagination import decode_cursor, encode_cursor, stream_query_ndjson
+from modules.items.services.projections import PARTICIPATION
+from modules.items.services.response_cache import CachedRoute
+from modules.items.services.serialization import FastJSONResponse
+from modules.items.services.snapshot import get_student_snapshot
 
 router = APIRouter(
     prefix="/participations",
     tags=["participations"],
+    route_class=CachedRoute,
 )
 
-# Participation is stored as 0-100; categorize directly on that scale.
-VERY_GOOD_MIN_PERCENT = 90  # very good: >= 90%
-GOOD_MIN_PERCENT = 75       # good: >= 75% and < 90%
-AVERAGE_MIN_PERCENT = 50    # average: >= 50% and < 75%
-
 
 def _to_float(v):
     return float(v) if v is not None else None
 
 
-def _score_to_category(score_0_100):
-    """Bucket participation_score into a human-readable category."""
-    if score_0_100 is None:
-        return None
-    if score_0_100 >= VERY_GOOD_MIN_PERCENT:
-        return "very-good"
-    if score_0_100 >= GOOD_MIN_PERCENT:
-        return "good"
-    if score_0_100 >= AVERAGE_MIN_PERCENT:
-        return "average"
-    return "bad"
-
-
 def _student_payload(student: Student):
     return {
         "id": student.id,
         "student_id": student.student_id,
         "name": " ".join(filter(None, [student.first_name, student.last_name])),
         "participation_score": _to_float(student.participation_score),
-        "participation_category": _score_to_category(student.participation_score),
+        # kolom tersimpan; fallback untuk baris yang belum di-backfill
+        "participation_category": student.participation_category or score_to_category(student.participation_score),
     }
 
 
+def _participation_key(row):
+    return -row.participation_score, row.id
+
+
+def _participation_page(
+    db: Session,
+    filters,
+    limit: Optional[int],
+    cursor: Optional[str],
+    format: str,
+):
+    """
+    Students with a participation score ordered by ``(participation_score desc, id)``.
+
+    Without ``limit``/``cursor`` every match is returned (old behaviour).
+    ``cursor`` continues after the last row of the previous page, and
+    ``format=ndjson`` streams the remaining rows instead of building a page.
+    Returns ``(students, count, next_cursor)`` or a streaming response.
+    """
+    base_filters = [Student.participation_score.isnot(None), *filters]
+    after = decode_cursor(cursor, "score", "id")
+    page_filters = list(base_filters)
+    if after:
+        page_filters.append(
+            or_(
+                Student.participation_score < after["score"],
+                and_(Student.participation_score == after["score"], Student.id > after["id"]),
+            )
+        )
+    order = (Student.participation_score.desc(), Student.id)
+
+    if format == "ndjson":
+        stmt = PARTICIPATION.select().where(*page_filters).order_by(*order)
+        return stream_query_ndjson(stmt, _student_payload, _participation_key)
+
+    students = PARTICIPATION.all(db, *page_filters, order_by=order, limit=limit, key=_participation_key)
+
+    if limit is None and after is None:
+        count = len(students)
+    else:
+        count = sum(scatter(db, lambda shard_db: shard_db.query(func.count(Student.id)).filter(*base_filters).scalar()))
+
+    next_cursor = None
+    if limit is not None and students and len(students) == limit:
+        last = students[-1]
+        next_cursor = encode_cursor({"score": last.participation_score, "id": last.id})
+    return students, count, next_cursor
+
+
 @router.get("/")
 def list_participations(
-    db: Session = Depends(get_db),
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    format: Literal["json", "ndjson"] = "json",
+    db: Session = Depends(get_read_db),
     current_admin: dict = Depends(get_current_admin),
 ):
-    students = (
-        db.query(Student)
-        .filter(Student.participation_score.isnot(None))
-        .order_by(Student.participation_score.desc())
-        .all()
-    )
+    page = _participation_page(db, [], limit, cursor, format)
+    if format == "ndjson":
+        return page
+    students, count, next_cursor = page
 
     avg_score = (
-        db.query(func.avg(Student.participation_score))
-        .filter(Student.participation_score.isnot(None))
-        .scalar()
+        AggregateQuery()
+        .add("avg", "avg", Student.participation_score)
+        .run(db, Student.participation_score.isnot(None))[None]["avg"]
     )
 
-    return {
-        "count": len(students),
+    return FastJSONResponse({
+        "count": count,
         "average_participation_score": _to_float(avg_score),
         "category_thresholds_percent": {
             "very_good_min": VERY_GOOD_MIN_PERCENT,
@@ -72,82 +122,156 @@ def list_participations(
             "average_min": AVERAGE_MIN_PERCENT,
         },
         "students": [_student_payload(s) for s in students],
-    }
+        "next_cursor": next_cursor,
+    })
 
 
 def _category_response(
     db: Session,
     filters,
     category_label: str,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    format: str = "json",
 ):
-    students = (
-        db.query(Student)
-        .filter(Student.participation_score.isnot(None), *filters)
-        .order_by(Student.participation_score.desc())
-        .all()
-    )
-    return {
+    page = _participation_page(db, filters, limit, cursor, format)
+    if format == "ndjson":
+        return page
+    students, count, next_cursor = page
+    return FastJSONResponse({
         "category": category_label,
-        "count": len(students),
+        "count": count,
         "thresholds_percent": {
             "very_good_min": VERY_GOOD_MIN_PERCENT,
             "good_min": GOOD_MIN_PERCENT,
             "average_min": AVERAGE_MIN_PERCENT,
         },
         "students": [_student_payload(s) for s in students],
-    }
+        "next_cursor": next_cursor,
+    })
 
 
 @router.get("/very-good")
 def participations_very_good(
-    db: Session = Depends(get_db),
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    format: Literal["json", "ndjson"] = "json",
+    db: Session = Depends(get_read_db),
     current_admin: dict = Depends(get_current_admin),
 ):
-    filters = [Student.participation_score >= VERY_GOOD_MIN_PERCENT]
-    return _category_response(db, filters, "very-good (>=90%)")
+    filters = [Student.participation_category == "very-good"]
+    return _category_response(db, filters, "very-good (>=90%)", limit, cursor, format)
 
 
 @router.get("/good")
 def participations_good(
-    db: Session = Depends(get_db),
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    format: Literal["json", "ndjson"] = "json",
+    db: Session = Depends(get_read_db),
     current_admin: dict = Depends(get_current_admin),
 ):
-    filters = [
-        Student.participation_score >= GOOD_MIN_PERCENT,
-        Student.participation_score < VERY_GOOD_MIN_PERCENT,
-    ]
-    return _category_response(db, filters, "good (75-89%)")
+    filters = [Student.participation_category == "good"]
+    return _category_response(db, filters, "good (75-89%)", limit, cursor, format)
 
 
 @router.get("/average")
 def participations_average(
-    db: Session = Depends(get_db),
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    format: Literal["json", "ndjson"] = "json",
+    db: Session = Depends(get_read_db),
     current_admin: dict = Depends(get_current_admin),
 ):
-    filters = [
-        Student.participation_score >= AVERAGE_MIN_PERCENT,
-        Student.participation_score < GOOD_MIN_PERCENT,
-    ]
-    return _category_response(db, filters, "average (50-74%)")
+    filters = [Student.participation_category == "average"]
+    return _category_response(db, filters, "average (50-74%)", limit, cursor, format)
 
 
 @router.get("/bad")
 def participations_bad(
-    db: Session = Depends(get_db),
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    format: Literal["json", "ndjson"] = "json",
+    db: Session = Depends(get_read_db),
+    current_admin: dict = Depends(get_current_admin),
+):
+    filters = [Student.participation_category == "bad"]
+    return _category_response(db, filters, "bad (<50%)", limit, cursor, format)
+
+
+@router.get("/overview")
+def participations_overview(
+    top_n: int = Query(5, ge=0),
+    bin_width: float = Query(10, gt=0, le=100),
+    db: Session = Depends(get_read_db),
     current_admin: dict = Depends(get_current_admin),
 ):
-    filters = [Student.participation_score < AVERAGE_MIN_PERCENT]
-    return _category_response(db, filters, "bad (<50%)")
+    """
+    Dashboard summary in one call: per-category count/average/min/max and
+    top-N students, plus a fixed-width histogram of participation_score.
+    Computed in one pass over the shared columnar snapshot instead of
+    calling /participations and the four category endpoints.
+    """
+    snapshot = get_student_snapshot(db)
+    rows = np.flatnonzero(snapshot.present["participation_score"])
+    scores = snapshot.values["participation_score"][rows]
+
+    # index kategori sesuai urutan PARTICIPATION_CATEGORIES (very-good, good, average, bad)
+    category_idx = 3 - np.searchsorted(
+        [AVERAGE_MIN_PERCENT, GOOD_MIN_PERCENT, VERY_GOOD_MIN_PERCENT], scores, side="right"
+    )
+
+    categories = []
+    for idx, category in enumerate(PARTICIPATION_CATEGORIES):
+        members = np.flatnonzero(category_idx == idx)
+        member_scores = scores[members]
+        top = members[np.lexsort((snapshot.ids[rows[members]], -member_scores))][:top_n]
+        categories.append({
+            "category": category,
+            "count": len(members),
+            "average_participation_score": float(member_scores.mean()) if len(members) else None,
+            "min_participation_score": float(member_scores.min()) if len(members) else None,
+            "max_participation_score": float(member_scores.max()) if len(members) else None,
+            "top_students": [
+                {
+                    "id": int(snapshot.ids[rows[j]]),
+                    "student_id": snapshot.student_ids[rows[j]],
+                    "name": snapshot.name(rows[j]),
+                    "participation_score": float(scores[j]),
+                    "participation_category": category,
+                }
+                for j in top.tolist()
+            ],
+        })
+
+    edges = np.append(np.arange(0, 100, bin_width), 100.0)
+    counts, _ = np.histogram(scores, bins=edges)
+
+    return FastJSONResponse({
+        "count": len(rows),
+        "average_participation_score": float(scores.mean()) if len(rows) else None,
+        "category_thresholds_percent": {
+            "very_good_min": VERY_GOOD_MIN_PERCENT,
+            "good_min": GOOD_MIN_PERCENT,
+            "average_min": AVERAGE_MIN_PERCENT,
+        },
+        "categories": categories,
+        "histogram": {
+            "bin_width": bin_width,
+            "bins": [
+                {"min": float(lo), "max": float(hi), "count": int(n)}
+                for lo, hi, n in zip(edges[:-1], edges[1:], counts)
+            ],
+        },
+    })
 
 
 # login sebagai student buat ngeliat data participations nya dia.
 @router.get("/me")
-def participations_me(
-    db: Session = Depends(get_db),
-    current_student: Student = Depends(get_current_student),
-):
-    student = db.query(Student).filter(Student.id == current_student.id).first()
-    if not student or student.participation_score is None:
+def participations_me(current_student: Student = Depends(get_current_student)):
+    # the principal is the full Student row (loaded from its shard by get_current_student)
+    student = current_student
+    if student.participation_score is None:
         return {
             "student_id": current_student.student_id,
             "name": _student_payload(current_student)["name"],
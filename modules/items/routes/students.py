@@ -1,12 +1,33 @@
 # modules/items/routes/students.py
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List
+import json
+import os
+from collections import Counter, defaultdict
+from operator import attrgetter
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
+from typing import Any, Dict, List, Literal, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
-from database import get_db
-from auth import get_current_admin, get_current_user, get_password_hash
+from database import get_db, get_read_db, group_by_shard, student_session
+from auth import get_current_admin, get_current_user, get_password_hash, invalidate_principal
 from modules.items.models import Student
 from modules.items.schema.schemas import PasswordUpdate, StudentOut, StudentCreate
+from modules.items.services.bulk import upsert_students
+from modules.items.services.hashing import hash_passwords
+from modules.items.services.pagination import decode_cursor, encode_cursor, merged_rows, stream_query_ndjson
+from modules.items.services.projections import STUDENT_OUT
+from modules.items.services.search import index_students, search_students
+from modules.items.services.serialization import FastJSONResponse, row_dicts
+from modules.items.services.summary import apply_student_changes
+from modules.items.services.versioning import bump_data_version
+
+# POST /students/bulk
+BULK_BATCH_SIZE = int(os.getenv("STUDENTS_BULK_BATCH_SIZE", "1000"))
+BULK_MAX_ROWS = int(os.getenv("STUDENTS_BULK_MAX_ROWS", "50000"))
+BULK_STATUSES = ("created", "updated", "skipped", "not_found", "invalid", "error")
 
 router = APIRouter(
     prefix="/students",
@@ -17,11 +38,42 @@ router = APIRouter(
 def list_students(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = None,
+    format: Literal["json", "ndjson"] = "json",
+    db: Session = Depends(get_read_db),
+    current_admin: dict = Depends(get_current_admin),
+):
+    """
+    Page through students ordered by ``id``. Pass the ``X-Next-Cursor``
+    header of the previous page as ``cursor`` for keyset pagination (``skip``
+    is then ignored). ``format=ndjson`` streams every row after ``cursor``.
+    """
+    after = decode_cursor(cursor, "id")
+
+    stmt = STUDENT_OUT.select().order_by(Student.id)
+    if after:
+        stmt = stmt.where(Student.id > after["id"])
+
+    if format == "ndjson":
+        return stream_query_ndjson(stmt, lambda row: dict(row._mapping), attrgetter("id"))
+
+    students = row_dicts(merged_rows(db, stmt, attrgetter("id"), limit=limit, skip=0 if after else skip))
+
+    # rows come straight from the table -> serialize without StudentOut re-validation
+    headers = {}
+    if students and len(students) == limit:
+        headers["X-Next-Cursor"] = encode_cursor({"id": students[-1]["id"]})
+    return FastJSONResponse(students, headers=headers)
+
+@router.get("/search", response_model=List[StudentOut])
+def search_students_by_name(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(50, ge=1, le=1000),
+    db: Session = Depends(get_read_db),
     current_admin: dict = Depends(get_current_admin),
 ):
-    students = db.query(Student).offset(skip).limit(limit).all()
-    return students
+    """Substring search on first/last/full name via the trigram index."""
+    return FastJSONResponse(row_dicts(search_students(db, q, columns=STUDENT_OUT.columns, limit=limit)))
 
 # 1️⃣ GET by internal numeric id (primary key)
 @router.get("/id/{id}", response_model=StudentOut)
@@ -30,10 +82,11 @@ def get_student_by_id(
     db: Session = Depends(get_db),
     current_admin: dict = Depends(get_current_admin),
 ):
-    student = db.query(Student).filter(Student.id == id).first()
+    with student_session(db, id=id) as shard_db:
+        student = STUDENT_OUT.first(shard_db, Student.id == id)
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
-    return student
+    return FastJSONResponse(student._asdict())
 
 # 2️⃣ GET by student_id like "S1000"
 @router.get("/{student_id}", response_model=StudentOut)
@@ -42,12 +95,17 @@ def get_student_by_student_id(
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user),
 ):
-    student = db.query(Student).filter(Student.student_id == student_id).first()
+    if current_user["role"] == "student" and current_user["student"].student_id == student_id:
+        # principal sudah dimuat oleh get_current_user
+        return current_user["student"]
+
+    with student_session(db, student_id) as shard_db:
+        student = STUDENT_OUT.first(shard_db, Student.student_id == student_id)
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
     if current_user["role"] == "student" and student.student_id != current_user["student"].student_id:
         raise HTTPException(status_code=403, detail="Not allowed to view other students")
-    return student
+    return FastJSONResponse(student._asdict())
 
 @router.post("/", response_model=StudentOut)
 def create_student(
@@ -55,21 +113,182 @@ def create_student(
     db: Session = Depends(get_db),
     current_admin: dict = Depends(get_current_admin),
 ):
-    existing = db.query(Student).filter(Student.student_id == student_in.student_id).first()
+    # duplicate dicek dulu supaya request yang pasti gagal tidak menghabiskan slot hashing
+    ensure_student_id_free(db, student_in.student_id)
+    hashed_password = get_password_hash(student_in.password) if student_in.password else None
+    return insert_student(db, student_in, hashed_password)
+
+def ensure_student_id_free(db: Session, student_id: str) -> None:
+    with student_session(db, student_id) as shard_db:
+        existing = shard_db.execute(select(Student.id).where(Student.student_id == student_id)).first()
     if existing:
         raise HTTPException(status_code=400, detail="student_id already exists")
 
-    student_data = student_in.dict()
-    password = student_data.pop("password", None)
-    student = Student(**student_data)
-    if password:
-        student.hashed_password = get_password_hash(password)
+def insert_student(db: Session, student_in: StudentCreate, hashed_password: Optional[str]) -> Student:
+    """The write half of ``create_student``; the password is hashed by the caller (sync or awaited)."""
+    with student_session(db, student_in.student_id) as shard_db:
+        # dicek lagi: insert lain bisa menyelip selama hashing
+        existing = shard_db.execute(select(Student.id).where(Student.student_id == student_in.student_id)).first()
+        if existing:
+            raise HTTPException(status_code=400, detail="student_id already exists")
 
-    db.add(student)
-    db.commit()
-    db.refresh(student)
+        student_data = student_in.dict()
+        student_data.pop("password", None)
+        student = Student(**student_data, hashed_password=hashed_password)
+
+        shard_db.add(student)
+        apply_student_changes(shard_db, [], [student_data])
+        index_students(shard_db, [student_data])
+        bump_data_version(shard_db)
+        shard_db.commit()
+        shard_db.refresh(student)
     return student
 
+def parse_bulk_payload(body: bytes, content_type: str) -> List[Any]:
+    """JSON array, or one JSON object per line for ``application/x-ndjson``."""
+    if "ndjson" in content_type or "jsonl" in content_type:
+        records = []
+        for number, line in enumerate(body.splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                raise HTTPException(status_code=400, detail=f"Invalid JSON on line {number}")
+    else:
+        try:
+            records = json.loads(body or b"null")
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid JSON body")
+        if not isinstance(records, list):
+            raise HTTPException(status_code=400, detail="Expected a JSON array of students")
+    if len(records) > BULK_MAX_ROWS:
+        raise HTTPException(status_code=413, detail=f"At most {BULK_MAX_ROWS} students per request")
+    return records
+
+
+def _write_bulk_batch(db: Session, batch: List[Tuple[int, Dict]], mode: str, results: List[Dict]) -> List[int]:
+    """Upsert one batch; fills ``results`` and returns the db ids of updated students."""
+    keys = {row["student_id"] for _, row in batch}
+    seen = set(db.execute(select(Student.student_id).where(Student.student_id.in_(keys))).scalars())
+    existing = set(seen)
+
+    # upsert_students wants one key set per statement: partial records are grouped by their fields
+    groups: Dict[Tuple[str, ...], List[Dict]] = defaultdict(list)
+    for index, row in batch:
+        student_id = row["student_id"]
+        if student_id in seen:
+            if mode == "create":
+                results[index] = {
+                    "index": index, "student_id": student_id, "status": "skipped", "detail": "student_id already exists",
+                }
+                continue
+            status = "updated"
+        else:
+            if mode == "update":
+                results[index] = {"index": index, "student_id": student_id, "status": "not_found"}
+                continue
+            status = "created"
+            seen.add(student_id)
+        results[index] = {"index": index, "student_id": student_id, "status": status}
+        groups[tuple(sorted(row))].append(row)
+
+    for rows in groups.values():
+        upsert_students(db, rows, update_existing=mode != "create")
+
+    ids = dict(db.execute(select(Student.student_id, Student.id).where(Student.student_id.in_(keys))).all())
+    for index, row in batch:
+        if results[index]["status"] in ("created", "updated"):
+            results[index]["id"] = ids.get(row["student_id"])
+    return [ids[key] for key in existing & set(ids)]
+
+
+def write_bulk_students(db: Session, records: List[Any], mode: str = "upsert") -> Dict:
+    """
+    Validate ``records`` as ``StudentCreate`` and write them ``BULK_BATCH_SIZE``
+    at a time with one conflict-aware statement per batch (services/bulk.py),
+    committing per batch. A failing batch is rolled back and reported; the
+    others are kept. Returns per-row results in input order plus totals.
+    """
+    results, valid = validate_bulk_records(records)
+    # passwords hashed in parallel across the hashing pool, not one by one
+    set_password_hashes(valid, hash_passwords(bulk_passwords(valid)))
+    return write_valid_students(db, results, valid, mode)
+
+def validate_bulk_records(records: List[Any]) -> Tuple[List[Optional[Dict]], List[Tuple[int, Dict]]]:
+    """Per-row results (``invalid`` filled in) and the ``(index, fields)`` of the valid records."""
+    results: List[Optional[Dict]] = [None] * len(records)
+    valid: List[Tuple[int, Dict]] = []
+    for index, record in enumerate(records):
+        try:
+            if not isinstance(record, dict):
+                raise TypeError("expected a JSON object")
+            student_in = StudentCreate(**record)
+        except (ValidationError, TypeError) as exc:
+            results[index] = {
+                "index": index,
+                "student_id": record.get("student_id") if isinstance(record, dict) else None,
+                "status": "invalid",
+                "errors": exc.errors(include_url=False, include_context=False) if isinstance(exc, ValidationError) else str(exc),
+            }
+            continue
+        valid.append((index, student_in.dict(exclude_unset=True)))
+    return results, valid
+
+def bulk_passwords(valid: List[Tuple[int, Dict]]) -> List[str]:
+    return [row["password"] for _, row in valid if row.get("password")]
+
+def set_password_hashes(valid: List[Tuple[int, Dict]], hashes: List[str]) -> None:
+    """Swap each plain ``password`` for its hash (``hashes`` in ``bulk_passwords`` order)."""
+    hashes = iter(hashes)
+    for _, row in valid:
+        if row.pop("password", None):
+            row["hashed_password"] = next(hashes)
+
+def write_valid_students(db: Session, results: List[Optional[Dict]], valid: List[Tuple[int, Dict]], mode: str) -> Dict:
+    """Write validated, already hashed rows; fills ``results`` and returns the bulk response."""
+    # batches never span shards; without sharding there is one group in input order
+    for shard_rows in group_by_shard(valid, lambda item: item[1]["student_id"]).values():
+        with student_session(db, shard_rows[0][1]["student_id"]) as shard_db:
+            for start in range(0, len(shard_rows), BULK_BATCH_SIZE):
+                batch = shard_rows[start:start + BULK_BATCH_SIZE]
+                try:
+                    updated_ids = _write_bulk_batch(shard_db, batch, mode, results)
+                    shard_db.commit()
+                except SQLAlchemyError as exc:
+                    shard_db.rollback()
+                    detail = str(getattr(exc, "orig", None) or exc)
+                    for index, row in batch:
+                        results[index] = {"index": index, "student_id": row["student_id"], "status": "error", "detail": detail}
+                    continue
+                for student_db_id in updated_ids:
+                    invalidate_principal(student_db_id)
+
+    totals = Counter(result["status"] for result in results)
+    return {
+        "mode": mode,
+        "total": len(results),
+        **{status: totals.get(status, 0) for status in BULK_STATUSES},
+        "results": results,
+    }
+
+@router.post("/bulk")
+async def bulk_write(
+    request: Request,
+    mode: Literal["upsert", "create", "update"] = "upsert",
+    db: Session = Depends(get_db),
+    current_admin: dict = Depends(get_current_admin),
+):
+    """
+    Create/update many students in one call. Body: JSON array of
+    ``StudentCreate`` objects, or NDJSON (``Content-Type: application/x-ndjson``).
+    ``mode=upsert`` (default) inserts or updates; ``create`` skips existing
+    student_ids; ``update`` only touches existing ones. Fields left out of a
+    record are not modified on update.
+    """
+    records = parse_bulk_payload(await request.body(), request.headers.get("content-type", ""))
+    return FastJSONResponse(await run_in_threadpool(write_bulk_students, db, records, mode))
+
 @router.post("/{student_id}/password", response_model=StudentOut)
 def set_student_password(
     student_id: str,
@@ -77,11 +296,18 @@ def set_student_password(
     db: Session = Depends(get_db),
     current_admin: dict = Depends(get_current_admin),
 ):
-    student = db.query(Student).filter(Student.student_id == student_id).first()
-    if not student:
-        raise HTTPException(status_code=404, detail="Student not found")
+    return store_student_password(db, student_id, get_password_hash(payload.password))
+
+def store_student_password(db: Session, student_id: str, hashed_password: str) -> Student:
+    with student_session(db, student_id) as shard_db:
+        student = shard_db.query(Student).filter(Student.student_id == student_id).first()
+        if not student:
+            raise HTTPException(status_code=404, detail="Student not found")
 
-    student.hashed_password = get_password_hash(payload.password)
-    db.commit()
-    db.refresh(student)
+        # hanya hash yang berubah: tidak ada respons/laporan yang memuatnya, jadi versi data
+        # tidak dinaikkan (itu akan mengosongkan semua cache) -- cukup principal student ini
+        student.hashed_password = hashed_password
+        shard_db.commit()
+        invalidate_principal(student.id)
+        shard_db.refresh(student)
     return student
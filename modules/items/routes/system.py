@@ -0,0 +1,69 @@
+# modules/items/routes/system.py
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from auth import get_current_admin
+from database import get_db, get_pool_stats, get_replica_status, scatter
+from modules.items.services.reports import get_report_status
+from modules.items.services.response_cache import clear_response_cache, response_cache_stats
+from modules.items.services.search import rebuild_name_index
+from modules.items.services.summary import get_sketches, rebuild_summary
+from modules.items.services.versioning import bump_data_version
+
+router = APIRouter(
+    prefix="/system",
+    tags=["system"],
+)
+
+@router.get("/pool")
+def pool_stats(current_admin: dict = Depends(get_current_admin)):
+    """Connection-pool gauges and counters per engine, for sizing DB_POOL_*."""
+    return get_pool_stats()
+
+@router.get("/replicas")
+def replica_status(current_admin: dict = Depends(get_current_admin)):
+    """Per read replica: data version, lag behind the primary, open read sessions, whether it is used."""
+    return get_replica_status()
+
+@router.get("/reports")
+def report_status(current_admin: dict = Depends(get_current_admin)):
+    """Precomputed analytics reports: data version and time of the stored result, compute time, last error."""
+    return get_report_status()
+
+@router.get("/response-cache")
+def response_cache(current_admin: dict = Depends(get_current_admin)):
+    """Hit/miss/304 counters and the current data version of the response cache."""
+    return response_cache_stats()
+
+@router.delete("/response-cache")
+def reset_response_cache(current_admin: dict = Depends(get_current_admin)):
+    """Drop every cached response (entries also expire by themselves on the next data version)."""
+    clear_response_cache()
+    return response_cache_stats()
+
+@router.post("/analytics-summary/rebuild")
+def rebuild_analytics_summary(
+    db: Session = Depends(get_db),
+    current_admin: dict = Depends(get_current_admin),
+):
+    """Recompute the materialized analytics sums and sketches from scratch (after out-of-band writes)."""
+    moments = rebuild_summary(db)
+    return {
+        "pairs": {pair: {"n": m.n} for pair, m in moments.items()},
+        "sketches": {metric: {"n": s.n} for metric, s in get_sketches(db).items()},
+    }
+
+@router.post("/search-index/rebuild")
+def rebuild_search_index(
+    db: Session = Depends(get_db),
+    current_admin: dict = Depends(get_current_admin),
+):
+    """Rebuild the student name trigram index (after out-of-band writes), on every shard."""
+    def rebuild(shard_db: Session) -> int:
+        indexed = rebuild_name_index(shard_db)
+        # cached /analytics/study-duration/{department}/{name} responses matched names on the old index
+        bump_data_version(shard_db)
+        shard_db.commit()
+        return indexed
+
+    return {"students_indexed": sum(scatter(db, rebuild))}
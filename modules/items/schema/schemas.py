@@ -32,6 +32,7 @@ class StudentCreate(StudentBase):
 
 class StudentOut(StudentBase):
     id: int
+    participation_category: Optional[str] = None
 
     class Config:
         orm_mode = True
@@ -0,0 +1,170 @@
+# modules/items/services/aggregates.py
+import math
+from itertools import chain
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from database import SHARDING_ENABLED, scatter
+from modules.items.services import stats
+
+# dialects that can compute percentile_cont(...) WITHIN GROUP inside a grouped SELECT
+_NATIVE_PERCENTILE_DIALECTS = {"postgresql", "oracle", "mssql"}
+
+_SIMPLE_OPS = {
+    "avg": func.avg,
+    "count": func.count,
+    "min": func.min,
+    "max": func.max,
+    "sum": func.sum,
+}
+
+
+def _float(v):
+    return float(v) if v is not None else None
+
+
+def _present(parts: List[Dict[str, Any]], key: str) -> List[Any]:
+    """Non-NULL values of ``key`` across per-shard partials."""
+    return [part[key] for part in parts if part[key] is not None]
+
+
+class AggregateQuery:
+    """
+    Build one grouped ``SELECT`` computing many per-column aggregates.
+
+        profile = (
+            AggregateQuery(Student.department)
+            .add("avg_hours", "avg", Student.study_hours_per_week)
+            .add("p50_hours", "percentile", Student.study_hours_per_week, q=0.5)
+            .run(db, Student.department == "Business")
+        )
+
+    Supported ops: avg, count, min, max, sum, stddev (population) and
+    percentile. NULLs are ignored per column, exactly like separate
+    ``func.avg(col) ... WHERE col IS NOT NULL`` queries. Percentiles are
+    computed in SQL on dialects with ``percentile_cont``; elsewhere they come
+    from a single extra (group, value) scan per column.
+
+    With sharding every shard runs the query in parallel for mergeable
+    partials (avg as sum + count, stddev as sums of x and x²), which are
+    combined here; percentiles always come from the merged value scan.
+    """
+
+    def __init__(self, group_by=None):
+        self.group_by = group_by
+        self._specs: List[Tuple[str, str, Any, Optional[float]]] = []
+
+    def add(self, label: str, op: str, column, q: Optional[float] = None) -> "AggregateQuery":
+        if op not in _SIMPLE_OPS and op not in ("stddev", "percentile"):
+            raise ValueError(f"Unsupported aggregate: {op}")
+        if op == "percentile" and q is None:
+            raise ValueError("percentile aggregate needs q")
+        self._specs.append((label, op, column, q))
+        return self
+
+    def run(self, db: Session, *filters) -> Dict[Any, Dict[str, Any]]:
+        """Return ``{group_value: {label: value}}`` (group ``None`` when ungrouped)."""
+        if SHARDING_ENABLED:
+            return self._run_sharded(db, filters)
+        return self._run(db, filters)
+
+    def _run(self, db: Session, filters) -> Dict[Any, Dict[str, Any]]:
+        dialect = db.get_bind().dialect.name
+        native_percentile = dialect in _NATIVE_PERCENTILE_DIALECTS
+
+        exprs = []
+        readers = []
+        deferred_percentiles = []
+        for label, op, column, q in self._specs:
+            if op in _SIMPLE_OPS:
+                readers.append((label, op, len(exprs)))
+                exprs.append(_SIMPLE_OPS[op](column))
+            elif op == "stddev":
+                # portable population stddev: sqrt(E[x^2] - E[x]^2)
+                readers.append((label, op, len(exprs)))
+                exprs.append(func.avg(column))
+                exprs.append(func.avg(column * column))
+            elif native_percentile:
+                readers.append((label, op, len(exprs)))
+                exprs.append(func.percentile_cont(q).within_group(column))
+            else:
+                deferred_percentiles.append((label, column, q))
+
+        group_cols = [self.group_by] if self.group_by is not None else []
+        stmt = select(*group_cols, *exprs).where(*filters)
+        if self.group_by is not None:
+            stmt = stmt.group_by(self.group_by).order_by(self.group_by)
+
+        offset = len(group_cols)
+        results: Dict[Any, Dict[str, Any]] = {}
+        for row in db.execute(stmt).all():
+            group = row[0] if group_cols else None
+            values = {}
+            for label, op, idx in readers:
+                raw = row[offset + idx]
+                if op == "count":
+                    values[label] = int(raw or 0)
+                elif op == "stddev":
+                    mean, mean_sq = _float(raw), _float(row[offset + idx + 1])
+                    values[label] = math.sqrt(max(mean_sq - mean * mean, 0.0)) if mean is not None else None
+                else:
+                    values[label] = _float(raw)
+            results[group] = values
+
+        for label, column, q in deferred_percentiles:
+            self._fill_percentile(db, results, label, column, q, filters)
+        return results
+
+    def _run_sharded(self, db: Session, filters) -> Dict[Any, Dict[str, Any]]:
+        partial = AggregateQuery(self.group_by)
+        for label, op, column, q in self._specs:
+            if op == "avg":
+                partial.add(f"{label}:sum", "sum", column).add(f"{label}:n", "count", column)
+            elif op == "stddev":
+                partial.add(f"{label}:sum", "sum", column).add(f"{label}:sum_sq", "sum", column * column)
+                partial.add(f"{label}:n", "count", column)
+            elif op != "percentile":
+                partial.add(label, op, column)
+
+        by_group: Dict[Any, List[Dict[str, Any]]] = {}
+        for part in scatter(db, lambda shard_db: partial._run(shard_db, filters)):
+            for group, values in part.items():
+                by_group.setdefault(group, []).append(values)
+
+        results: Dict[Any, Dict[str, Any]] = {}
+        # NULL group first, like ORDER BY on MySQL/SQLite
+        for group in sorted(by_group, key=lambda g: (g is not None, g)):
+            parts = by_group[group]
+            values = {}
+            for label, op, column, q in self._specs:
+                if op == "count":
+                    values[label] = sum(part[label] for part in parts)
+                elif op in ("sum", "min", "max"):
+                    merge = {"sum": sum, "min": min, "max": max}[op]
+                    present = _present(parts, label)
+                    values[label] = merge(present) if present else None
+                elif op in ("avg", "stddev"):
+                    n = sum(part[f"{label}:n"] for part in parts)
+                    mean = sum(_present(parts, f"{label}:sum")) / n if n else None
+                    if op == "stddev" and n:
+                        mean_sq = sum(_present(parts, f"{label}:sum_sq")) / n
+                        mean = math.sqrt(max(mean_sq - mean * mean, 0.0))
+                    values[label] = mean
+            results[group] = values
+
+        for label, op, column, q in self._specs:
+            if op == "percentile":
+                self._fill_percentile(db, results, label, column, q, filters)
+        return results
+
+    def _fill_percentile(self, db, results, label, column, q, filters) -> None:
+        group_cols = [self.group_by] if self.group_by is not None else []
+        stmt = select(*group_cols, column).where(column.isnot(None), *filters)
+        values_by_group: Dict[Any, List[float]] = {}
+        for row in chain.from_iterable(scatter(db, lambda shard_db: shard_db.execute(stmt).all())):
+            group = row[0] if group_cols else None
+            values_by_group.setdefault(group, []).append(row[-1])
+        for group, values in results.items():
+            values[label] = stats.percentile(values_by_group.get(group, []), q)
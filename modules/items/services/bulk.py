@@ -0,0 +1,105 @@
+# modules/items/services/bulk.py
+from typing import Dict, List, Sequence
+
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from modules.items.models import Student
+from modules.items.services.categories import score_to_category
+from modules.items.services.search import reindex_students
+from modules.items.services.summary import apply_student_changes, fetch_old_rows
+from modules.items.services.versioning import bump_data_version
+
+students_table = Student.__table__
+
+_CONFLICT_INSERTS = {
+    "postgresql": postgresql_insert,
+    "sqlite": sqlite_insert,
+}
+
+
+def _update_columns(rows: Sequence[Dict]) -> List[str]:
+    return [key for key in rows[0].keys() if key != "student_id"]
+
+
+def _upsert_statement(dialect: str, columns: List[str]):
+    if dialect == "mysql":
+        stmt = mysql_insert(students_table)
+        if not columns:
+            return stmt.prefix_with("IGNORE")
+        return stmt.on_duplicate_key_update({c: stmt.inserted[c] for c in columns})
+
+    stmt = _CONFLICT_INSERTS[dialect](students_table)
+    if not columns:
+        return stmt.on_conflict_do_nothing(index_elements=["student_id"])
+    return stmt.on_conflict_do_update(
+        index_elements=["student_id"],
+        set_={c: stmt.excluded[c] for c in columns},
+    )
+
+
+def _upsert_fallback(db: Session, rows: Sequence[Dict], columns: List[str]) -> None:
+    # dialect tanpa ON CONFLICT: satu SELECT untuk key yang sudah ada, lalu dua executemany
+    keys = [row["student_id"] for row in rows]
+    existing = set(
+        db.execute(select(students_table.c.student_id).where(students_table.c.student_id.in_(keys))).scalars()
+    )
+    new_rows = [row for row in rows if row["student_id"] not in existing]
+    old_rows = [row for row in rows if row["student_id"] in existing]
+
+    if new_rows:
+        db.execute(students_table.insert(), new_rows)
+    if old_rows and columns:
+        stmt = (
+            update(students_table)
+            .where(students_table.c.student_id == bindparam("_key"))
+            .values({c: bindparam(c) for c in columns})
+        )
+        db.execute(stmt, [{**row, "_key": row["student_id"]} for row in old_rows])
+
+
+def upsert_students(db: Session, rows: Sequence[Dict], update_existing: bool = True) -> int:
+    """
+    Insert or update ``rows`` keyed on ``Student.student_id`` with one batched
+    (executemany) statement. Every row must carry the same keys. The caller owns
+    the transaction; nothing is committed here (the summary, search index and
+    data version are updated in the same transaction).
+    """
+    if not rows:
+        return 0
+    if "participation_score" in rows[0] and "participation_category" not in rows[0]:
+        # Core inserts skip the ORM before_insert hook, so derive it here
+        rows = [{**row, "participation_category": score_to_category(row["participation_score"])} for row in rows]
+
+    columns = _update_columns(rows) if update_existing else []
+    current = fetch_old_rows(db, {row["student_id"] for row in rows})
+
+    dialect = db.get_bind().dialect.name
+    if dialect == "mysql" or dialect in _CONFLICT_INSERTS:
+        db.execute(_upsert_statement(dialect, columns), list(rows))
+    else:
+        _upsert_fallback(db, rows, columns)
+
+    _apply_summary_delta(db, rows, current, update_existing)
+    if "first_name" in rows[0] or "last_name" in rows[0]:
+        reindex_students(db, {row["student_id"] for row in rows})
+    bump_data_version(db)
+    return len(rows)
+
+
+def _apply_summary_delta(db: Session, rows: Sequence[Dict], current: Dict[str, Dict], update_existing: bool) -> None:
+    # replay the batch in order so repeated student_ids only count their last version
+    old_rows, new_rows = [], []
+    for row in rows:
+        previous = current.get(row["student_id"])
+        if previous is not None and not update_existing:
+            continue
+        merged = {**previous, **row} if previous is not None else row
+        if previous is not None:
+            old_rows.append(previous)
+        new_rows.append(merged)
+        current[row["student_id"]] = merged
+    apply_student_changes(db, old_rows, new_rows)
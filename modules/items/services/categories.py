@@ -0,0 +1,51 @@
+# modules/items/services/categories.py
+import numpy as np
+from sqlalchemy import case
+
+# Participation is stored as 0-100; categorize directly on that scale.
+VERY_GOOD_MIN_PERCENT = 90  # very good: >= 90%
+GOOD_MIN_PERCENT = 75       # good: >= 75% and < 90%
+AVERAGE_MIN_PERCENT = 50    # average: >= 50% and < 75%
+
+PARTICIPATION_CATEGORIES = ("very-good", "good", "average", "bad")
+
+
+def score_to_category(score_0_100):
+    """Bucket participation_score into a human-readable category."""
+    if score_0_100 is None:
+        return None
+    if score_0_100 >= VERY_GOOD_MIN_PERCENT:
+        return "very-good"
+    if score_0_100 >= GOOD_MIN_PERCENT:
+        return "good"
+    if score_0_100 >= AVERAGE_MIN_PERCENT:
+        return "average"
+    return "bad"
+
+
+def category_array(scores: np.ndarray) -> list:
+    """Vectorized ``score_to_category`` for a float array (NaN -> None)."""
+    scores = np.asarray(scores, dtype=np.float64)
+    with np.errstate(invalid="ignore"):
+        categories = np.select(
+            [
+                scores >= VERY_GOOD_MIN_PERCENT,
+                scores >= GOOD_MIN_PERCENT,
+                scores >= AVERAGE_MIN_PERCENT,
+                scores < AVERAGE_MIN_PERCENT,
+            ],
+            list(PARTICIPATION_CATEGORIES),
+            default=None,
+        )
+    return categories.tolist()
+
+
+def category_case(score_column):
+    """SQL ``CASE`` computing the category from ``score_column`` (for backfills)."""
+    return case(
+        (score_column >= VERY_GOOD_MIN_PERCENT, "very-good"),
+        (score_column >= GOOD_MIN_PERCENT, "good"),
+        (score_column >= AVERAGE_MIN_PERCENT, "average"),
+        (score_column < AVERAGE_MIN_PERCENT, "bad"),
+        else_=None,
+    )
@@ -0,0 +1,176 @@
+# modules/items/services/hashing.py
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+# pbkdf2 makan CPU dan menahan GIL: hash/verify dikerjakan di process pool
+# terbatas supaya lonjakan login tidak membekukan handler lain.
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(os.cpu_count() or 1, 4))))  # 0 = inline
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))
+PASSWORD_HASH_TIMEOUT_SECONDS = float(os.getenv("PASSWORD_HASH_TIMEOUT", "30"))
+# hashes with other rounds still verify and are rehashed on the next successful login
+PASSWORD_HASH_ROUNDS = int(os.getenv("PASSWORD_HASH_ROUNDS", "29000"))
+
+pwd_context = CryptContext(
+    # pbkdf2_sha256 avoids bcrypt's 72-byte limit; bcrypt variants kept for backward compatibility if any
+    schemes=["pbkdf2_sha256", "bcrypt_sha256", "bcrypt"],
+    deprecated="auto",
+    pbkdf2_sha256__default_rounds=PASSWORD_HASH_ROUNDS,
+    pbkdf2_sha256__min_rounds=PASSWORD_HASH_ROUNDS,
+    pbkdf2_sha256__max_rounds=PASSWORD_HASH_ROUNDS,
+)
+
+
+# --- worker functions (module level so they pickle into the pool) ---
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _hash_many(passwords: Sequence[str]) -> List[str]:
+    return [pwd_context.hash(p) for p in passwords]
+
+
+def _verify_and_update(password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    try:
+        return pwd_context.verify_and_update(password, hashed)
+    except ValueError:  # malformed/unknown hash
+        return False, None
+
+
+class _InlineExecutor(Executor):
+    def submit(self, fn, *args, **kwargs) -> Future:
+        future: Future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as exc:
+            future.set_exception(exc)
+        return future
+
+
+_executor: Optional[Executor] = None
+_executor_lock = threading.Lock()
+_pending = threading.BoundedSemaphore(PASSWORD_HASH_MAX_PENDING)
+
+
+def _get_executor() -> Executor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                if PASSWORD_HASH_WORKERS > 0:
+                    # spawn: forking a process that already runs server threads is unsafe
+                    _executor = ProcessPoolExecutor(
+                        PASSWORD_HASH_WORKERS, mp_context=multiprocessing.get_context("spawn")
+                    )
+                else:
+                    _executor = _InlineExecutor()
+    return _executor
+
+
+def _discard_executor(executor: Optional[Executor] = None) -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None and (executor is None or _executor is executor):
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+def shutdown_hashing_pool() -> None:
+    _discard_executor()
+
+
+def _submit(fn, *args) -> Future:
+    """Queue a job, or 429 when PASSWORD_HASH_MAX_PENDING jobs are already in flight."""
+    if not _pending.acquire(blocking=False):
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many password operations in progress, retry shortly",
+            headers={"Retry-After": "1"},
+        )
+    try:
+        executor = _get_executor()
+        try:
+            future = executor.submit(fn, *args)
+        except BrokenProcessPool:
+            # a worker died (OOM kill etc.): replace the pool instead of failing every later call
+            _discard_executor(executor)
+            future = _get_executor().submit(fn, *args)
+    except BaseException:
+        _pending.release()
+        raise
+    future.add_done_callback(lambda _: _pending.release())
+    return future
+
+
+def _timed_out() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Password operations are backed up, retry shortly",
+        headers={"Retry-After": "1"},
+    )
+
+
+def _results(futures: Sequence[Future], timeout: float) -> list:
+    """Each future's result, or 503 after ``timeout`` (queued jobs are dropped, running ones finish)."""
+    try:
+        return [future.result(timeout) for future in futures]
+    except FutureTimeoutError:
+        for future in futures:
+            future.cancel()
+        raise _timed_out()
+
+
+async def _aresult(awaitable, timeout: float):
+    """``await`` with the same 503 on timeout (wait_for cancels the pool job)."""
+    try:
+        return await asyncio.wait_for(awaitable, timeout)
+    except asyncio.TimeoutError:
+        raise _timed_out()
+
+
+def hash_password(password: str) -> str:
+    return _results([_submit(_hash, password)], PASSWORD_HASH_TIMEOUT_SECONDS)[0]
+
+
+def _submit_batch(fn, passwords: List[str]) -> List[Future]:
+    """One job per worker, each taking one queue slot."""
+    if not passwords:
+        return []
+    size = -(-len(passwords) // max(PASSWORD_HASH_WORKERS, 1))
+    return [_submit(fn, passwords[i:i + size]) for i in range(0, len(passwords), size)]
+
+
+def hash_passwords(passwords: Sequence[str]) -> List[str]:
+    """Hash a batch in parallel across the pool."""
+    futures = _submit_batch(_hash_many, list(passwords))
+    timeout = PASSWORD_HASH_TIMEOUT_SECONDS * len(futures)
+    return [h for chunk in _results(futures, timeout) for h in chunk]
+
+
+async def ahash_password(password: str) -> str:
+    return await _aresult(asyncio.wrap_future(_submit(_hash, password)), PASSWORD_HASH_TIMEOUT_SECONDS)
+
+
+async def ahash_passwords(passwords: Sequence[str]) -> List[str]:
+    """``hash_passwords`` for async handlers: awaited, the event loop keeps running."""
+    futures = [asyncio.wrap_future(f) for f in _submit_batch(_hash_many, list(passwords))]
+    chunks = await _aresult(asyncio.gather(*futures), PASSWORD_HASH_TIMEOUT_SECONDS * max(len(futures), 1))
+    return [h for chunk in chunks for h in chunk]
+
+
+def verify_and_update(password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    """``(valid, new_hash)``; ``new_hash`` is set when the stored hash should be replaced."""
+    return _results([_submit(_verify_and_update, password, hashed)], PASSWORD_HASH_TIMEOUT_SECONDS)[0]
+
+
+async def averify_and_update(password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    future = _submit(_verify_and_update, password, hashed)
+    return await _aresult(asyncio.wrap_future(future), PASSWORD_HASH_TIMEOUT_SECONDS)
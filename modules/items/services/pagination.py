@@ -0,0 +1,88 @@
+# modules/items/services/pagination.py
+import base64
+import binascii
+import heapq
+import json
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+
+from database import SHARDING_ENABLED, read_sessions, scatter
+from modules.items.services.serialization import dumps
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+# rows fetched per round-trip from the server-side cursor while streaming
+STREAM_BATCH_SIZE = 1000
+
+
+def encode_cursor(key: Dict[str, Any]) -> str:
+    """Opaque, URL-safe cursor for the last row of a page."""
+    raw = json.dumps(key, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str], *fields: str) -> Optional[Dict[str, Any]]:
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        key = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(key, dict) or any(f not in key for f in fields):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return key
+
+
+def ndjson_response(items: Iterable[Dict]) -> StreamingResponse:
+    """Stream already computed rows, one JSON document per line."""
+    return StreamingResponse((dumps(item) + b"\n" for item in items), media_type=NDJSON_MEDIA_TYPE)
+
+
+def merged_rows(db: Session, stmt, key: Callable[[Row], Any], limit: Optional[int] = None, skip: int = 0) -> List[Row]:
+    """
+    Rows of ``stmt`` (whose ORDER BY matches ``key``) after ``skip``, at most
+    ``limit``. With sharding every shard returns its first ``skip + limit``
+    rows and they are merged on ``key``.
+    """
+    if not SHARDING_ENABLED:
+        if skip:
+            stmt = stmt.offset(skip)
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        return db.execute(stmt).all()
+    if limit is not None:
+        stmt = stmt.limit(skip + limit)
+    parts = scatter(db, lambda shard_db: shard_db.execute(stmt).all())
+    return list(islice(heapq.merge(*parts, key=key), skip, None if limit is None else skip + limit))
+
+
+def stream_query_ndjson(stmt, serialize: Callable[[Any], Dict], key: Callable[[Row], Any]) -> StreamingResponse:
+    """
+    Stream ``stmt`` as NDJSON from a server-side cursor, ``STREAM_BATCH_SIZE``
+    rows at a time, so memory stays flat whatever the table size. With
+    sharding one cursor per shard is open and the rows are merged on ``key``
+    (which must match the ORDER BY).
+
+    The generator owns its own (read replica) sessions: FastAPI closes
+    ``get_db`` sessions before a streaming body is sent.
+    """
+    streamed = stmt.execution_options(stream_results=True, yield_per=STREAM_BATCH_SIZE)
+
+    def generate():
+        with read_sessions() as sessions:
+            results = [db.execute(streamed) for db in sessions]
+            if len(results) == 1:
+                for partition in results[0].partitions():
+                    yield b"".join(dumps(serialize(row)) + b"\n" for row in partition)
+                return
+            rows = heapq.merge(*results, key=key)
+            for batch in iter(lambda: list(islice(rows, STREAM_BATCH_SIZE)), []):
+                yield b"".join(dumps(serialize(row)) + b"\n" for row in batch)
+
+    return StreamingResponse(generate(), media_type=NDJSON_MEDIA_TYPE)
@@ -0,0 +1,343 @@
+# modules/items/services/profiling.py
+import contextvars
+import logging
+import os
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Mapper
+
+from database import get_pool_stats
+
+# Profil per request: middleware membuka RequestProfile di contextvar, hook
+# SQLAlchemy menambahkan query/rows/objek ORM ke profil yang sedang aktif.
+# Contextvar ikut ke threadpool (handler sync) dan ke greenlet run_sync (async).
+# Off by default: every cursor gets wrapped and every request accounted -> opt in.
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "0") == "1"
+# respons membawa Server-Timing/X-Query-* kalau request mengirim "X-Debug-Profile: 1"
+PROFILING_DEBUG_HEADER = os.getenv("PROFILING_DEBUG_HEADER", "0") == "1"
+PROFILING_SLOW_QUERY_SECONDS = float(os.getenv("PROFILING_SLOW_QUERY_SECONDS", "0.5"))  # 0 = off
+# the same statement this many times in one request is reported as repeated (N+1)
+PROFILING_REPEATED_QUERY_THRESHOLD = int(os.getenv("PROFILING_REPEATED_QUERY_THRESHOLD", "2"))
+# optional bearer token for GET /metrics; unset = open, like most scrape targets
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+REQUEST_DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DEBUG_REQUEST_HEADER = b"x-debug-profile"
+
+logger = logging.getLogger(__name__)
+
+
+class RequestProfile:
+    """What one request spent in the database and in JSON rendering."""
+
+    __slots__ = ("queries", "query_seconds", "rows", "orm_objects", "serialize_seconds", "statements")
+
+    def __init__(self):
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.rows = 0
+        self.orm_objects = 0
+        self.serialize_seconds = 0.0
+        self.statements: Counter = Counter()
+
+    def repeated(self) -> List[Tuple[str, int]]:
+        return [(s, n) for s, n in self.statements.items() if n >= PROFILING_REPEATED_QUERY_THRESHOLD]
+
+
+_current: contextvars.ContextVar[Optional[RequestProfile]] = contextvars.ContextVar("request_profile", default=None)
+
+
+def add_serialize_time(seconds: float) -> None:
+    profile = _current.get()
+    if profile is not None:
+        profile.serialize_seconds += seconds
+
+
+# --- SQLAlchemy hooks (every engine: sync, async, future ones) ---
+class _CountingCursor:
+    """DBAPI cursor proxy that counts rows handed to the result."""
+
+    __slots__ = ("_cursor", "_profile")
+
+    def __init__(self, cursor, profile: RequestProfile):
+        self._cursor = cursor
+        self._profile = profile
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is not None:
+            self._profile.rows += 1
+        return row
+
+    def fetchmany(self, *args, **kwargs):
+        rows = self._cursor.fetchmany(*args, **kwargs)
+        self._profile.rows += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        self._profile.rows += len(rows)
+        return rows
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started_at"].pop()
+    if PROFILING_SLOW_QUERY_SECONDS and elapsed >= PROFILING_SLOW_QUERY_SECONDS:
+        logger.warning("slow query (%.3fs): %s", elapsed, _one_line(statement))
+    profile = _current.get()
+    if profile is None:
+        return
+    profile.queries += 1
+    profile.query_seconds += elapsed
+    profile.statements[statement] += 1
+    if context is not None and cursor.description is not None:
+        # the result reads rows from context.cursor, which is set up after this hook
+        context.cursor = _CountingCursor(cursor, profile)
+
+
+def _handle_error(exception_context):
+    # the failed statement never reaches after_cursor_execute: drop its start time
+    conn = exception_context.connection
+    if conn is not None:
+        started = conn.info.get("query_started_at")
+        if started:
+            started.pop()
+
+
+def _on_load(target, context):
+    profile = _current.get()
+    if profile is not None:
+        profile.orm_objects += 1
+
+
+_hooks_installed = False
+
+
+def install_query_hooks() -> None:
+    global _hooks_installed
+    if _hooks_installed:
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(Engine, "handle_error", _handle_error)
+    event.listen(Mapper, "load", _on_load)
+    _hooks_installed = True
+
+
+def _one_line(statement: str) -> str:
+    return re.sub(r"\s+", " ", statement).strip()
+
+
+# --- per-route aggregates ---
+class RouteStats:
+    __slots__ = (
+        "requests", "statuses", "duration_sum", "duration_buckets", "queries", "query_seconds",
+        "rows", "orm_objects", "serialize_seconds", "repeated_query_requests",
+    )
+
+    def __init__(self):
+        self.requests = 0
+        self.statuses: Counter = Counter()
+        self.duration_sum = 0.0
+        self.duration_buckets = [0] * (len(REQUEST_DURATION_BUCKETS) + 1)
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.rows = 0
+        self.orm_objects = 0
+        self.serialize_seconds = 0.0
+        self.repeated_query_requests = 0
+
+
+_stats_lock = threading.Lock()
+_route_stats: Dict[Tuple[str, str], RouteStats] = {}
+_reported_repeats: set = set()
+
+
+def _record(method: str, route: str, status: int, seconds: float, profile: RequestProfile) -> None:
+    repeated = profile.repeated()
+    with _stats_lock:
+        stats = _route_stats.get((method, route))
+        if stats is None:
+            stats = _route_stats[(method, route)] = RouteStats()
+        stats.requests += 1
+        stats.statuses[status] += 1
+        stats.duration_sum += seconds
+        stats.duration_buckets[bisect_left(REQUEST_DURATION_BUCKETS, seconds)] += 1
+        stats.queries += profile.queries
+        stats.query_seconds += profile.query_seconds
+        stats.rows += profile.rows
+        stats.orm_objects += profile.orm_objects
+        stats.serialize_seconds += profile.serialize_seconds
+        if repeated:
+            stats.repeated_query_requests += 1
+        new_repeats = [(s, n) for s, n in repeated if (method, route, s) not in _reported_repeats]
+        _reported_repeats.update((method, route, s) for s, _ in new_repeats)
+    # sekali per route+statement per proses, supaya log tidak banjir
+    for statement, count in new_repeats:
+        logger.warning("repeated query on %s %s (%dx in one request): %s", method, route, count, _one_line(statement))
+
+
+def _debug_headers(profile: RequestProfile, seconds: float) -> List[Tuple[bytes, bytes]]:
+    timing = (
+        f'db;dur={profile.query_seconds * 1000:.2f};desc="{profile.queries} queries", '
+        f"serialize;dur={profile.serialize_seconds * 1000:.2f}, app;dur={seconds * 1000:.2f}"
+    )
+    headers = [
+        (b"server-timing", timing.encode()),
+        (b"x-query-count", str(profile.queries).encode()),
+        (b"x-query-rows", str(profile.rows).encode()),
+        (b"x-orm-objects", str(profile.orm_objects).encode()),
+    ]
+    repeated = profile.repeated()
+    if repeated:
+        headers.append((b"x-repeated-queries", str(sum(n for _, n in repeated)).encode()))
+    return headers
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware timing each request and recording its ``RequestProfile``
+    under the route template (``/students/{student_id}``, not the raw path).
+    Plain ASGI rather than ``BaseHTTPMiddleware`` so streaming bodies are
+    timed to the last chunk and nothing is buffered.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        install_query_hooks()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile()
+        token = _current.set(profile)
+        started = time.perf_counter()
+        status_code = 500
+        debug = PROFILING_DEBUG_HEADER and (DEBUG_REQUEST_HEADER, b"1") in scope.get("headers", ())
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if debug:
+                    message = {
+                        **message,
+                        "headers": [*message.get("headers", []), *_debug_headers(profile, time.perf_counter() - started)],
+                    }
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            route = scope.get("route")
+            _record(
+                scope["method"],
+                getattr(route, "path", "<unmatched>"),
+                status_code,
+                time.perf_counter() - started,
+                profile,
+            )
+
+
+# --- Prometheus text format ---
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+
+
+def _labels(**labels) -> str:
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def _bucket_lines(name: str, bounds, counts, total_sum: float, **labels) -> List[str]:
+    lines = []
+    cumulative = 0
+    for bound, count in zip(list(bounds) + [float("inf")], counts):
+        cumulative += count
+        le = "+Inf" if bound == float("inf") else repr(float(bound))
+        lines.append(f"{name}_bucket{_labels(**labels, le=le)} {cumulative}")
+    lines.append(f"{name}_sum{_labels(**labels)} {total_sum}")
+    lines.append(f"{name}_count{_labels(**labels)} {cumulative}")
+    return lines
+
+
+_COUNTERS = (
+    ("app_db_queries_total", "queries", "SQL statements executed while serving the route."),
+    ("app_db_query_seconds_total", "query_seconds", "Time spent executing SQL for the route."),
+    ("app_db_rows_fetched_total", "rows", "Rows fetched from the database for the route."),
+    ("app_orm_objects_loaded_total", "orm_objects", "ORM instances loaded for the route."),
+    ("app_serialization_seconds_total", "serialize_seconds", "Time spent rendering JSON responses for the route."),
+    ("app_repeated_query_requests_total", "repeated_query_requests",
+     "Requests that ran the same statement PROFILING_REPEATED_QUERY_THRESHOLD+ times (N+1)."),
+)
+
+
+def render_metrics() -> str:
+    """Every per-route aggregate and the connection-pool stats in Prometheus text format."""
+    with _stats_lock:
+        snapshot = [
+            (method, route, {slot: getattr(stats, slot) for slot in RouteStats.__slots__})
+            for (method, route), stats in sorted(_route_stats.items())
+        ]
+        for _, _, values in snapshot:
+            values["statuses"] = dict(values["statuses"])
+            values["duration_buckets"] = list(values["duration_buckets"])
+
+    lines = [
+        "# HELP http_requests_total Requests served, by route template and status.",
+        "# TYPE http_requests_total counter",
+    ]
+    for method, route, values in snapshot:
+        for status, count in sorted(values["statuses"].items()):
+            lines.append(f"http_requests_total{_labels(method=method, route=route, status=status)} {count}")
+
+    lines += [
+        "# HELP http_request_duration_seconds Request latency, by route template.",
+        "# TYPE http_request_duration_seconds histogram",
+    ]
+    for method, route, values in snapshot:
+        lines += _bucket_lines(
+            "http_request_duration_seconds", REQUEST_DURATION_BUCKETS,
+            values["duration_buckets"], values["duration_sum"], method=method, route=route,
+        )
+
+    for name, slot, help_text in _COUNTERS:
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+        for method, route, values in snapshot:
+            lines.append(f"{name}{_labels(method=method, route=route)} {values[slot]}")
+
+    pools = get_pool_stats()
+    for key in ("size", "checked_out", "checked_in", "overflow"):
+        lines += [f"# TYPE db_pool_{key} gauge"]
+        for engine_name, pool in pools.items():
+            if key in pool:
+                lines.append(f"db_pool_{key}{_labels(engine=engine_name)} {pool[key]}")
+    for key in ("checkouts", "checkout_timeouts", "connects", "invalidations", "pre_pings", "pre_ping_failures"):
+        lines += [f"# TYPE db_pool_{key}_total counter"]
+        for engine_name, pool in pools.items():
+            lines.append(f"db_pool_{key}_total{_labels(engine=engine_name)} {pool[key]}")
+    lines += ["# TYPE db_pool_checkout_wait_seconds histogram"]
+    for engine_name, pool in pools.items():
+        wait = pool["checkout_wait_seconds"]
+        for le, cumulative in wait["buckets"].items():
+            le = "+Inf" if le == "+Inf" else repr(float(le))
+            lines.append(f"db_pool_checkout_wait_seconds_bucket{_labels(engine=engine_name, le=le)} {cumulative}")
+        lines.append(f"db_pool_checkout_wait_seconds_sum{_labels(engine=engine_name)} {wait['sum']}")
+        lines.append(f"db_pool_checkout_wait_seconds_count{_labels(engine=engine_name)} {wait['count']}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,78 @@
+# modules/items/services/projections.py
+from operator import attrgetter
+from typing import List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+
+from modules.items.models import Student
+from modules.items.services.pagination import merged_rows
+
+
+class Projection:
+    """
+    Named column set for one response shape. Queries through it return
+    ``Row`` tuples with attribute access (``row.student_id``) -- no
+    ``Student`` instances, identity map or change tracking, and no columns
+    the response does not use (``hashed_password`` in particular).
+    """
+
+    def __init__(self, *columns):
+        self.columns = tuple(columns)
+
+    def select(self):
+        return select(*self.columns)
+
+    def all(self, db: Session, *filters, order_by=(Student.id,), limit: Optional[int] = None, key=attrgetter("id")) -> List[Row]:
+        """``key`` is ``order_by`` as a Python sort key (merges shards)."""
+        return merged_rows(db, self.select().where(*filters).order_by(*order_by), key, limit=limit)
+
+    def first(self, db: Session, *filters) -> Optional[Row]:
+        return db.execute(self.select().where(*filters).limit(1)).first()
+
+
+# StudentOut: every column except hashed_password
+STUDENT_OUT = Projection(*[c for c in Student.__table__.columns if c.name not in ("hashed_password", "score_delta")])
+
+PARTICIPATION = Projection(
+    Student.id,
+    Student.student_id,
+    Student.first_name,
+    Student.last_name,
+    Student.participation_score,
+    Student.participation_category,
+)
+
+STUDY = Projection(
+    Student.id,
+    Student.student_id,
+    Student.first_name,
+    Student.last_name,
+    Student.study_hours_per_week,
+    Student.attendance_percent,
+    Student.midterm_score,
+    Student.final_score,
+    Student.grade,
+    Student.stress_level,
+    Student.sleep_hours_per_night,
+)
+
+TREND = Projection(
+    Student.id,
+    Student.student_id,
+    Student.first_name,
+    Student.last_name,
+    Student.midterm_score,
+    Student.final_score,
+    Student.score_delta,
+)
+
+TREND_DETAIL = Projection(
+    *TREND.columns,
+    Student.attendance_percent,
+    Student.study_hours_per_week,
+    Student.quizzes_avg,
+    Student.sleep_hours_per_night,
+    Student.extracurricular_activities,
+)
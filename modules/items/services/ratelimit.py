@@ -0,0 +1,46 @@
+# modules/items/services/ratelimit.py
+import threading
+import time
+from collections import OrderedDict
+from typing import Hashable
+
+
+class TokenBucketLimiter:
+    """
+    In-memory token buckets, one per key: ``capacity`` tokens refilled at
+    ``capacity / period`` per second. Per process only, like the other caches.
+    Buckets are kept in an LRU of ``maxsize`` keys; an evicted key starts full.
+    """
+
+    def __init__(self, capacity: int, period: float, maxsize: int = 100000):
+        self.capacity = capacity
+        self.rate = capacity / period if period > 0 else 0.0
+        self.maxsize = maxsize
+        self._buckets: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.capacity > 0 and self.rate > 0
+
+    def acquire(self, key: Hashable) -> float:
+        """Take one token; returns 0 when allowed, else seconds until a token is available."""
+        if not self.enabled:
+            return 0.0
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.pop(key, (float(self.capacity), now))
+            tokens = min(self.capacity, tokens + (now - updated_at) * self.rate)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / self.rate
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+        return wait
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
@@ -0,0 +1,184 @@
+# modules/items/services/reports.py
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from fastapi import Request
+from sqlalchemy.orm import Session
+
+from database import read_session, scatter
+from modules.items.services.versioning import current_data_version, session_data_version
+
+# Laporan analitik berat (low-activity, korelasi) dihitung di thread latar
+# belakang dan disimpan per versi data; endpoint langsung menyajikan hasil
+# terakhir (dengan computed_at) dan ?fresh=true menghitung ulang saat itu juga.
+# Tiap proses worker uvicorn menjalankan thread-nya sendiri.
+ANALYTICS_REPORT_WORKER = os.getenv("ANALYTICS_REPORT_WORKER", "1") == "1"
+# how often the worker looks at the data version
+ANALYTICS_REPORT_POLL_SECONDS = float(os.getenv("ANALYTICS_REPORT_POLL_SECONDS", "2"))
+# recompute this often even without a data change (0 = only on change)
+ANALYTICS_REPORT_REFRESH_SECONDS = float(os.getenv("ANALYTICS_REPORT_REFRESH_SECONDS", "300"))
+
+logger = logging.getLogger(__name__)
+
+# (report name, compute args)
+ReportKey = Tuple[str, Tuple]
+
+
+class Report:
+    """One computed result of a registered report, tagged with the data version it was computed from."""
+
+    __slots__ = ("data", "version", "computed_at", "seconds", "built_at")
+
+    def __init__(self, data: Any, version: int, seconds: float):
+        self.data = data
+        self.version = version
+        self.computed_at = datetime.utcnow()
+        self.seconds = seconds
+        self.built_at = time.monotonic()
+
+    def is_current(self) -> bool:
+        return self.version == current_data_version()
+
+    def meta(self) -> Dict:
+        """Fields every report response carries."""
+        return {"computed_at": self.computed_at.isoformat(), "data_version": self.version}
+
+
+_registry: Dict[str, Callable[..., Any]] = {}
+# keys the worker keeps current: warm ones from the start, others once requested
+_keys: Dict[ReportKey, None] = {}
+_reports: Dict[ReportKey, Report] = {}
+_errors: Dict[ReportKey, str] = {}
+_key_locks: Dict[ReportKey, threading.Lock] = {}
+_lock = threading.Lock()
+
+
+def register(name: str, compute: Callable[..., Any], warm: Iterable[Tuple] = ()) -> None:
+    """
+    ``compute(db, *args)`` builds report ``name``; each tuple in ``warm`` is
+    precomputed by the worker from startup instead of on first request.
+    """
+    _registry[name] = compute
+    for args in warm:
+        _keys[(name, tuple(args))] = None
+
+
+def _key_lock(key: ReportKey) -> threading.Lock:
+    with _lock:
+        return _key_locks.setdefault(key, threading.Lock())
+
+
+def _compute(db: Session, key: ReportKey, requested_at: Optional[float] = None) -> Report:
+    with _key_lock(key):
+        report = _reports.get(key)
+        # computed by someone else while this call waited for the lock
+        if requested_at is not None and report is not None and report.built_at >= requested_at:
+            return report
+        # the version ``db`` sees (a lagging replica's is older), read before computing:
+        # a write during the computation leaves the report one version behind
+        version = sum(scatter(db, session_data_version))
+        started = time.perf_counter()
+        name, args = key
+        report = Report(_registry[name](db, *args), version, time.perf_counter() - started)
+        _reports[key] = report
+        _errors.pop(key, None)
+        return report
+
+
+def get_report(db: Session, name: str, *args: Hashable, fresh: bool = False) -> Report:
+    """
+    Latest stored result of ``name`` for ``args``. Computed on the spot with
+    ``db`` when there is none yet, when ``fresh`` is set, or -- without the
+    background worker -- when the data changed since; otherwise returned
+    as is, even if the worker has not caught up with a write yet.
+    """
+    key = (name, tuple(args))
+    _keys[key] = None
+    report = _reports.get(key)
+    if report is None or fresh or (not _worker_running() and not report.is_current()):
+        return _compute(db, key, requested_at=time.monotonic())
+    return report
+
+
+def mark_report_version(request: Request, report: Report) -> None:
+    # response_cache tidak menyimpan laporan yang versinya di bawah kunci cache
+    read_version = getattr(request.state, "read_version", None)
+    if read_version is None or report.version < read_version:
+        request.state.read_version = report.version
+
+
+def _due(key: ReportKey, version: int) -> bool:
+    report = _reports.get(key)
+    if report is None or report.version != version:
+        return True
+    return 0 < ANALYTICS_REPORT_REFRESH_SECONDS <= time.monotonic() - report.built_at
+
+
+def refresh_reports() -> int:
+    """Recompute every tracked report that is behind the data version or past its refresh interval."""
+    refreshed = 0
+    for key in list(_keys):
+        if not _due(key, current_data_version()):
+            continue
+        try:
+            with read_session() as db:
+                _compute(db, key)
+            refreshed += 1
+        except Exception as exc:  # keep serving the previous result; retried on the next poll
+            _errors[key] = repr(exc)
+            logger.exception("report %s%r failed", *key)
+    return refreshed
+
+
+_stop = threading.Event()
+_worker: Optional[threading.Thread] = None
+
+
+def _worker_running() -> bool:
+    return _worker is not None and _worker.is_alive()
+
+
+def _run_worker() -> None:
+    while True:
+        refresh_reports()
+        if _stop.wait(ANALYTICS_REPORT_POLL_SECONDS):
+            return
+
+
+def start_report_worker() -> None:
+    global _worker
+    if not ANALYTICS_REPORT_WORKER or _worker_running():
+        return
+    _stop.clear()
+    _worker = threading.Thread(target=_run_worker, name="analytics-reports", daemon=True)
+    _worker.start()
+
+
+def stop_report_worker() -> None:
+    global _worker
+    _stop.set()
+    if _worker is not None:
+        _worker.join()
+        _worker = None
+
+
+def get_report_status() -> List[Dict]:
+    version = current_data_version()
+    status = []
+    for key in list(_keys):
+        name, args = key
+        report = _reports.get(key)
+        status.append({
+            "name": name,
+            "args": list(args),
+            "data_version": report.version if report else None,
+            "current": report is not None and report.version == version,
+            "computed_at": report.computed_at.isoformat() if report else None,
+            "compute_seconds": report.seconds if report else None,
+            "error": _errors.get(key),
+        })
+    return status
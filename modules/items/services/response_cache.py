@@ -0,0 +1,178 @@
+# modules/items/services/response_cache.py
+import hashlib
+import json
+import os
+import threading
+from typing import Callable, Dict, Optional, Tuple
+
+from fastapi import Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.routing import APIRoute
+from fastapi.security.utils import get_authorization_scheme_param
+
+from auth import admin_from_token
+from modules.items.services.cache import TTLCache
+from modules.items.services.versioning import current_data_version
+
+# memory (default) | redis | off
+RESPONSE_CACHE_BACKEND = os.getenv("RESPONSE_CACHE_BACKEND", "memory").lower()
+RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("RESPONSE_CACHE_TTL", "300"))
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "256"))
+RESPONSE_CACHE_REDIS_URL = os.getenv("RESPONSE_CACHE_REDIS_URL", "redis://localhost:6379/0")
+
+# (etag, media type, body)
+CachedBody = Tuple[str, str, bytes]
+
+
+class MemoryBackend:
+    """Per-process LRU (services/cache.py)."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize, ttl)
+
+    def get(self, key: str) -> Optional[CachedBody]:
+        return self._cache.get(key)
+
+    def set(self, key: str, entry: CachedBody) -> None:
+        self._cache.set(key, entry)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+
+class RedisBackend:
+    """Shared across workers; any Redis-protocol server works (redis, valkey, keydb...)."""
+
+    prefix = "respcache:"
+
+    def __init__(self, url: str, ttl: float):
+        import redis  # optional dependency, only needed for this backend
+
+        self._client = redis.Redis.from_url(url)
+        self._ttl = max(int(ttl), 1)
+
+    def get(self, key: str) -> Optional[CachedBody]:
+        raw = self._client.get(self.prefix + key)
+        if raw is None:
+            return None
+        header, body = raw.split(b"\n", 1)
+        etag, media_type = json.loads(header)
+        return etag, media_type, body
+
+    def set(self, key: str, entry: CachedBody) -> None:
+        etag, media_type, body = entry
+        header = json.dumps([etag, media_type]).encode()
+        self._client.set(self.prefix + key, header + b"\n" + body, ex=self._ttl)
+
+    def clear(self) -> None:
+        for key in self._client.scan_iter(self.prefix + "*"):
+            self._client.delete(key)
+
+
+def _make_backend():
+    if RESPONSE_CACHE_BACKEND == "off":
+        return None
+    if RESPONSE_CACHE_BACKEND == "redis":
+        return RedisBackend(RESPONSE_CACHE_REDIS_URL, RESPONSE_CACHE_TTL_SECONDS)
+    if RESPONSE_CACHE_BACKEND == "memory":
+        return MemoryBackend(RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL_SECONDS)
+    raise ValueError(f"Unknown RESPONSE_CACHE_BACKEND: {RESPONSE_CACHE_BACKEND}")
+
+
+backend = _make_backend()
+
+_stats_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "not_modified": 0}
+
+
+def _count(name: str) -> None:
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def response_cache_stats() -> Dict:
+    with _stats_lock:
+        return {"backend": RESPONSE_CACHE_BACKEND, "data_version": current_data_version(), **_stats}
+
+
+def clear_response_cache() -> None:
+    if backend is not None:
+        backend.clear()
+
+
+def _cache_key(request: Request, version: int) -> str:
+    query = sorted(request.query_params.multi_items())
+    raw = json.dumps([version, request.url.path, query])
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def _wants_fresh(request: Request) -> bool:
+    # same truthy spellings FastAPI accepts for a ``fresh: bool`` query param
+    return request.query_params.get("fresh", "").lower() in ("1", "true", "on", "yes")
+
+
+def _etag(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def _not_modified(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    return header.strip() == "*" or etag in [tag.strip() for tag in header.split(",")]
+
+
+def _respond(request: Request, entry: CachedBody) -> Response:
+    etag, media_type, body = entry
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if _not_modified(request, etag):
+        _count("not_modified")
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type=media_type, headers=headers)
+
+
+class CachedRoute(APIRoute):
+    """
+    Route class for deterministic admin GET endpoints: the serialized JSON
+    response is cached per (path, query string, data version) and served with
+    a strong ETag; ``If-None-Match`` gets a 304. Only requests carrying a
+    valid admin token are served from (or stored in) the cache -- everything
+    else, ``?fresh=true`` and streamed/non-200 responses go through the
+    normal handler.
+    """
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+        if backend is None or "GET" not in self.methods:
+            return handler
+
+        async def cached_handler(request: Request) -> Response:
+            scheme, token = get_authorization_scheme_param(request.headers.get("authorization"))
+            if scheme.lower() != "bearer" or admin_from_token(token) is None:
+                return await handler(request)
+            # asked for a recompute: neither replay nor keep the answer
+            if _wants_fresh(request):
+                return await handler(request)
+
+            # the version may need a (polled) DB read -> keep it off the event loop
+            version = await run_in_threadpool(current_data_version)
+            key = _cache_key(request, version)
+            entry = await run_in_threadpool(backend.get, key)
+            if entry is not None:
+                _count("hits")
+                return _respond(request, entry)
+
+            _count("misses")
+            response = await handler(request)
+            body = getattr(response, "body", None)
+            if response.status_code != 200 or body is None or response.media_type != "application/json":
+                return response
+            # served by a read replica last seen behind this version: don't cache possibly older data
+            read_version = getattr(request.state, "read_version", None)
+            if read_version is not None and read_version < version:
+                return response
+            entry = (_etag(body), response.media_type, body)
+            await run_in_threadpool(backend.set, key, entry)
+            return _respond(request, entry)
+
+        return cached_handler
@@ -0,0 +1,129 @@
+# modules/items/services/search.py
+import heapq
+from itertools import islice
+from operator import attrgetter
+from typing import Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+
+from database import scatter
+from modules.items.models import Student, StudentNameTrigram
+
+trigram_table = StudentNameTrigram.__table__
+
+# names are padded so every character starts a trigram -> 1-2 char queries are prefix lookups
+_PAD = "  "
+INDEX_BATCH_SIZE = 5000
+
+
+def normalize(text: Optional[str]) -> str:
+    return " ".join((text or "").lower().split())
+
+
+def full_name(first_name: Optional[str], last_name: Optional[str]) -> str:
+    return normalize(" ".join(filter(None, [first_name, last_name])))
+
+
+def trigrams(text: str) -> Set[str]:
+    padded = text + _PAD
+    return {padded[i:i + 3] for i in range(len(text))}
+
+
+def index_students(db: Session, rows: Iterable[Dict]) -> None:
+    """
+    (Re)index ``rows`` (dicts with student_id, first_name, last_name) in the
+    caller's transaction: old trigrams of those students are replaced.
+    """
+    rows = list(rows)
+    if not rows:
+        return
+    keys = [row["student_id"] for row in rows]
+    db.execute(delete(trigram_table).where(trigram_table.c.student_id.in_(keys)))
+    params = [
+        {"trigram": gram, "student_id": row["student_id"]}
+        for row in rows
+        for gram in trigrams(full_name(row.get("first_name"), row.get("last_name")))
+    ]
+    if params:
+        db.execute(trigram_table.insert(), params)
+
+
+def reindex_students(db: Session, student_ids: Iterable[str]) -> None:
+    """Re-read the current names of ``student_ids`` and reindex them (after Core upserts)."""
+    keys = list(student_ids)
+    if not keys:
+        return
+    rows = db.execute(
+        select(Student.student_id, Student.first_name, Student.last_name).where(Student.student_id.in_(keys))
+    ).all()
+    index_students(db, [dict(row._mapping) for row in rows])
+
+
+def rebuild_name_index(db: Session) -> int:
+    """Rebuild the whole index from ``students`` in batches (no commit). Returns students indexed."""
+    db.execute(delete(trigram_table))
+    stmt = select(Student.student_id, Student.first_name, Student.last_name).execution_options(
+        yield_per=INDEX_BATCH_SIZE
+    )
+    total = 0
+    for batch in db.execute(stmt).partitions():
+        index_students(db, [dict(row._mapping) for row in batch])
+        total += len(batch)
+    return total
+
+
+def _candidates(query: str):
+    """
+    student_id subquery whose names may contain ``query``: exact up to three
+    characters, a superset for longer queries (verified afterwards).
+    """
+    if len(query) < 3:
+        # prefix as a range so the (trigram, student_id) index is used on every dialect
+        upper = query[:-1] + chr(ord(query[-1]) + 1)
+        return select(trigram_table.c.student_id).where(
+            trigram_table.c.trigram >= query, trigram_table.c.trigram < upper
+        )
+    grams = {query[i:i + 3] for i in range(len(query) - 2)}
+    return (
+        select(trigram_table.c.student_id)
+        .where(trigram_table.c.trigram.in_(grams))
+        .group_by(trigram_table.c.student_id)
+        .having(func.count(func.distinct(trigram_table.c.trigram)) == len(grams))
+    )
+
+
+def search_students(db: Session, query: str, *filters, columns=None, limit: Optional[int] = None) -> List:
+    """
+    Case-insensitive substring match on first name, last name or "first last",
+    ordered by id. ``columns`` selects Row tuples instead of ``Student``
+    objects (they must include id, first_name and last_name); ``filters``
+    narrow the candidates further, e.g. ``Student.department == "Business"``.
+    Every shard searches its own index; the matches are merged by id.
+    """
+    query = normalize(query)
+    if not query:
+        return []
+    parts = scatter(db, lambda shard_db: _search_shard(shard_db, query, filters, columns, limit))
+    if len(parts) == 1:
+        return parts[0]
+    return list(islice(heapq.merge(*parts, key=attrgetter("id")), limit))
+
+
+def _search_shard(db: Session, query: str, filters, columns, limit: Optional[int]) -> List:
+    stmt = (
+        select(*columns) if columns is not None else select(Student)
+    ).where(Student.student_id.in_(_candidates(query)), *filters).order_by(Student.id)
+    if limit is not None and len(query) <= 3:
+        # up to one trigram the index match is exact, so LIMIT can go to the database
+        stmt = stmt.limit(limit)
+    result = db.execute(stmt)
+    rows = result.all() if columns is not None else result.scalars().all()
+
+    matches = []
+    for row in rows:
+        if query in full_name(row.first_name, row.last_name):
+            matches.append(row)
+            if limit is not None and len(matches) >= limit:
+                break
+    return matches
@@ -0,0 +1,57 @@
+# modules/items/services/serialization.py
+import json
+import time
+from typing import Any, Dict, Iterable, List
+
+from fastapi.responses import JSONResponse
+
+from modules.items.services.profiling import add_serialize_time
+
+try:
+    import orjson
+except ImportError:  # orjson opsional: tanpa itu hasilnya sama, hanya lebih lambat
+    orjson = None
+
+
+def _default(obj):
+    # numpy scalars and anything else JSON does not know (dates without orjson, Decimal...)
+    if hasattr(obj, "item"):
+        return obj.item()
+    return str(obj)
+
+
+def dumps(obj: Any) -> bytes:
+    """Compact JSON bytes; orjson when installed (numpy arrays/scalars included)."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj, separators=(",", ":"), default=_default, ensure_ascii=False).encode()
+
+
+class TimedJSONResponse(JSONResponse):
+    """The app's default response class: stock rendering, timed into the request profile."""
+
+    def render(self, content: Any) -> bytes:
+        started = time.perf_counter()
+        try:
+            return self._encode(content)
+        finally:
+            add_serialize_time(time.perf_counter() - started)
+
+    def _encode(self, content: Any) -> bytes:
+        return super().render(content)
+
+
+class FastJSONResponse(TimedJSONResponse):
+    """
+    JSON response for content that is already JSON-ready (dicts of DB values).
+    Returning it from a handler skips FastAPI's ``jsonable_encoder`` walk and
+    ``response_model`` re-validation, which dominate large list responses.
+    """
+
+    def _encode(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def row_dicts(rows: Iterable) -> List[Dict]:
+    """Column-name -> value dicts for ``select(...)`` result rows."""
+    return [row._asdict() for row in rows]
@@ -0,0 +1,112 @@
+# modules/items/services/sketch.py
+import math
+import random
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from modules.items.services import stats
+
+# capacity decay between levels (KLL paper's c)
+_C = 2.0 / 3.0
+
+
+class KLLSketch:
+    """
+    Mergeable KLL quantile sketch (Karnin, Lang, Liberty 2016).
+
+    Level ``h`` holds items of weight ``2**h``; a full level is sorted and
+    every other item (random offset) is promoted, so memory stays
+    O(k log(n/k)) while total weight stays exactly ``n``. Sketches built on
+    different shards/workers can be ``merge``d and round-trip through
+    ``to_dict``/``from_dict`` (JSON-safe).
+
+    Accuracy: ``rank_error()`` -- about 1.3% normalized rank error at k=200,
+    99% confidence, i.e. the returned q-quantile lies between the true
+    (q - eps) and (q + eps) quantiles. Until the first compaction (n below
+    roughly k) the sketch is exact.
+    """
+
+    def __init__(self, k: int = 200, seed: Optional[int] = None):
+        self.k = k
+        self.n = 0
+        self.levels: List[np.ndarray] = [np.empty(0)]
+        self._rng = random.Random(seed)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(int(math.ceil(self.k * _C ** depth)), 2)
+
+    def _compress(self) -> None:
+        compacted = True
+        while compacted:
+            compacted = False
+            for level in range(len(self.levels)):
+                items = self.levels[level]
+                if len(items) < self._capacity(level):
+                    continue
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                # odd item (the smallest) stays at this level so total weight is preserved
+                keep = items[: len(items) % 2]
+                promoted = items[len(keep):][self._rng.randint(0, 1)::2]
+                self.levels[level] = keep
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+                compacted = True
+
+    def update(self, values: Sequence[float]) -> "KLLSketch":
+        """Add values (NaN/None ignored)."""
+        arr = np.asarray(values, dtype=np.float64).ravel()
+        arr = arr[~np.isnan(arr)]
+        if arr.size:
+            self.n += int(arr.size)
+            self.levels[0] = np.concatenate([self.levels[0], arr])
+            self._compress()
+        return self
+
+    def merge(self, other: "KLLSketch") -> "KLLSketch":
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.n += other.n
+        self._compress()
+        return self
+
+    def quantile(self, q: float) -> Optional[float]:
+        return self.quantiles([q])[0]
+
+    def quantiles(self, qs: Sequence[float]) -> List[Optional[float]]:
+        if not self.n:
+            return [None for _ in qs]
+        if len(self.levels) == 1:
+            # belum pernah compaction -> exact, same interpolation as stats.quantiles
+            return stats.quantiles(self.levels[0], qs)
+
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items), 2 ** h, dtype=np.int64) for h, items in enumerate(self.levels)])
+        order = np.argsort(values, kind="stable")
+        values = values[order]
+        cumulative = np.cumsum(weights[order])
+        out = []
+        for q in qs:
+            idx = int(np.searchsorted(cumulative, q * (self.n - 1), side="right"))
+            out.append(float(values[min(idx, len(values) - 1)]))
+        return out
+
+    def rank_error(self) -> float:
+        """Normalized rank error bound (99% confidence, DataSketches KLL estimate)."""
+        if len(self.levels) == 1:
+            return 0.0
+        return 2.296 / self.k ** 0.9723
+
+    def to_dict(self) -> Dict:
+        return {"k": self.k, "n": self.n, "levels": [items.tolist() for items in self.levels]}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "KLLSketch":
+        sketch = cls(k=int(data["k"]))
+        sketch.n = int(data["n"])
+        sketch.levels = [np.asarray(items, dtype=np.float64) for items in data["levels"]] or [np.empty(0)]
+        return sketch
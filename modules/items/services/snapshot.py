@@ -0,0 +1,125 @@
+# modules/items/services/snapshot.py
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from database import scatter
+from modules.items.models import Student
+from modules.items.services.versioning import current_data_version, session_data_version
+
+# Seconds before the snapshot is rebuilt even without a local write
+# (covers writes from other workers or from import_students.py).
+SNAPSHOT_TTL_SECONDS = float(os.getenv("ANALYTICS_SNAPSHOT_TTL", "60"))
+
+NUMERIC_COLUMNS = (
+    "attendance_percent",
+    "midterm_score",
+    "final_score",
+    "assignments_avg",
+    "quizzes_avg",
+    "participation_score",
+    "projects_score",
+    "total_score",
+    "study_hours_per_week",
+    "stress_level",
+    "sleep_hours_per_night",
+)
+
+
+def _yes_no_to_float(value):
+    if value is None:
+        return np.nan
+    v = str(value).strip().lower()
+    if v == "yes":
+        return 1.0
+    if v == "no":
+        return 0.0
+    return np.nan
+
+
+class StudentSnapshot:
+    """
+    Column-oriented, read-only copy of the numeric ``Student`` columns.
+
+    Every numeric column is a float64 array (NULL -> NaN) with a matching
+    boolean mask in ``present``; row ``i`` of every array is the same student,
+    ordered by ``Student.id``.
+    """
+
+    def __init__(self, rows, version: int):
+        self.version = version
+        self.built_at = time.monotonic()
+        self.size = len(rows)
+
+        columns = list(zip(*rows)) if rows else [()] * (4 + len(NUMERIC_COLUMNS) + 1)
+        self.ids = np.asarray(columns[0], dtype=np.int64)
+        self.student_ids = np.asarray(columns[1], dtype=object)
+        self.first_names = np.asarray(columns[2], dtype=object)
+        self.last_names = np.asarray(columns[3], dtype=object)
+
+        self.values: Dict[str, np.ndarray] = {}
+        for offset, name in enumerate(NUMERIC_COLUMNS, start=4):
+            self.values[name] = np.asarray(columns[offset], dtype=np.float64)
+        # extracurricular_activities disimpan sebagai Yes=1, No=0
+        self.values["extracurricular_activities"] = np.fromiter(
+            (_yes_no_to_float(v) for v in columns[-1]), dtype=np.float64, count=self.size
+        )
+
+        self.present: Dict[str, np.ndarray] = {
+            name: ~np.isnan(values) for name, values in self.values.items()
+        }
+
+    def name(self, i: int) -> str:
+        return " ".join(filter(None, [self.first_names[i], self.last_names[i]]))
+
+    def value(self, column: str, i: int) -> Optional[float]:
+        return float(self.values[column][i]) if self.present[column][i] else None
+
+    def is_fresh(self) -> bool:
+        return (
+            self.version == current_data_version()
+            and time.monotonic() - self.built_at < SNAPSHOT_TTL_SECONDS
+        )
+
+
+def _load_snapshot(db: Session) -> StudentSnapshot:
+    stmt = select(
+        Student.id,
+        Student.student_id,
+        Student.first_name,
+        Student.last_name,
+        *[getattr(Student, name) for name in NUMERIC_COLUMNS],
+        Student.extracurricular_activities,
+    ).order_by(Student.id)
+
+    def load(shard_db: Session):
+        # the version of the data actually read: on a lagging replica it stays below
+        # current_data_version(), so the snapshot is reloaded until the replica catches up
+        return session_data_version(shard_db), shard_db.execute(stmt).all()
+
+    parts = scatter(db, load)
+    # shard id ranges ascend with the shard number -> concatenation stays ordered by id
+    rows = parts[0][1] if len(parts) == 1 else [row for _, shard_rows in parts for row in shard_rows]
+    return StudentSnapshot(rows, sum(version for version, _ in parts))
+
+
+_lock = threading.Lock()
+_snapshot: Optional[StudentSnapshot] = None
+
+
+def get_student_snapshot(db: Session) -> StudentSnapshot:
+    """Return the shared snapshot, rebuilding it when stale."""
+    global _snapshot
+    snapshot = _snapshot
+    if snapshot is not None and snapshot.is_fresh():
+        return snapshot
+    with _lock:
+        if _snapshot is None or not _snapshot.is_fresh():
+            _snapshot = _load_snapshot(db)
+        return _snapshot
+
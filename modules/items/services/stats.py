@@ -0,0 +1,103 @@
+# modules/items/services/stats.py
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+def _as_array(values, mask=None) -> np.ndarray:
+    """Float64 view of ``values`` restricted to ``mask`` (NaN/None always dropped)."""
+    arr = np.asarray(values, dtype=np.float64)
+    if mask is not None:
+        arr = arr[mask]
+    return arr[~np.isnan(arr)] if arr.size else arr
+
+
+def mean(values, mask=None) -> Optional[float]:
+    arr = _as_array(values, mask)
+    return float(arr.mean()) if arr.size else None
+
+
+def quantiles(values, qs: Sequence[float], mask=None) -> List[Optional[float]]:
+    """
+    Linear-interpolated quantiles (same definition as ``numpy.percentile``'s
+    default / the old ``_percentile``) for several ``qs`` with a single
+    ``np.partition`` instead of one full sort per quantile.
+    """
+    arr = _as_array(values, mask)
+    if not arr.size:
+        return [None for _ in qs]
+
+    positions = [(arr.size - 1) * q for q in qs]
+    kth = sorted({int(np.floor(k)) for k in positions} | {int(np.ceil(k)) for k in positions})
+    part = np.partition(arr, kth)
+
+    out = []
+    for k in positions:
+        f, c = int(np.floor(k)), int(np.ceil(k))
+        if f == c:
+            out.append(float(part[f]))
+        else:
+            out.append(float(part[f] + (part[c] - part[f]) * (k - f)))
+    return out
+
+
+def percentile(values, q: float, mask=None) -> Optional[float]:
+    return quantiles(values, [q], mask)[0]
+
+
+def pearson(xs, ys) -> Optional[float]:
+    """Pearson r of two equally long arrays; ``None`` when undefined."""
+    x = np.asarray(xs, dtype=np.float64)
+    y = np.asarray(ys, dtype=np.float64)
+    if x.size < 2 or y.size < 2 or x.size != y.size:
+        return None
+    dx = x - x.mean()
+    dy = y - y.mean()
+    den_x = np.sqrt(np.dot(dx, dx))
+    den_y = np.sqrt(np.dot(dy, dy))
+    if den_x == 0 or den_y == 0:
+        return None
+    return float(np.dot(dx, dy) / (den_x * den_y))
+
+
+def correlation_with(target: np.ndarray, columns: Dict[str, np.ndarray]) -> Dict[str, Dict]:
+    """
+    Pairwise-complete correlation of every column against ``target``.
+
+    NaN marks a missing value; each pair only uses rows where both sides are
+    present. Means and the centred sums for all columns come from one masked
+    (rows x columns) matrix, so the result matches ``pearson`` on the
+    filtered pairs without a Python loop per metric.
+    """
+    names = list(columns.keys())
+    if not names:
+        return {}
+
+    matrix = np.column_stack([np.asarray(columns[n], dtype=np.float64) for n in names])
+    y = np.asarray(target, dtype=np.float64)
+    paired = ~np.isnan(matrix) & ~np.isnan(y)[:, None]
+
+    weights = paired.astype(np.float64)
+    counts = weights.sum(axis=0)
+    x_filled = np.where(paired, matrix, 0.0)
+    y_filled = np.where(paired, y[:, None], 0.0)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean_x = x_filled.sum(axis=0) / counts
+        mean_y = y_filled.sum(axis=0) / counts
+        dx = np.where(paired, matrix - mean_x, 0.0)
+        dy = np.where(paired, y[:, None] - mean_y, 0.0)
+        num = np.einsum("ij,ij->j", dx, dy)
+        den = np.sqrt(np.einsum("ij,ij->j", dx, dx)) * np.sqrt(np.einsum("ij,ij->j", dy, dy))
+        r = num / den
+
+    out = {}
+    for j, name in enumerate(names):
+        n = int(counts[j])
+        out[name] = {
+            "count": n,
+            "pearson_r": float(r[j]) if n >= 2 and den[j] != 0 else None,
+            "mean_x": float(mean_x[j]) if n else None,
+            "mean_y": float(mean_y[j]) if n else None,
+        }
+    return out
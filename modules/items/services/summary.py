@@ -0,0 +1,357 @@
+# modules/items/services/summary.py
+import json
+import math
+import os
+from collections import Counter
+from datetime import datetime
+from functools import reduce
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import and_, bindparam, case, func, select, update
+from sqlalchemy.orm import Session
+
+from database import primary_session, scatter
+from modules.items.models import AnalyticsSketch, AnalyticsSummary, Student
+from modules.items.services.sketch import KLLSketch
+from modules.items.services.versioning import bump_data_version
+
+SKETCH_K = int(os.getenv("ANALYTICS_SKETCH_K", "200"))
+SKETCH_REBUILD_BATCH_SIZE = 10000
+
+summary_table = AnalyticsSummary.__table__
+sketch_table = AnalyticsSketch.__table__
+
+
+def yes_no_to_binary(value):
+    if value is None:
+        return None
+    v = str(value).strip().lower()
+    if v == "yes":
+        return 1.0
+    if v == "no":
+        return 0.0
+    return None
+
+
+def _yes_no_sql(column):
+    normalized = func.lower(func.trim(column))
+    return case((normalized == "yes", 1.0), (normalized == "no", 0.0), else_=None)
+
+
+def _sign(value, minus):
+    if value is None or minus is None:
+        return None
+    return float((value > minus) - (value < minus))
+
+
+def _sign_sql(column, minus):
+    return case((column > minus, 1.0), (column < minus, -1.0), (column == minus, 0.0), else_=None)
+
+
+# pair name -> (x column, y column, x transform). Rows only count when x and y are both present.
+# "sign_minus_y" makes x = sign(x - y): then Σx = improving - declining and Σx² = improving + declining.
+PAIRS = {
+    "quizzes_avg": ("quizzes_avg", "final_score", None),
+    "study_hours_per_week": ("study_hours_per_week", "final_score", None),
+    "extracurricular_activities": ("extracurricular_activities", "final_score", "yes_no"),
+    "attendance_percent": ("attendance_percent", "final_score", None),
+    "sleep_hours_per_night": ("sleep_hours_per_night", "final_score", None),
+    # trend: x = midterm, y = final -> mean delta = mean_y - mean_x
+    "midterm_final": ("midterm_score", "final_score", None),
+    # trend direction: x = sign(final - midterm) -> improving/declining counts
+    "final_midterm_direction": ("final_score", "midterm_score", "sign_minus_y"),
+}
+
+# sketch name -> (column, column subtracted from it or None). Column sketches back the
+# low-activity thresholds; final - midterm backs the activity-trend median delta.
+SKETCH_METRICS = {
+    "attendance_percent": ("attendance_percent", None),
+    "study_hours_per_week": ("study_hours_per_week", None),
+    "quizzes_avg": ("quizzes_avg", None),
+    "sleep_hours_per_night": ("sleep_hours_per_night", None),
+    "final_minus_midterm": ("final_score", "midterm_score"),
+}
+
+# Student columns the write paths must read back (old values) to keep the sums exact
+SUMMARY_COLUMNS = sorted(
+    {x for x, _, _ in PAIRS.values()}
+    | {y for _, y, _ in PAIRS.values()}
+    | {c for cols in SKETCH_METRICS.values() for c in cols if c is not None}
+)
+
+
+class Moments:
+    """n, Σx, Σy, Σxy, Σx², Σy² for one pair; mergeable across batches/shards."""
+
+    __slots__ = ("n", "sum_x", "sum_y", "sum_xy", "sum_x2", "sum_y2")
+
+    def __init__(self, n=0, sum_x=0.0, sum_y=0.0, sum_xy=0.0, sum_x2=0.0, sum_y2=0.0):
+        self.n = int(n or 0)
+        self.sum_x = float(sum_x or 0.0)
+        self.sum_y = float(sum_y or 0.0)
+        self.sum_xy = float(sum_xy or 0.0)
+        self.sum_x2 = float(sum_x2 or 0.0)
+        self.sum_y2 = float(sum_y2 or 0.0)
+
+    def add(self, x: float, y: float, sign: int = 1) -> None:
+        self.n += sign
+        self.sum_x += sign * x
+        self.sum_y += sign * y
+        self.sum_xy += sign * x * y
+        self.sum_x2 += sign * x * x
+        self.sum_y2 += sign * y * y
+
+    def merge(self, other: "Moments") -> "Moments":
+        return Moments(*(getattr(self, f) + getattr(other, f) for f in self.__slots__))
+
+    def mean_x(self) -> Optional[float]:
+        return self.sum_x / self.n if self.n else None
+
+    def mean_y(self) -> Optional[float]:
+        return self.sum_y / self.n if self.n else None
+
+    def sign_counts(self):
+        """``(positive, negative)`` counts for a pair whose x is a sign (-1/0/1)."""
+        return round((self.sum_x2 + self.sum_x) / 2), round((self.sum_x2 - self.sum_x) / 2)
+
+    def pearson(self) -> Optional[float]:
+        if self.n < 2:
+            return None
+        cov = self.sum_xy - self.sum_x * self.sum_y / self.n
+        var_x = self.sum_x2 - self.sum_x * self.sum_x / self.n
+        var_y = self.sum_y2 - self.sum_y * self.sum_y / self.n
+        # relative guard: cancellation can leave a tiny positive variance for constant columns
+        if var_x <= 1e-12 * max(self.sum_x2, 1.0) or var_y <= 1e-12 * max(self.sum_y2, 1.0):
+            return None
+        return cov / math.sqrt(var_x * var_y)
+
+
+def _pair_values(row: Dict, pair: str):
+    x_col, y_col, transform = PAIRS[pair]
+    x, y = row.get(x_col), row.get(y_col)
+    if transform == "yes_no":
+        x = yes_no_to_binary(x)
+    elif transform == "sign_minus_y":
+        x = _sign(x, y)
+    if x is None or y is None:
+        return None
+    return float(x), float(y)
+
+
+def apply_student_changes(db: Session, old_rows: Iterable[Dict], new_rows: Iterable[Dict]) -> None:
+    """
+    Subtract ``old_rows`` and add ``new_rows`` (dicts of Student column
+    values) to the stored sums in the caller's transaction, so the summary
+    commits or rolls back together with the write. A summary that has not
+    been built yet is left alone (the UPDATE matches no rows).
+    """
+    old_rows, new_rows = list(old_rows), list(new_rows)
+    _apply_sketch_changes(db, old_rows, new_rows)
+
+    deltas = {pair: Moments() for pair in PAIRS}
+    for sign, rows in ((-1, old_rows), (1, new_rows)):
+        for row in rows:
+            for pair, moments in deltas.items():
+                values = _pair_values(row, pair)
+                if values is not None:
+                    moments.add(*values, sign=sign)
+
+    params = [
+        {"pair": pair, **{f"d_{f}": getattr(m, f) for f in Moments.__slots__}, "now": datetime.utcnow()}
+        for pair, m in deltas.items()
+        if any(getattr(m, f) for f in Moments.__slots__)
+    ]
+    if not params:
+        return
+    stmt = (
+        update(summary_table)
+        .where(summary_table.c.metric == bindparam("pair"))
+        .values(
+            {
+                **{f: summary_table.c[f] + bindparam(f"d_{f}") for f in Moments.__slots__},
+                "updated_at": bindparam("now"),
+            }
+        )
+    )
+    db.execute(stmt, params)
+
+
+def fetch_old_rows(db: Session, student_ids) -> Dict[str, Dict]:
+    """Current summary-relevant values for ``student_ids`` (before an upsert)."""
+    cols = [Student.student_id, *[getattr(Student, c) for c in SUMMARY_COLUMNS]]
+    rows = db.execute(select(*cols).where(Student.student_id.in_(list(student_ids)))).all()
+    return {row.student_id: dict(row._mapping) for row in rows}
+
+
+def compute_moments(db: Session, *filters) -> Dict[str, Moments]:
+    """Full recompute of every pair with one scan of ``students``."""
+    exprs = []
+    for pair, (x_col, y_col, transform) in PAIRS.items():
+        x = getattr(Student, x_col)
+        y = getattr(Student, y_col)
+        if transform == "yes_no":
+            x = _yes_no_sql(x)
+        elif transform == "sign_minus_y":
+            x = _sign_sql(x, y)
+        both = and_(x.isnot(None), y.isnot(None))
+        exprs += [
+            func.sum(case((both, 1), else_=0)),
+            func.sum(case((both, x))),
+            func.sum(case((both, y))),
+            func.sum(case((both, x * y))),
+            func.sum(case((both, x * x))),
+            func.sum(case((both, y * y))),
+        ]
+    row = db.execute(select(*exprs).where(*filters)).one()
+    width = len(Moments.__slots__)
+    return {pair: Moments(*row[i * width:(i + 1) * width]) for i, pair in enumerate(PAIRS)}
+
+
+def rebuild_summary(db: Session) -> Dict[str, Moments]:
+    """
+    Recompute every pair and sketch from ``students`` and replace the stored
+    rows (commits; every shard). Bumps the data version: cached analytics
+    responses and reports were built from the old rows.
+    """
+    return _merge_moments(scatter(db, lambda shard_db: _rebuild_summary(shard_db, bump=True)))
+
+
+def _rebuild_summary(db: Session, bump: bool = False) -> Dict[str, Moments]:
+    moments = compute_moments(db)
+    now = datetime.utcnow()
+    _rebuild_sketches(db)
+    db.execute(summary_table.delete())
+    db.execute(
+        summary_table.insert(),
+        [{"metric": pair, **{f: getattr(m, f) for f in Moments.__slots__}, "updated_at": now} for pair, m in moments.items()],
+    )
+    if bump:
+        bump_data_version(db)
+    db.commit()
+    return moments
+
+
+def get_summary(db: Session) -> Dict[str, Moments]:
+    """Stored sums for every pair, merged over shards; built on first use (on the primary when ``db`` is a replica)."""
+    return _merge_moments(scatter(db, _stored_summary))
+
+
+def _stored_summary(db: Session) -> Dict[str, Moments]:
+    rows = db.execute(select(summary_table)).all()
+    stored = {row.metric: Moments(*(getattr(row, f) for f in Moments.__slots__)) for row in rows}
+    if set(stored) != set(PAIRS):
+        with primary_session(db) as writer:
+            return _rebuild_summary(writer)
+    return stored
+
+
+def _merge_moments(parts: List[Dict[str, Moments]]) -> Dict[str, Moments]:
+    if len(parts) == 1:
+        return parts[0]
+    return {pair: reduce(Moments.merge, (part[pair] for part in parts)) for pair in PAIRS}
+
+
+def _sketch_value(row: Dict, metric: str) -> Optional[float]:
+    column, minus = SKETCH_METRICS[metric]
+    value = row.get(column)
+    if value is None or minus is None:
+        return None if value is None else float(value)
+    other = row.get(minus)
+    return None if other is None else float(value) - float(other)
+
+
+def sketch_expression(metric: str):
+    """SQL expression for ``metric`` (NULL when any input is NULL, as in ``_sketch_value``)."""
+    column, minus = SKETCH_METRICS[metric]
+    expr = getattr(Student, column)
+    return expr - getattr(Student, minus) if minus is not None else expr
+
+
+def _sketch_values(rows: Iterable[Dict], metric: str) -> Counter:
+    values = (_sketch_value(row, metric) for row in rows)
+    return Counter(v for v in values if v is not None)
+
+
+def _apply_sketch_changes(db: Session, old_rows, new_rows) -> None:
+    """
+    A sketch cannot forget a value, so per metric: values only added are
+    folded into the stored sketch (row locked for the read-modify-write);
+    if any old value is removed or replaced the sketch is marked stale and
+    rebuilt on the next read. Unchanged re-imports are a no-op.
+    """
+    added, stale = {}, []
+    for metric in SKETCH_METRICS:
+        old, new = _sketch_values(old_rows, metric), _sketch_values(new_rows, metric)
+        if old - new:
+            stale.append(metric)
+        elif new - old:
+            added[metric] = list((new - old).elements())
+
+    now = datetime.utcnow()
+    if stale:
+        db.execute(
+            update(sketch_table).where(sketch_table.c.metric.in_(stale)).values(stale=True, updated_at=now)
+        )
+    if not added:
+        return
+    stored = db.execute(
+        select(sketch_table).where(sketch_table.c.metric.in_(list(added)), sketch_table.c.stale.is_(False)).with_for_update()
+    ).all()
+    params = []
+    for row in stored:
+        sketch = KLLSketch.from_dict(json.loads(row.data)).update(added[row.metric])
+        params.append({"m": row.metric, "n": sketch.n, "data": json.dumps(sketch.to_dict()), "now": now})
+    if params:
+        db.execute(
+            update(sketch_table)
+            .where(sketch_table.c.metric == bindparam("m"))
+            .values(n=bindparam("n"), data=bindparam("data"), updated_at=bindparam("now")),
+            params,
+        )
+
+
+def _rebuild_sketches(db: Session) -> Dict[str, KLLSketch]:
+    """Rebuild every sketch with one batched scan of ``students`` (no commit)."""
+    sketches = {metric: KLLSketch(k=SKETCH_K) for metric in SKETCH_METRICS}
+    stmt = select(*[sketch_expression(m) for m in SKETCH_METRICS]).execution_options(
+        yield_per=SKETCH_REBUILD_BATCH_SIZE
+    )
+    for batch in db.execute(stmt).partitions():
+        for metric, values in zip(SKETCH_METRICS, zip(*batch)):
+            sketches[metric].update([v if v is not None else math.nan for v in values])
+
+    now = datetime.utcnow()
+    db.execute(sketch_table.delete())
+    db.execute(
+        sketch_table.insert(),
+        [
+            {"metric": metric, "n": s.n, "data": json.dumps(s.to_dict()), "stale": False, "updated_at": now}
+            for metric, s in sketches.items()
+        ],
+    )
+    return sketches
+
+
+def get_sketches(db: Session) -> Dict[str, KLLSketch]:
+    """Stored sketch per ``SKETCH_METRICS`` entry, merged over shards; rebuilt when missing or stale."""
+    parts = scatter(db, _stored_sketches)
+    if len(parts) == 1:
+        return parts[0]
+    merged = {}
+    for metric in SKETCH_METRICS:
+        # fixed seed: the same shard sketches always merge to the same quantiles
+        sketch = KLLSketch(k=parts[0][metric].k, seed=0)
+        for part in parts:
+            sketch.merge(part[metric])
+        merged[metric] = sketch
+    return merged
+
+
+def _stored_sketches(db: Session) -> Dict[str, KLLSketch]:
+    rows = db.execute(select(sketch_table)).all()
+    if {row.metric for row in rows if not row.stale} != set(SKETCH_METRICS):
+        with primary_session(db) as writer:
+            sketches = _rebuild_sketches(writer)
+            writer.commit()
+        return sketches
+    return {row.metric: KLLSketch.from_dict(json.loads(row.data)) for row in rows}
@@ -0,0 +1,85 @@
+# modules/items/services/versioning.py
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import event, select, update
+from sqlalchemy.orm import Session
+
+from database import engine, shard_engines
+from modules.items.models import DataVersion
+
+# Versi data disimpan di tabel data_version supaya tulisan dari proses lain
+# (import_students.py, worker lain) juga membuat cache di sini kedaluwarsa.
+# Dibaca ulang paling sering sekali per DATA_VERSION_POLL_SECONDS; commit
+# di proses ini langsung memaksa pembacaan ulang. Dengan sharding tiap shard
+# punya barisnya sendiri dan versinya adalah jumlah semuanya (tetap naik
+# setiap kali satu shard ditulis).
+DATA_VERSION_POLL_SECONDS = float(os.getenv("DATA_VERSION_POLL_SECONDS", "1"))
+DATA_VERSION_ROW_ID = 1
+
+version_table = DataVersion.__table__
+
+_lock = threading.Lock()
+_version = 0
+_checked_at: Optional[float] = None
+
+
+def _is_current(checked_at: Optional[float]) -> bool:
+    return checked_at is not None and time.monotonic() - checked_at < DATA_VERSION_POLL_SECONDS
+
+
+def current_data_version() -> int:
+    """Version of the students data, as last read from ``data_version`` (summed over shards)."""
+    global _version, _checked_at
+    if _is_current(_checked_at):
+        return _version
+    with _lock:
+        if not _is_current(_checked_at):
+            version = 0
+            for bind in shard_engines or [engine]:
+                with bind.connect() as conn:
+                    version += conn.execute(
+                        select(version_table.c.version).where(version_table.c.id == DATA_VERSION_ROW_ID)
+                    ).scalar() or 0
+            _version = version
+            _checked_at = time.monotonic()
+        return _version
+
+
+def session_data_version(db: Session) -> int:
+    """Version as seen by ``db`` itself (a read replica may be behind ``current_data_version``)."""
+    return db.execute(
+        select(version_table.c.version).where(version_table.c.id == DATA_VERSION_ROW_ID)
+    ).scalar() or 0
+
+
+def bump_data_version(db: Session) -> None:
+    """Increment the version inside the caller's transaction (call before commit); once per transaction."""
+    if db.info.get("data_version_bumped"):
+        return
+    db.execute(
+        update(version_table)
+        .where(version_table.c.id == DATA_VERSION_ROW_ID)
+        .values(version=version_table.c.version + 1, updated_at=datetime.utcnow())
+    )
+    db.info["data_version_bumped"] = True
+
+
+def ensure_data_version_row(db: Session) -> None:
+    if db.get(DataVersion, DATA_VERSION_ROW_ID) is None:
+        db.add(DataVersion(id=DATA_VERSION_ROW_ID, version=0, updated_at=datetime.utcnow()))
+
+
+@event.listens_for(Session, "after_commit")
+def _reread_after_commit(session: Session) -> None:
+    global _checked_at
+    if session.info.pop("data_version_bumped", False):
+        _checked_at = None
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_rolled_back_bump(session: Session, previous_transaction) -> None:
+    session.info.pop("data_version_bumped", None)
@@ -0,0 +1,87 @@
+# tests/conftest.py
+"""
+Shared fixtures: the app on a throwaway SQLite file, configured through the
+same environment variables as production (they are read at import time, so
+they are set here before any app module is imported). Configurations that
+need a different process-wide setup (sharding, async mode, replicas) run in
+a subprocess via ``run_app``.
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import textwrap
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TMPDIR = tempfile.mkdtemp(prefix="elearning_tests_")
+
+TEST_ENV = {
+    "DATABASE_URL": f"sqlite:///{TMPDIR}/test.db",
+    "PASSWORD_HASH_WORKERS": "0",
+    "PASSWORD_HASH_ROUNDS": "1000",
+    "LOGIN_RATE_LIMIT_PER_USER": "0",
+    "LOGIN_RATE_LIMIT_PER_IP": "0",
+    "ANALYTICS_REPORT_WORKER": "0",
+    "PROFILING_ENABLED": "1",
+    "DATA_VERSION_POLL_SECONDS": "0",
+}
+os.environ.update(TEST_ENV)
+sys.path.insert(0, ROOT)
+
+from helpers import ADMIN, SEED_STUDENTS, login, make_students  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+
+    import main
+
+    with TestClient(main.app) as c:
+        yield c
+
+
+@pytest.fixture(scope="session")
+def admin_headers(client):
+    token = client.post("/auth/login", data=ADMIN).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture(scope="session")
+def students(client, admin_headers):
+    """The seeded rows (student T0000 has password "secret"). Tests that write use other student_ids."""
+    rows = make_students(SEED_STUDENTS)
+    rows[0]["password"] = "secret"
+    r = client.post("/students/bulk", headers=admin_headers, json=rows)
+    assert r.status_code == 200 and r.json()["created"] == SEED_STUDENTS
+    return rows
+
+
+def run_app(script: str, **env) -> dict:
+    """
+    Run ``script`` in a fresh interpreter with the test environment plus
+    ``env`` (``{tmp}`` in values becomes a new temp dir) and return the
+    JSON object it prints last. The script gets ``client`` (a started
+    TestClient), ``admin`` (auth headers) and the tests/helpers.py names.
+    """
+    tmp = tempfile.mkdtemp(prefix="elearning_app_", dir=TMPDIR)
+    full_env = {**os.environ, **TEST_ENV, "DATABASE_URL": f"sqlite:///{tmp}/primary.db"}
+    full_env.update({key: value.replace("{tmp}", tmp) for key, value in env.items()})
+    full_env["PYTHONPATH"] = os.pathsep.join([ROOT, os.path.join(ROOT, "tests")])
+    program = "\n".join([
+        "import json",
+        "from fastapi.testclient import TestClient",
+        "from helpers import ADMIN, login, make_students",
+        "import main",
+        "with TestClient(main.app) as client:",
+        "    admin = login(client, ADMIN['username'], ADMIN['password'])",
+        textwrap.indent(textwrap.dedent(script), "    "),
+    ])
+    proc = subprocess.run(
+        [sys.executable, "-c", program], cwd=tmp, env=full_env, capture_output=True, text=True, timeout=300,
+    )
+    assert proc.returncode == 0, proc.stderr[-4000:]
+    return json.loads(proc.stdout.strip().splitlines()[-1])
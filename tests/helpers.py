@@ -0,0 +1,42 @@
+# tests/helpers.py
+"""Test data and client helpers; no environment side effects (imported by ``run_app`` subprocesses too)."""
+import os
+
+import numpy as np
+
+ADMIN = {"username": os.getenv("ADMIN_USERNAME", "admin"), "password": os.getenv("ADMIN_PASSWORD", "admin123")}
+DEPARTMENTS = ["Mathematics", "CS", "Business", "Engineering"]
+FIRST_NAMES = ["Liam", "Olivia", "Noah", "Emma", "Lucas"]
+LAST_NAMES = ["Lee", "Nguyen", "Garcia", "Smith"]
+SEED_STUDENTS = 80
+
+
+def make_students(n: int, prefix: str = "T", seed: int = 7):
+    """Deterministic ``StudentCreate`` dicts with every analytics column filled (a few NULLs)."""
+    rng = np.random.default_rng(seed)
+    students = []
+    for i in range(n):
+        midterm = round(float(rng.uniform(30, 100)), 2)
+        students.append({
+            "student_id": f"{prefix}{i:04d}",
+            "first_name": FIRST_NAMES[i % len(FIRST_NAMES)],
+            "last_name": LAST_NAMES[(i // len(FIRST_NAMES)) % len(LAST_NAMES)],
+            "department": DEPARTMENTS[i % len(DEPARTMENTS)],
+            "attendance_percent": round(float(rng.uniform(50, 100)), 2),
+            "midterm_score": midterm,
+            "final_score": round(min(100.0, max(0.0, midterm + float(rng.normal(0, 10)))), 2),
+            "quizzes_avg": round(float(rng.uniform(40, 100)), 2),
+            "participation_score": None if i % 17 == 0 else round(float(rng.uniform(0, 100)), 1),
+            "study_hours_per_week": round(float(rng.uniform(5, 30)), 1),
+            "sleep_hours_per_night": round(float(rng.uniform(4, 9)), 1),
+            "stress_level": int(rng.integers(1, 11)),
+            "extracurricular_activities": "Yes" if i % 3 else "No",
+            "grade": "ABCDF"[i % 5],
+        })
+    return students
+
+
+def login(client, username: str, password: str) -> dict:
+    r = client.post("/auth/login", data={"username": username, "password": password})
+    assert r.status_code == 200, r.text
+    return {"Authorization": f"Bearer {r.json()['access_token']}"}
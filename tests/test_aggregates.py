@@ -0,0 +1,58 @@
+# tests/test_aggregates.py
+import numpy as np
+import pytest
+
+
+def _hours_by_department():
+    from database import SessionLocal
+    from modules.items.models import Student
+
+    with SessionLocal() as db:
+        rows = db.query(Student.department, Student.study_hours_per_week).all()
+    by_department = {}
+    for department, hours in rows:
+        if hours is not None:
+            by_department.setdefault(department, []).append(hours)
+    return by_department
+
+
+def test_grouped_aggregates_match_per_column_numpy(students):
+    from database import SessionLocal
+    from modules.items.models import Student
+    from modules.items.services.aggregates import AggregateQuery
+
+    query = (
+        AggregateQuery(Student.department)
+        .add("n", "count", Student.study_hours_per_week)
+        .add("avg", "avg", Student.study_hours_per_week)
+        .add("min", "min", Student.study_hours_per_week)
+        .add("sd", "stddev", Student.study_hours_per_week)
+        .add("p50", "percentile", Student.study_hours_per_week, q=0.5)
+    )
+    with SessionLocal() as db:
+        result = query.run(db)
+        business = query.run(db, Student.department == "Business")
+
+    for department, hours in _hours_by_department().items():
+        profile = result[department]
+        assert profile["n"] == len(hours)
+        assert profile["avg"] == pytest.approx(np.mean(hours))
+        assert profile["min"] == min(hours)
+        assert profile["sd"] == pytest.approx(np.std(hours))
+        assert profile["p50"] == pytest.approx(np.median(hours))
+    assert list(business) == ["Business"]
+    with pytest.raises(ValueError):
+        AggregateQuery().add("p", "percentile", Student.age)
+
+
+def test_department_study_duration_endpoint(client, admin_headers, students):
+    hours = _hours_by_department()["CS"]
+    body = client.get("/analytics/study-duration/CS", headers=admin_headers).json()
+    assert body["student_count"] == len(hours)
+    assert body["avg_hours_per_week"] == pytest.approx(np.mean(hours))
+    assert len(body["students"]) == len(hours)
+
+    overview = client.get("/analytics/study-duration", headers=admin_headers).json()
+    by_department = {d["department"]: d["student_count"] for d in overview["by_department"]}
+    assert by_department["CS"] == len(hours)
+    assert client.get("/analytics/study-duration/Nowhere", headers=admin_headers).status_code == 404
@@ -0,0 +1,65 @@
+# tests/test_async.py
+from conftest import run_app
+
+
+def test_async_mode_keeps_locks_and_sync_engine_off_the_event_loop():
+    result = run_app(
+        """
+        import asyncio
+        from modules.items.services import reports, snapshot, versioning
+
+        on_loop = []
+
+        def on_event_loop():
+            try:
+                asyncio.get_running_loop()
+                return True
+            except RuntimeError:
+                return False
+
+        def record(name, fn):
+            def wrapper(*args):
+                if on_event_loop():
+                    on_loop.append(name)
+                return fn(*args)
+            return wrapper
+
+        versioning._is_current = record("current_data_version", versioning._is_current)
+        reports._key_lock = record("report lock", reports._key_lock)
+        snapshot._load_snapshot = record("snapshot", snapshot._load_snapshot)
+
+        client.post("/students/bulk", headers=admin, json=make_students(30))
+        paths = [
+            "/participations/overview",
+            "/analytics/activity-correlation/final-score?fresh=true",
+            "/analytics/low-activity?fresh=true",
+            "/analytics/activity-trend",
+        ]
+        statuses = [client.get(path, headers=admin).status_code for path in paths]
+        statuses.append(client.post("/auth/login", data={"username": "nobody", "password": "x"}).status_code)
+        print(json.dumps({"on_loop": sorted(set(on_loop)), "statuses": statuses}))
+        """,
+        ASYNC_DB_ENABLED="1",
+    )
+    assert result["statuses"] == [200, 200, 200, 200, 400]
+    assert result["on_loop"] == []
+
+
+PARITY_SCRIPT = """
+client.post("/students/bulk", headers=admin, json=make_students(30))
+paths = [
+    "/students/?limit=5",
+    "/students/T0003",
+    "/students/search?q=emma",
+    "/analytics/study-duration",
+    "/analytics/study-duration/CS",
+    "/analytics/activity-trend?top_n=3",
+    "/participations/bad?limit=3",
+]
+bodies = {path: client.get(path, headers=admin).json() for path in paths}
+print(json.dumps(bodies))
+"""
+
+
+def test_async_mode_serves_the_same_responses():
+    assert run_app(PARITY_SCRIPT, ASYNC_DB_ENABLED="1") == run_app(PARITY_SCRIPT)
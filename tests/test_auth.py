@@ -0,0 +1,87 @@
+# tests/test_auth.py
+import time
+from contextlib import contextmanager
+
+from sqlalchemy import event, update
+
+from helpers import login
+from modules.items.services.cache import TTLCache
+
+
+@contextmanager
+def student_selects():
+    from database import engine
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and "FROM students" in statement:
+            statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+def test_ttl_cache_expires_and_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == (1, None, 3)
+    cache.set("short", 4, ttl=0.01)
+    time.sleep(0.02)
+    assert cache.get("short") is None
+    TTLCache(maxsize=0, ttl=60).set("x", 1)
+
+
+def test_cached_principal_skips_the_student_lookup_until_the_row_changes(client, admin_headers, students):
+    headers = login(client, "T0000", "secret")
+    assert client.get("/auth/me", headers=headers).json()["student_id"] == "T0000"
+
+    with student_selects() as statements:
+        body = client.get("/analytics/final-grade/me", headers=headers).json()
+    assert statements == []
+    assert body["student_id"] == "T0000"
+
+    r = client.post("/students/bulk?mode=update", headers=admin_headers, json=[{"student_id": "T0000", "projects_score": 88.0}])
+    assert r.json()["updated"] == 1
+    with student_selects() as statements:
+        body = client.get("/analytics/final-grade/me", headers=headers).json()
+    assert len(statements) == 1
+    assert body["projects_score"] == 88.0
+
+
+def _write_out_of_band(student_id, **values):
+    """What import_students.py or another worker does: its own session, bump, commit."""
+    from database import SessionLocal
+    from modules.items.models import Student
+    from modules.items.services.versioning import bump_data_version
+
+    with SessionLocal() as db:
+        db.execute(update(Student).where(Student.student_id == student_id).values(**values))
+        bump_data_version(db)
+        db.commit()
+
+
+def test_out_of_band_write_expires_the_cached_principal(client, students):
+    headers = login(client, "T0000", "secret")
+    before = client.get("/analytics/final-grade/me", headers=headers).json()
+    assert before["final_score"] == students[0]["final_score"]
+
+    _write_out_of_band("T0000", final_score=99.0)
+    try:
+        assert client.get("/analytics/final-grade/me", headers=headers).json()["final_score"] == 99.0
+    finally:
+        _write_out_of_band("T0000", final_score=students[0]["final_score"])
+    assert client.get("/analytics/final-grade/me", headers=headers).json()["final_score"] == before["final_score"]
+
+
+def test_role_checks(client, admin_headers, students):
+    student = login(client, "T0000", "secret")
+    assert client.get("/students/T0001", headers=student).status_code == 403
+    assert client.get("/analytics/final-grade/me", headers=admin_headers).status_code == 403
+    assert client.get("/auth/me", headers={"Authorization": "Bearer nope"}).status_code == 401
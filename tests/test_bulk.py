@@ -0,0 +1,64 @@
+# tests/test_bulk.py
+import json
+
+from sqlalchemy.exc import OperationalError
+
+from helpers import login
+
+
+def _statuses(body):
+    return [(r["student_id"], r["status"]) for r in body["results"]]
+
+
+def test_bulk_modes_report_per_row_results(client, admin_headers, students):
+    body = client.post("/students/bulk", headers=admin_headers, json=[
+        {"student_id": "B1", "first_name": "Ada", "password": "pw"},
+        {"student_id": "B2", "age": "not a number"},
+        "not an object",
+        {"student_id": "T0001", "department": "CS"},
+    ]).json()
+    assert _statuses(body) == [("B1", "created"), ("B2", "invalid"), (None, "invalid"), ("T0001", "updated")]
+    assert (body["total"], body["created"], body["updated"], body["invalid"]) == (4, 1, 1, 2)
+    assert body["results"][1]["errors"][0]["loc"] == ["age"]
+    assert body["results"][0]["id"] == client.get("/students/B1", headers=admin_headers).json()["id"]
+    assert client.get("/auth/me", headers=login(client, "B1", "pw")).json()["student_id"] == "B1"
+
+    created = client.post("/students/bulk?mode=create", headers=admin_headers, json=[
+        {"student_id": "B1", "first_name": "Changed"}, {"student_id": "B3"},
+    ]).json()
+    assert _statuses(created) == [("B1", "skipped"), ("B3", "created")]
+    updated = client.post("/students/bulk?mode=update", headers=admin_headers, json=[
+        {"student_id": "B1", "last_name": "Lovelace"}, {"student_id": "B404"},
+    ]).json()
+    assert _statuses(updated) == [("B1", "updated"), ("B404", "not_found")]
+    # fields left out are kept
+    b1 = client.get("/students/B1", headers=admin_headers).json()
+    assert (b1["first_name"], b1["last_name"]) == ("Ada", "Lovelace")
+
+
+def test_ndjson_body_and_request_errors(client, admin_headers, students):
+    lines = "\n".join(json.dumps({"student_id": f"BN{i}"}) for i in range(3)) + "\n\n"
+    r = client.post("/students/bulk", headers={**admin_headers, "Content-Type": "application/x-ndjson"}, content=lines)
+    assert r.json()["created"] == 3
+    bad_line = client.post("/students/bulk", headers={**admin_headers, "Content-Type": "application/x-ndjson"}, content='{"a":1}\n{oops')
+    assert bad_line.status_code == 400 and "line 2" in bad_line.json()["detail"]
+    assert client.post("/students/bulk", headers=admin_headers, json={"student_id": "x"}).status_code == 400
+
+
+def test_a_failing_batch_does_not_lose_the_others(client, admin_headers, students, monkeypatch):
+    from modules.items.routes import students as students_routes
+
+    original = students_routes.upsert_students
+
+    def flaky(db, rows, **kwargs):
+        if any(row["student_id"] == "BF3" for row in rows):
+            raise OperationalError("INSERT", {}, Exception("boom"))
+        return original(db, rows, **kwargs)
+
+    monkeypatch.setattr(students_routes, "BULK_BATCH_SIZE", 2)
+    monkeypatch.setattr(students_routes, "upsert_students", flaky)
+    body = client.post("/students/bulk", headers=admin_headers, json=[{"student_id": f"BF{i}"} for i in range(6)]).json()
+    assert [r["status"] for r in body["results"]] == ["created", "created", "error", "error", "created", "created"]
+    assert "boom" in body["results"][2]["detail"]
+    assert client.get("/students/BF2", headers=admin_headers).status_code == 404
+    assert client.get("/students/BF5", headers=admin_headers).status_code == 200
@@ -0,0 +1,104 @@
+# tests/test_hashing.py
+import asyncio
+import threading
+from concurrent.futures import Executor, Future
+
+import pytest
+from fastapi import HTTPException
+
+from conftest import run_app
+from helpers import login
+from modules.items.services import hashing
+
+
+def test_hash_and_verify_round_trip():
+    hashed = hashing.hash_password("s3cret")
+    assert hashing.verify_and_update("s3cret", hashed) == (True, None)
+    assert hashing.verify_and_update("wrong", hashed)[0] is False
+    # malformed stored hash: rejected, not an exception
+    assert hashing.verify_and_update("s3cret", "not-a-hash") == (False, None)
+
+
+def test_batch_hashes_keep_input_order():
+    passwords = [f"pw{i}" for i in range(7)]
+    hashes = hashing.hash_passwords(passwords)
+    assert [hashing.verify_and_update(p, h)[0] for p, h in zip(passwords, hashes)] == [True] * 7
+    assert hashing.hash_passwords([]) == []
+
+
+def test_saturated_pool_answers_429(monkeypatch):
+    monkeypatch.setattr(hashing, "_pending", threading.BoundedSemaphore(1))
+    hashing._pending.acquire()
+    with pytest.raises(HTTPException) as exc:
+        hashing.hash_password("x")
+    assert exc.value.status_code == 429
+
+
+class _StuckExecutor(Executor):
+    """A pool whose jobs never start."""
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        return Future()
+
+
+def test_timed_out_hash_answers_503(monkeypatch):
+    monkeypatch.setattr(hashing, "_executor", _StuckExecutor())
+    monkeypatch.setattr(hashing, "PASSWORD_HASH_TIMEOUT_SECONDS", 0.01)
+    calls = [
+        lambda: hashing.hash_password("x"),
+        lambda: hashing.hash_passwords(["x", "y"]),
+        lambda: hashing.verify_and_update("x", "hash"),
+        lambda: asyncio.run(hashing.ahash_password("x")),
+        lambda: asyncio.run(hashing.ahash_passwords(["x", "y"])),
+        lambda: asyncio.run(hashing.averify_and_update("x", "hash")),
+    ]
+    for call in calls:
+        with pytest.raises(HTTPException) as exc:
+            call()
+        assert exc.value.status_code == 503 and exc.value.headers["Retry-After"]
+    # the abandoned jobs gave their queue slots back
+    assert all(hashing._pending.acquire(blocking=False) for _ in range(hashing.PASSWORD_HASH_MAX_PENDING))
+    for _ in range(hashing.PASSWORD_HASH_MAX_PENDING):
+        hashing._pending.release()
+
+
+def test_duplicate_student_is_rejected_before_hashing(client, admin_headers, students, monkeypatch):
+    calls = []
+    monkeypatch.setattr(hashing, "hash_password", lambda password: calls.append(password))
+    r = client.post("/students/", headers=admin_headers, json={"student_id": "T0000", "password": "again"})
+    assert r.status_code == 400
+    assert calls == []
+
+
+def test_set_password_then_login(client, admin_headers, students):
+    version = client.get("/system/response-cache", headers=admin_headers).json()["data_version"]
+    r = client.post("/students/T0003/password", headers=admin_headers, json={"password": "n3w"})
+    assert r.status_code == 200
+    # only the hash changed: cached responses and reports stay valid
+    assert client.get("/system/response-cache", headers=admin_headers).json()["data_version"] == version
+    assert client.get("/auth/me", headers=login(client, "T0003", "n3w")).json()["student_id"] == "T0003"
+
+
+def test_async_handlers_never_hash_on_the_event_loop():
+    result = run_app(
+        """
+        from modules.items.services import hashing
+        blocking = []
+        for name in ("hash_password", "hash_passwords"):
+            original = getattr(hashing, name)
+            setattr(hashing, name, lambda *a, _name=name, _f=original: blocking.append(_name) or _f(*a))
+
+        client.post("/students/", headers=admin, json={"student_id": "A1", "password": "one"})
+        client.post("/students/bulk", headers=admin, json=[{"student_id": "A2", "password": "two"}, {"student_id": "A3"}])
+        client.post("/students/A3/password", headers=admin, json={"password": "three"})
+        statuses = [
+            client.post("/auth/login", data={"username": u, "password": p}).status_code
+            for u, p in (("A1", "one"), ("A2", "two"), ("A3", "three"), ("A3", "nope"))
+        ]
+        print(json.dumps({"blocking": blocking, "statuses": statuses}))
+        """,
+        ASYNC_DB_ENABLED="1",
+        PASSWORD_HASH_WORKERS="1",
+    )
+    assert result["blocking"] == []
+    assert result["statuses"] == [200, 200, 200, 400]
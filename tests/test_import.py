@@ -0,0 +1,54 @@
+# tests/test_import.py
+from conftest import run_app
+
+CSV = """Student_ID,First_Name,Last_Name,Department,Age,Final_Score,Participation_Score,Extracurricular_Activities
+S1000,A,B,Engineering,20,80.5,95,Yes
+S1001,A,B,Business,21,70,,No
+S1002,A,B,Mathematics,abc,60,40,Yes
+,A,B,Business,22,50,60,No
+S1003,A,B,Engineering,23,90,77,Yes
+S1004,A,B,CS,24,65,55,No
+"""
+
+
+def test_chunked_import_is_idempotent_and_resumable():
+    result = run_app(
+        f"""
+        from database import SessionLocal
+        from modules.items.models import Student
+
+        with open("students.csv", "w") as fh:
+            fh.write({CSV!r})
+        import import_students
+
+        def load():
+            with SessionLocal() as db:
+                return {{
+                    s.student_id: [s.first_name, s.age, s.final_score, s.participation_category]
+                    for s in db.query(Student)
+                }}
+
+        first = import_students.import_students()
+        rows = load()
+        # a second run upserts the same rows; a stale checkpoint skips what was committed
+        second = import_students.import_students()
+        import_students._write_checkpoint(3)
+        resumed = import_students.import_students()
+        print(json.dumps({{
+            "imported": [first["rows"], second["rows"], resumed["rows"]],
+            "rows": rows,
+            "unchanged": load() == rows,
+        }}))
+        """,
+        IMPORT_CSV_PATH="{tmp}/students.csv",
+        IMPORT_CHUNK_SIZE="2",
+    )
+    assert result["imported"] == [5, 5, 2]
+    assert result["unchanged"]
+    rows = result["rows"]
+    assert sorted(rows) == ["S1000", "S1001", "S1002", "S1003", "S1004"]
+    # fake names from the id, unparsable ints -> NULL, category derived from the score
+    assert rows["S1000"] == ["Liam", 20, 80.5, "very-good"]
+    assert rows["S1001"][3] is None
+    assert rows["S1002"][1] is None and rows["S1002"][3] == "bad"
+    assert rows["S1003"][3] == "good"
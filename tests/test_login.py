@@ -0,0 +1,42 @@
+# tests/test_login.py
+from conftest import run_app
+from modules.items.services import ratelimit
+from modules.items.services.ratelimit import TokenBucketLimiter
+
+
+def test_token_bucket_refills_over_time(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(ratelimit.time, "monotonic", lambda: now[0])
+    limiter = TokenBucketLimiter(capacity=2, period=10, maxsize=2)
+    assert [limiter.acquire("a"), limiter.acquire("a")] == [0.0, 0.0]
+    assert limiter.acquire("a") == 5.0
+    now[0] += 5
+    assert limiter.acquire("a") == 0.0
+    assert limiter.acquire("b") == 0.0 and limiter.acquire("c") == 0.0
+    # "a" was evicted (LRU of 2 keys) -> starts with a full bucket again
+    assert limiter.acquire("a") == 0.0
+    assert not TokenBucketLimiter(capacity=0, period=10).enabled
+
+
+def test_login_rate_limit_and_missing_user_cache():
+    result = run_app(
+        """
+        statuses = [client.post("/auth/login", data={"username": "Bob", "password": "x"}).status_code for _ in range(4)]
+        limited = client.post("/auth/login", data={"username": "BOB", "password": "x"})
+
+        # a cached "no such user" must not outlive the student being created
+        assert client.post("/auth/login", data={"username": "N1", "password": "pw"}).status_code == 400
+        client.post("/students/", headers=admin, json={"student_id": "N1", "password": "pw"})
+        created = client.post("/auth/login", data={"username": "N1", "password": "pw"}).status_code
+        print(json.dumps({
+            "statuses": statuses,
+            "limited": [limited.status_code, limited.headers.get("retry-after")],
+            "created": created,
+        }))
+        """,
+        LOGIN_RATE_LIMIT_PER_USER="3",
+        LOGIN_RATE_LIMIT_PER_IP="0",
+    )
+    assert result["statuses"] == [400, 400, 400, 429]
+    assert result["limited"][0] == 429 and int(result["limited"][1]) >= 1
+    assert result["created"] == 200
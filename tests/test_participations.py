@@ -0,0 +1,68 @@
+# tests/test_participations.py
+import numpy as np
+from sqlalchemy import create_engine, text
+
+from modules.items.services.categories import PARTICIPATION_CATEGORIES, category_array, score_to_category
+
+
+def test_category_boundaries_scalar_and_vectorized_agree():
+    scores = [None, 0, 49.99, 50, 74.9, 75, 89.99, 90, 100]
+    expected = [None, "bad", "bad", "average", "average", "good", "good", "very-good", "very-good"]
+    assert [score_to_category(s) for s in scores] == expected
+    assert category_array(np.array([np.nan if s is None else s for s in scores])) == expected
+
+
+def test_category_routes_follow_the_stored_column(client, admin_headers, students):
+    def ids(category):
+        body = client.get(f"/participations/{category}", headers=admin_headers).json()
+        scores = [s["participation_score"] for s in body["students"]]
+        assert scores == sorted(scores, reverse=True)
+        assert body["count"] == len(body["students"])
+        assert {s["participation_category"] for s in body["students"]} <= {category}
+        return [s["student_id"] for s in body["students"]]
+
+    client.post("/students/", headers=admin_headers, json={"student_id": "PC1", "participation_score": 95})
+    assert "PC1" in ids("very-good")
+    client.post("/students/bulk?mode=update", headers=admin_headers, json=[{"student_id": "PC1", "participation_score": 10}])
+    assert "PC1" not in ids("very-good") and "PC1" in ids("bad")
+
+    per_category = {category: ids(category) for category in PARTICIPATION_CATEGORIES}
+    everyone = client.get("/participations/", headers=admin_headers).json()
+    assert sorted(sum(per_category.values(), [])) == sorted(s["student_id"] for s in everyone["students"])
+
+    first = client.get("/participations/bad?limit=3", headers=admin_headers).json()
+    rest = client.get(f"/participations/bad?cursor={first['next_cursor']}", headers=admin_headers).json()
+    assert [s["student_id"] for s in first["students"] + rest["students"]] == per_category["bad"]
+
+
+def test_migration_backfills_the_category_column(tmp_path):
+    from modules.items.migrations import _ensure_participation_category
+
+    legacy = create_engine(f"sqlite:///{tmp_path}/legacy.db")
+    with legacy.begin() as conn:
+        conn.execute(text("CREATE TABLE students (id INTEGER PRIMARY KEY, student_id VARCHAR(50), participation_score FLOAT)"))
+        conn.execute(text("INSERT INTO students VALUES (1, 'L1', 92), (2, 'L2', 60), (3, 'L3', NULL)"))
+    _ensure_participation_category(legacy)
+    with legacy.connect() as conn:
+        rows = conn.execute(text("SELECT student_id, participation_category FROM students ORDER BY id")).all()
+    assert [tuple(r) for r in rows] == [("L1", "very-good"), ("L2", "average"), ("L3", None)]
+
+
+def test_overview_matches_the_category_endpoints(client, admin_headers, students):
+    overview = client.get("/participations/overview?top_n=3&bin_width=25", headers=admin_headers).json()
+    listing = client.get("/participations/", headers=admin_headers).json()
+    assert overview["count"] == listing["count"]
+    assert abs(overview["average_participation_score"] - listing["average_participation_score"]) < 1e-9
+
+    for summary in overview["categories"]:
+        members = client.get(f"/participations/{summary['category']}", headers=admin_headers).json()["students"]
+        scores = [s["participation_score"] for s in members]
+        assert summary["count"] == len(members)
+        if members:
+            assert (summary["min_participation_score"], summary["max_participation_score"]) == (min(scores), max(scores))
+        assert [s["student_id"] for s in summary["top_students"]] == [s["student_id"] for s in members[:3]]
+
+    bins = overview["histogram"]["bins"]
+    assert [(b["min"], b["max"]) for b in bins] == [(0, 25), (25, 50), (50, 75), (75, 100)]
+    assert sum(b["count"] for b in bins) == overview["count"]
+    assert client.get("/participations/overview?bin_width=0", headers=admin_headers).status_code == 422
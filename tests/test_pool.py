@@ -0,0 +1,41 @@
+# tests/test_pool.py
+from conftest import run_app
+
+
+def test_pool_settings_and_counters():
+    result = run_app(
+        """
+        from sqlalchemy import exc, text
+        from database import create_instrumented_engine, get_pool_stats
+
+        probe = create_instrumented_engine("probe", "sqlite:///probe.db")
+        held = probe.connect()
+        held.execute(text("SELECT 1"))
+        try:
+            probe.connect()
+            timed_out = False
+        except exc.TimeoutError:
+            timed_out = True
+        held.close()
+        with probe.connect() as conn:
+            conn.execute(text("SELECT 1"))
+
+        stats = get_pool_stats()["probe"]
+        print(json.dumps({
+            "timed_out": timed_out,
+            "stats": {k: stats[k] for k in ("size", "max_overflow", "checkouts", "checkout_timeouts", "connects", "pre_pings")},
+            "wait_count": stats["checkout_wait_seconds"]["count"],
+            "endpoint": sorted(client.get("/system/pool", headers=admin).json()),
+        }))
+        """,
+        DB_POOL_SIZE="1",
+        DB_MAX_OVERFLOW="0",
+        DB_POOL_TIMEOUT="0.05",
+        DB_POOL_PRE_PING="always",
+    )
+    assert result["timed_out"]
+    assert result["stats"] == {
+        "size": 1, "max_overflow": 0, "checkouts": 2, "checkout_timeouts": 1, "connects": 1, "pre_pings": 2,
+    }
+    assert result["wait_count"] == 3
+    assert {"primary", "probe"} <= set(result["endpoint"])
@@ -0,0 +1,22 @@
+# tests/test_profiling.py
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+
+def test_metrics_count_requests_and_queries_per_route(client, admin_headers, students):
+    client.get("/students/T0001", headers=admin_headers)
+    body = client.get("/metrics").text
+    route = 'method="GET",route="/students/{student_id}"'
+    assert f'http_requests_total{{{route},status="200"}}' in body
+    queries = [line for line in body.splitlines() if line.startswith(f"app_db_queries_total{{{route}}}")]
+    assert queries and float(queries[0].split()[-1]) >= 1
+
+
+def test_failed_query_does_not_leave_timing_state(client):
+    from database import engine
+
+    with engine.connect() as conn:
+        with pytest.raises(OperationalError):
+            conn.execute(text("SELECT * FROM no_such_table"))
+        assert not conn.info.get("query_started_at")
@@ -0,0 +1,44 @@
+# tests/test_projections.py
+from sqlalchemy import event
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Mapper
+
+from modules.items.models import Student
+from modules.items.services.projections import PARTICIPATION, STUDENT_OUT
+
+
+def test_projection_rows_are_plain_tuples(students):
+    from database import SessionLocal
+
+    with SessionLocal() as db:
+        rows = PARTICIPATION.all(db, Student.participation_score.isnot(None), limit=5)
+        first = STUDENT_OUT.first(db, Student.student_id == "T0001")
+        assert len(db.identity_map) == 0
+    assert len(rows) == 5 and all(isinstance(row, Row) for row in rows)
+    assert rows[0]._fields == ("id", "student_id", "first_name", "last_name", "participation_score", "participation_category")
+    assert [row.id for row in rows] == sorted(row.id for row in rows)
+    assert "hashed_password" not in first._fields and first.student_id == "T0001"
+
+
+def test_list_endpoints_load_no_entities_and_no_password_hashes(client, admin_headers, students):
+    from database import engine
+
+    client.delete("/system/response-cache", headers=admin_headers)
+    statements, loaded = [], []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    def on_load(target, context):
+        loaded.append(target)
+
+    event.listen(engine, "before_cursor_execute", record)
+    event.listen(Mapper, "load", on_load)
+    try:
+        for path in ("/students/?limit=50", "/participations/good", "/analytics/study-duration/CS", "/analytics/activity-trend?exact=true"):
+            assert client.get(path, headers=admin_headers).status_code == 200
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+        event.remove(Mapper, "load", on_load)
+    assert statements and loaded == []
+    assert not [s for s in statements if "hashed_password" in s]
@@ -0,0 +1,101 @@
+# tests/test_replicas.py
+from conftest import run_app
+
+
+def test_reads_go_to_the_replica_until_it_lags_too_far():
+    result = run_app(
+        """
+        import shutil
+        import time
+
+        rows = make_students(20)
+        rows[1]["password"] = "pw"
+        client.post("/students/bulk", headers=admin, json=rows)
+        shutil.copyfile("primary.db", "replica.db")
+        client.post("/students/", headers=admin, json={"student_id": "R1", "department": "CS", "study_hours_per_week": 10})
+
+        listed = len(client.get("/students/?limit=1000", headers=admin).json())
+        # writes and their read-back stay on the primary
+        own_write = client.get("/students/R1", headers=admin).status_code
+        cache = lambda: client.get("/system/response-cache", headers=admin).json()
+        misses = cache()["misses"]
+        cs_counts = [client.get("/analytics/study-duration/CS", headers=admin).json()["student_count"] for _ in range(2)]
+        uncached_misses = cache()["misses"] - misses
+        student = login(client, "T0001", "pw")
+        me = [
+            client.get("/participations/me", headers=student).json()["participation_score"],
+            client.get("/analytics/final-grade/me", headers=student).json()["final_score"],
+        ]
+        lagging = client.get("/system/replicas", headers=admin).json()[0]
+
+        time.sleep(0.4)
+        listed_after = len(client.get("/students/?limit=1000", headers=admin).json())
+        stale = client.get("/system/replicas", headers=admin).json()[0]
+        print(json.dumps({
+            "listed": [listed, listed_after],
+            "own_write": own_write,
+            "cs_counts": cs_counts,
+            "uncached_misses": uncached_misses,
+            "me": me,
+            "expected_me": [rows[1]["participation_score"], rows[1]["final_score"]],
+            "usable": [lagging["usable"], stale["usable"]],
+        }))
+        """,
+        DATABASE_REPLICA_URLS="sqlite:///{tmp}/replica.db",
+        DB_REPLICA_LAG_CHECK_SECONDS="0",
+        DB_REPLICA_MAX_LAG_SECONDS="0.3",
+    )
+    assert result["listed"] == [20, 21]
+    assert result["own_write"] == 200
+    # answers from a replica behind the current version are not cached
+    assert result["cs_counts"] == [5, 5] and result["uncached_misses"] == 2
+    assert result["me"] == result["expected_me"]
+    assert result["usable"] == [True, False]
+
+
+def test_replica_that_keeps_up_with_a_write_stream_stays_usable():
+    result = run_app(
+        """
+        import shutil
+        import time
+
+        client.post("/students/bulk", headers=admin, json=make_students(20))
+        shutil.copyfile("primary.db", "replica.db")
+        def status():
+            client.get("/students/?limit=1", headers=admin)  # a read runs the lag check
+            return client.get("/system/replicas", headers=admin).json()[0]
+
+        seen = []
+        deadline = time.monotonic() + 1.0
+        i = 0
+        while time.monotonic() < deadline:
+            # a write the replica has not applied yet, seen by the next check...
+            client.post("/students/", headers=admin, json={"student_id": f"S{i}"})
+            i += 1
+            seen.append(status())
+            time.sleep(0.05)
+            # ...then replication catches up with it
+            shutil.copyfile("primary.db", "replica.db")
+
+        time.sleep(0.4)
+        client.post("/students/", headers=admin, json={"student_id": "STOP"})
+        seen_stuck = [status()]
+        time.sleep(0.4)
+        seen_stuck.append(status())
+        print(json.dumps({
+            "rounds": len(seen),
+            "always_behind": all(s["lag_seconds"] > 0 for s in seen),
+            "usable": all(s["usable"] for s in seen),
+            "max_lag": max(s["lag_seconds"] for s in seen),
+            "stuck_usable": [s["usable"] for s in seen_stuck],
+        }))
+        """,
+        DATABASE_REPLICA_URLS="sqlite:///{tmp}/replica.db",
+        DB_REPLICA_LAG_CHECK_SECONDS="0",
+        DB_REPLICA_MAX_LAG_SECONDS="0.3",
+    )
+    # behind at every check, yet never by more than one round of replication
+    assert result["rounds"] > 6 and result["always_behind"]
+    assert result["usable"] and result["max_lag"] < 0.3
+    # a replica that stops replicating is still skipped once past the tolerance
+    assert result["stuck_usable"] == [True, False]
@@ -0,0 +1,78 @@
+# tests/test_reports.py
+from conftest import run_app
+
+
+def test_report_from_a_lagging_replica_carries_the_replica_version():
+    result = run_app(
+        """
+        import shutil
+        from modules.items.services import reports
+        from modules.items.services.versioning import current_data_version
+
+        client.post("/students/bulk", headers=admin, json=make_students(40))
+        shutil.copyfile("primary.db", "replica.db")
+        # a write the replica has not seen yet
+        client.post("/students/", headers=admin, json={"student_id": "L1", "final_score": 50, "quizzes_avg": 50})
+
+        body = client.get("/analytics/activity-correlation/final-score?fresh=true", headers=admin).json()
+        reports.refresh_reports()
+        status = [s for s in reports.get_report_status() if s["name"] == "activity-correlation"]
+        print(json.dumps({
+            "data_version": body["data_version"],
+            "current_version": current_data_version(),
+            "status_current": [s["current"] for s in status],
+        }))
+        """,
+        DATABASE_REPLICA_URLS="sqlite:///{tmp}/replica.db",
+        DB_REPLICA_LAG_CHECK_SECONDS="0",
+    )
+    assert result["data_version"] < result["current_version"]
+    assert result["status_current"] == [False]
+
+
+def test_worker_keeps_reports_current_and_fresh_recomputes():
+    result = run_app(
+        """
+        import time
+        from modules.items.services import reports
+
+        client.post("/students/bulk", headers=admin, json=make_students(40))
+        path = "/analytics/low-activity"
+
+        def wait_current():
+            deadline = time.monotonic() + 10
+            while time.monotonic() < deadline:
+                status = client.get("/system/reports", headers=admin).json()
+                if status and all(s["current"] for s in status):
+                    return status
+                time.sleep(0.05)
+            raise AssertionError(status)
+
+        warm = wait_current()
+        first = client.get(path, headers=admin).json()
+        client.post("/students/", headers=admin, json={
+            "student_id": "W1", "attendance_percent": 0, "study_hours_per_week": 0, "quizzes_avg": 0, "sleep_hours_per_night": 0,
+        })
+        wait_current()
+        refreshed = client.get(path, headers=admin).json()
+        fresh = client.get(path + "?fresh=true", headers=admin).json()
+        time.sleep(0.01)
+        fresh_again = client.get(path + "?fresh=true", headers=admin).json()
+        print(json.dumps({
+            "warm": sorted(s["name"] for s in warm),
+            "versions": [first["data_version"], refreshed["data_version"]],
+            "flagged": "W1" in [s["student_id"] for s in refreshed["low_students"]],
+            "fresh_newer": fresh["computed_at"] > refreshed["computed_at"],
+            "fresh_again_newer": fresh_again["computed_at"] > fresh["computed_at"],
+            "worker_alive": reports._worker_running(),
+        }))
+        """,
+        ANALYTICS_REPORT_WORKER="1",
+        ANALYTICS_REPORT_POLL_SECONDS="0.05",
+    )
+    assert result["warm"] == ["activity-correlation", "low-activity"]
+    assert result["versions"][1] > result["versions"][0]
+    assert result["flagged"]
+    assert result["fresh_newer"]
+    assert result["fresh_again_newer"]
+    assert result["worker_alive"]
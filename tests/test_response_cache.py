@@ -0,0 +1,39 @@
+# tests/test_response_cache.py
+from helpers import login
+
+
+def _stats(client, headers):
+    return client.get("/system/response-cache", headers=headers).json()
+
+
+def test_etag_304_and_invalidation_on_write(client, admin_headers, students):
+    path = "/analytics/study-duration"
+    client.delete("/system/response-cache", headers=admin_headers)
+    before = _stats(client, admin_headers)
+
+    first = client.get(path, headers=admin_headers)
+    second = client.get(path, headers=admin_headers)
+    etag = first.headers["etag"]
+    assert second.headers["etag"] == etag and second.json() == first.json()
+    assert first.headers["cache-control"] == "private, no-cache"
+
+    not_modified = client.get(path, headers={**admin_headers, "If-None-Match": f'"other", {etag}'})
+    assert not_modified.status_code == 304 and not_modified.content == b""
+    assert client.get(path, headers={**admin_headers, "If-None-Match": '"other"'}).status_code == 200
+
+    after = _stats(client, admin_headers)
+    assert after["misses"] - before["misses"] == 1
+    assert after["hits"] - before["hits"] == 3
+    assert after["not_modified"] - before["not_modified"] == 1
+
+    client.post("/students/", headers=admin_headers, json={"student_id": "RC1", "department": "CS", "study_hours_per_week": 99})
+    changed = client.get(path, headers={**admin_headers, "If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["etag"] != etag
+    assert _stats(client, admin_headers)["data_version"] > after["data_version"]
+
+
+def test_only_admin_requests_are_cached(client, admin_headers, students):
+    student = login(client, "T0000", "secret")
+    r = client.get("/participations/me", headers=student)
+    assert r.status_code == 200 and "etag" not in r.headers
+    assert client.get("/analytics/study-duration").status_code == 401
@@ -0,0 +1,41 @@
+# tests/test_search.py
+from modules.items.services.search import full_name, trigrams
+
+
+def _brute_force(query):
+    from database import SessionLocal
+    from modules.items.models import Student
+
+    query = " ".join(query.lower().split())
+    with SessionLocal() as db:
+        rows = db.query(Student.id, Student.student_id, Student.first_name, Student.last_name).order_by(Student.id).all()
+    return [r.student_id for r in rows if query in full_name(r.first_name, r.last_name)]
+
+
+def test_trigrams_cover_every_position():
+    assert trigrams("ab") == {"ab ", "b  "}
+    assert trigrams("emma") == {"emm", "mma", "ma ", "a  "}
+    assert full_name("  Emma ", "LEE") == "emma lee"
+
+
+def test_search_matches_a_substring_scan(client, admin_headers, students):
+    for query in ("e", "Em", "mma", "liam lee", "  NOAH   garcia ", "ia", "a g", "zzz"):
+        body = client.get("/students/search", params={"q": query, "limit": 1000}, headers=admin_headers).json()
+        assert [s["student_id"] for s in body] == _brute_force(query), query
+    limited = client.get("/students/search?q=e&limit=3", headers=admin_headers).json()
+    assert [s["student_id"] for s in limited] == _brute_force("e")[:3]
+
+
+def test_renamed_students_are_reindexed(client, admin_headers, students):
+    client.post("/students/", headers=admin_headers, json={"student_id": "SR1", "first_name": "Quinn", "last_name": "Xavier"})
+    assert [s["student_id"] for s in client.get("/students/search?q=quinn x", headers=admin_headers).json()] == ["SR1"]
+    client.post("/students/bulk?mode=update", headers=admin_headers, json=[{"student_id": "SR1", "first_name": "Rowan"}])
+    assert client.get("/students/search?q=quinn", headers=admin_headers).json() == []
+    assert [s["student_id"] for s in client.get("/students/search?q=rowan xav", headers=admin_headers).json()] == ["SR1"]
+
+
+def test_department_name_lookup_uses_the_index(client, admin_headers, students):
+    body = client.get("/analytics/study-duration/CS/olivia", headers=admin_headers).json()
+    expected = [s["student_id"] for s in students if s["department"] == "CS" and s["first_name"] == "Olivia"]
+    assert [s["student_id"] for s in body["students"]] == expected
+    assert client.get("/analytics/study-duration/CS/nobody", headers=admin_headers).status_code == 404
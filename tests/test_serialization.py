@@ -0,0 +1,32 @@
+# tests/test_serialization.py
+import json
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from modules.items.schema.schemas import StudentOut
+from modules.items.services import serialization
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_dumps_handles_numpy_and_matches_stdlib_json(monkeypatch, use_orjson):
+    if not use_orjson:
+        monkeypatch.setattr(serialization, "orjson", None)
+    elif serialization.orjson is None:
+        pytest.skip("orjson not installed")
+    payload = {"n": np.int64(3), "x": np.float64(0.5), "name": "Zoë", "none": None, "nested": [1, 2.5, True]}
+    assert json.loads(serialization.dumps(payload)) == {
+        "n": 3, "x": 0.5, "name": "Zoë", "none": None, "nested": [1, 2.5, True],
+    }
+    assert isinstance(json.loads(serialization.dumps({"at": datetime(2024, 1, 2, 3, 4, 5)}))["at"], str)
+
+
+def test_fast_list_responses_keep_the_response_model_shape(client, admin_headers, students):
+    rows = client.get("/students/?limit=5", headers=admin_headers).json()
+    one = client.get(f"/students/{rows[0]['student_id']}", headers=admin_headers).json()
+    fields = set(StudentOut.model_fields)
+    assert all(set(row) == fields for row in rows)
+    assert one == rows[0]
+    # the response still validates against the declared model
+    assert [StudentOut(**row).model_dump() for row in rows] == rows
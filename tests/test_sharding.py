@@ -0,0 +1,121 @@
+# tests/test_sharding.py
+from conftest import run_app
+
+SHARDS = "sqlite:///{tmp}/shard0.db,sqlite:///{tmp}/shard1.db"
+
+
+def test_student_routes_read_from_the_owning_shard():
+    result = run_app(
+        """
+        from sqlalchemy import func, select
+        from database import SHARDING_ENABLED, engine, shard_engines, shard_for_student_id
+        from modules.items.models import Student
+
+        rows = make_students(40)
+        rows[0]["password"] = "secret"
+        client.post("/students/bulk", headers=admin, json=rows)
+        me = login(client, "T0000", "secret")
+        counts = []
+        for bind in [engine, *shard_engines]:
+            with bind.connect() as conn:
+                counts.append(conn.execute(select(func.count()).select_from(Student)).scalar())
+        print(json.dumps({
+            "sharded": SHARDING_ENABLED,
+            "counts": counts,
+            "home": shard_for_student_id("T0000"),
+            "participation": client.get("/participations/me", headers=me).json(),
+            "final_grade": client.get("/analytics/final-grade/me", headers=me).json(),
+            "by_student_id": client.get("/students/T0005", headers=admin).json(),
+            "listed": [s["student_id"] for s in client.get("/students/?limit=100", headers=admin).json()],
+            "search": [s["student_id"] for s in client.get("/students/search?q=olivia", headers=admin).json()],
+            "expected": {"participation_score": rows[0]["participation_score"], "final_score": rows[0]["final_score"]},
+        }))
+        """,
+        DATABASE_SHARD_URLS=SHARDS,
+    )
+    assert result["sharded"]
+    primary, *shards = result["counts"]
+    assert primary == 0 and all(shards) and sum(shards) == 40
+    # regression: /me handlers used to look the student up on the (empty) primary
+    assert result["participation"]["participation_score"] == result["expected"]["participation_score"]
+    assert result["final_grade"]["final_score"] == result["expected"]["final_score"]
+    assert result["by_student_id"]["student_id"] == "T0005"
+    assert sorted(result["listed"]) == [f"T{i:04d}" for i in range(40)]
+    assert result["search"] and all(int(sid[1:]) % 5 == 1 for sid in result["search"])
+
+
+def test_shard_id_ranges_and_merged_analytics_match_unsharded():
+    script = """
+        client.post("/students/bulk", headers=admin, json=make_students(60))
+        ids = [s["id"] for s in client.get("/students/?limit=100", headers=admin).json()]
+        corr = client.get("/analytics/activity-correlation/final-score", headers=admin).json()
+        study = client.get("/analytics/study-duration", headers=admin).json()
+        trend = client.get("/analytics/activity-trend?exact=true", headers=admin).json()
+        low = client.get("/analytics/low-activity?exact=true", headers=admin).json()
+        print(json.dumps({
+            "ids": ids,
+            "pearson": {m["metric"]: round(m["pearson_r"], 9) for m in corr["metrics"]},
+            "study": study,
+            "median_delta": trend["median_delta"],
+            "low": sorted(s["student_id"] for s in low["low_students"]),
+        }))
+    """
+    unsharded = run_app(script)
+    sharded = run_app(script, DATABASE_SHARD_URLS=SHARDS, DB_SHARD_ID_RANGE="1000")
+    # each shard hands out ids from its own range -> unique across shards
+    assert len(set(sharded["ids"])) == 60
+    assert {i // 1000 for i in sharded["ids"]} == {0, 1}
+    assert sharded["ids"] == sorted(sharded["ids"])
+    for key in ("pearson", "median_delta", "low"):
+        assert sharded[key] == unsharded[key], key
+    assert _rounded(sharded["study"]) == _rounded(unsharded["study"])
+
+
+def _rounded(obj):
+    if isinstance(obj, dict):
+        return {k: _rounded(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_rounded(v) for v in obj]
+    return round(obj, 6) if isinstance(obj, float) else obj
+
+
+def test_sharded_writes_and_paging():
+    result = run_app(
+        """
+        from database import shard_for_student_id
+
+        client.post("/students/bulk", headers=admin, json=make_students(30))
+        updated = client.post("/students/bulk?mode=update", headers=admin, json=[
+            {"student_id": f"T{i:04d}", "department": "Moved"} for i in range(0, 30, 3)
+        ]).json()
+        client.post("/students/T0004/password", headers=admin, json={"password": "pw"})
+        me = client.get("/auth/me", headers=login(client, "T0004", "pw")).json()
+
+        pages, cursor = [], None
+        while True:
+            r = client.get("/students/", params={"limit": 7, **({"cursor": cursor} if cursor else {})}, headers=admin)
+            pages.append([s["student_id"] for s in r.json()])
+            cursor = r.headers.get("x-next-cursor")
+            if not cursor:
+                break
+        bad = client.get("/participations/bad?limit=4", headers=admin).json()
+        bad_rest = client.get(f"/participations/bad?cursor={bad['next_cursor']}", headers=admin).json()
+        bad_all = client.get("/participations/bad", headers=admin).json()
+        print(json.dumps({
+            "updated": updated["updated"],
+            "moved": client.get("/analytics/study-duration/Moved", headers=admin).json()["student_count"],
+            "me": me["student_id"],
+            "pages": pages,
+            "homes": sorted({shard_for_student_id(f"T{i:04d}") for i in range(30)}),
+            "bad": [s["student_id"] for s in bad["students"] + bad_rest["students"]],
+            "bad_all": [s["student_id"] for s in bad_all["students"]],
+        }))
+        """,
+        DATABASE_SHARD_URLS=SHARDS,
+    )
+    assert result["homes"] == [0, 1]
+    assert result["updated"] == 10 and result["moved"] == 10
+    assert result["me"] == "T0004"
+    flat = [sid for page in result["pages"] for sid in page]
+    assert sorted(flat) == [f"T{i:04d}" for i in range(30)] and len(flat) == 30
+    assert result["bad"] == result["bad_all"]
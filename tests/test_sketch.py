@@ -0,0 +1,57 @@
+# tests/test_sketch.py
+import json
+
+import numpy as np
+
+from modules.items.services.sketch import KLLSketch
+
+QS = [0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99]
+
+
+def _rank(sorted_values, value):
+    return np.searchsorted(sorted_values, value, side="right") / len(sorted_values)
+
+
+def test_quantiles_stay_within_the_rank_error_bound():
+    rng = np.random.default_rng(11)
+    values = rng.lognormal(3, 1, 200_000)
+    sketch = KLLSketch(k=200, seed=1)
+    for chunk in np.array_split(values, 50):
+        sketch.update(chunk)
+    assert sketch.n == values.size
+    assert sum(len(items) for items in sketch.levels) < 5000
+
+    eps = sketch.rank_error()
+    assert 0 < eps < 0.02
+    ordered = np.sort(values)
+    for q, estimate in zip(QS, sketch.quantiles(QS)):
+        assert abs(_rank(ordered, estimate) - q) <= eps
+
+
+def test_merge_serialization_and_exact_small_sketches():
+    rng = np.random.default_rng(12)
+    a_values, b_values = rng.normal(0, 1, 30_000), rng.normal(2, 1, 30_000)
+    merged = KLLSketch(seed=2).update(a_values).merge(KLLSketch(seed=3).update(b_values))
+    ordered = np.sort(np.concatenate([a_values, b_values]))
+    assert merged.n == ordered.size
+    for q, estimate in zip(QS, merged.quantiles(QS)):
+        assert abs(_rank(ordered, estimate) - q) <= merged.rank_error()
+
+    restored = KLLSketch.from_dict(json.loads(json.dumps(merged.to_dict())))
+    assert restored.quantiles(QS) == merged.quantiles(QS)
+
+    small = KLLSketch().update([5.0, np.nan, 1.0, 3.0])
+    assert small.n == 3 and small.rank_error() == 0.0
+    assert small.quantiles([0.0, 0.25, 1.0]) == [1.0, 2.0, 5.0]
+    assert KLLSketch().quantile(0.5) is None
+
+
+def test_low_activity_sketch_thresholds_match_exact_ones_on_small_data(client, admin_headers, students):
+    sketch = client.get("/analytics/low-activity?fresh=true", headers=admin_headers).json()
+    exact = client.get("/analytics/low-activity?exact=true&fresh=true", headers=admin_headers).json()
+    assert sketch["threshold_mode"] == "sketch" and exact["threshold_mode"] == "exact"
+    # below k values per metric the sketch has not compacted yet -> exact
+    assert sketch["thresholds_25th_percentile"] == exact["thresholds_25th_percentile"]
+    assert sketch["low_students"] == exact["low_students"]
+    counts = [s["low_metric_count"] for s in exact["low_students"]]
+    assert counts == sorted(counts, reverse=True) and min(counts) >= 2
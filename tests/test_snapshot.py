@@ -0,0 +1,28 @@
+# tests/test_snapshot.py
+import numpy as np
+
+
+def test_snapshot_is_shared_until_the_data_changes(client, admin_headers, students):
+    from database import SessionLocal
+    from modules.items.services.snapshot import get_student_snapshot
+
+    with SessionLocal() as db:
+        snapshot = get_student_snapshot(db)
+        assert get_student_snapshot(db) is snapshot
+        assert snapshot.size >= len(students)
+        assert np.all(np.diff(snapshot.ids) > 0)
+
+        i = list(snapshot.student_ids).index("T0000")
+        # participation_score NULL -> NaN, masked out; Yes/No -> 1/0
+        assert not snapshot.present["participation_score"][i]
+        assert snapshot.value("participation_score", i) is None
+        assert snapshot.values["extracurricular_activities"][i] == 0.0
+        assert snapshot.value("final_score", i) == students[0]["final_score"]
+        assert snapshot.name(i) == "Liam Lee"
+
+        r = client.post("/students/", headers=admin_headers, json={"student_id": "SNAP1", "final_score": 12.5})
+        assert r.status_code == 200
+        rebuilt = get_student_snapshot(db)
+        assert rebuilt is not snapshot
+        assert rebuilt.size == snapshot.size + 1
+        assert rebuilt.student_ids[-1] == "SNAP1"
@@ -0,0 +1,37 @@
+# tests/test_stats.py
+import numpy as np
+import pytest
+
+from modules.items.services import stats
+
+
+def test_quantiles_match_numpy_percentile_and_drop_nan():
+    rng = np.random.default_rng(3)
+    values = rng.normal(50, 20, 1001)
+    values[::7] = np.nan
+    qs = [0.0, 0.1, 0.25, 0.5, 0.9, 1.0]
+    expected = np.nanpercentile(values, [q * 100 for q in qs])
+    assert stats.quantiles(values, qs) == pytest.approx(expected.tolist())
+    assert stats.percentile([], 0.5) is None
+    mask = np.arange(values.size) < 100
+    assert stats.mean(values, mask) == pytest.approx(np.nanmean(values[:100]))
+
+
+def test_pearson_and_pairwise_complete_correlation():
+    rng = np.random.default_rng(5)
+    y = rng.uniform(0, 100, 500)
+    x1 = y * 0.5 + rng.normal(0, 10, 500)
+    x2 = rng.uniform(0, 1, 500)
+    x1[:40] = np.nan
+    y_missing = y.copy()
+    y_missing[450:] = np.nan
+
+    result = stats.correlation_with(y_missing, {"x1": x1, "x2": x2})
+    keep = ~np.isnan(x1) & ~np.isnan(y_missing)
+    assert result["x1"]["count"] == int(keep.sum())
+    assert result["x1"]["pearson_r"] == pytest.approx(np.corrcoef(x1[keep], y[keep])[0, 1])
+    assert result["x1"]["mean_x"] == pytest.approx(x1[keep].mean())
+    assert result["x2"]["pearson_r"] == pytest.approx(stats.pearson(x2[:450], y[:450]))
+
+    assert stats.pearson([1, 2, 3], [5, 5, 5]) is None
+    assert stats.correlation_with(np.array([1.0]), {"x": np.array([2.0])})["x"]["pearson_r"] is None
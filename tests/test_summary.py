@@ -0,0 +1,49 @@
+# tests/test_summary.py
+import numpy as np
+import pytest
+
+from helpers import make_students
+
+
+def _assert_same(stored, recomputed):
+    assert set(stored) == set(recomputed)
+    for pair, moments in recomputed.items():
+        for field in moments.__slots__:
+            assert getattr(stored[pair], field) == pytest.approx(getattr(moments, field)), (pair, field)
+
+
+def test_stored_sums_follow_every_write_path(client, admin_headers, students):
+    from database import SessionLocal
+    from modules.items.services.summary import compute_moments, get_summary
+
+    with SessionLocal() as db:
+        get_summary(db)  # stored before the writes, so they must update it incrementally
+    client.post("/students/", headers=admin_headers, json={"student_id": "SUM1", "midterm_score": 40, "final_score": 60})
+    changed = make_students(6, prefix="SUM")
+    changed[2]["final_score"] = None
+    client.post("/students/bulk", headers=admin_headers, json=changed)
+    client.post("/students/bulk?mode=update", headers=admin_headers, json=[
+        {"student_id": "SUM1", "final_score": 75, "extracurricular_activities": "Yes"},
+        {"student_id": "T0005", "quizzes_avg": None},
+    ])
+
+    with SessionLocal() as db:
+        _assert_same(get_summary(db), compute_moments(db))
+
+
+def test_moments_pearson_and_merge():
+    from modules.items.services.summary import Moments
+
+    a, b = Moments(), Moments()
+    for x, y in [(1, 2), (2, 4.1), (3, 5.9)]:
+        a.add(x, y)
+    b.add(4, 8)
+    merged = a.merge(b)
+    assert merged.n == 4 and merged.mean_x() == 2.5
+    assert merged.pearson() == pytest.approx(np.corrcoef([1, 2, 3, 4], [2, 4.1, 5.9, 8])[0, 1])
+    merged.add(4, 8, sign=-1)
+    assert merged.pearson() == pytest.approx(a.pearson())
+    constant = Moments()
+    for _ in range(3):
+        constant.add(5.0, 1.0)
+    assert constant.pearson() is None
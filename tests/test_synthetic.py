@@ -0,0 +1,57 @@
+# tests/test_synthetic.py
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks import synthetic
+
+KAGGLE_CSV = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), synthetic.KAGGLE_CSV)
+
+
+@pytest.fixture(scope="module")
+def model():
+    return synthetic.fit(KAGGLE_CSV)
+
+
+def test_generation_is_chunked_and_reproducible(model):
+    chunks = list(synthetic.generate(model, 12_000, chunk_size=5000, seed=1))
+    assert [len(c) for c in chunks] == [5000, 5000, 2000]
+    again = pd.concat(synthetic.generate(model, 12_000, chunk_size=5000, seed=1), ignore_index=True)
+    df = pd.concat(chunks, ignore_index=True)
+    pd.testing.assert_frame_equal(df, again)
+    assert list(df.columns) == model.columns
+    assert df["Student_ID"].is_unique and df["Student_ID"].iloc[0] == "S1000"
+
+
+def test_synthetic_rows_keep_the_source_shape(model):
+    source = pd.read_csv(KAGGLE_CSV, dtype={"Student_ID": str})
+    df = pd.concat(synthetic.generate(model, 20_000, seed=2), ignore_index=True)
+
+    # derived columns are recomputed, not sampled
+    assert "Total_Score" in {column.name for column in model.linear}
+    total = next(column for column in model.linear if column.name == "Total_Score")
+    expected = np.round(df[total.inputs].to_numpy(dtype=float) @ total.coefficients + total.intercept, total.decimals)
+    assert np.allclose(df["Total_Score"].dropna(), expected[df["Total_Score"].notna()])
+    assert {band.name for band in model.banded} == {"Grade"}
+    assert set(df["Grade"].dropna()) <= set(source["Grade"].dropna())
+
+    for name, marginal in model.marginals.items():
+        assert abs(df[name].isna().mean() - marginal.missing_rate) < 0.02, name
+        if marginal.numeric:
+            assert df[name].min() >= marginal.values[0] and df[name].max() <= marginal.values[-1]
+            assert abs(df[name].median() - source[name].median()) <= 0.05 * (marginal.values[-1] - marginal.values[0])
+
+    numeric = [name for name in model.copula_columns if model.marginals[name].numeric]
+    gap = df[numeric].corr(method="spearman") - source[numeric].corr(method="spearman")
+    assert np.nanmax(np.abs(gap.to_numpy())) < 0.05
+
+
+def test_synthetic_chunks_go_through_the_importer(model):
+    import import_students
+
+    chunk = next(synthetic.generate(model, 50, seed=3))
+    rows = import_students._chunk_to_rows(chunk)
+    assert len(rows) == 50
+    assert all(row["participation_category"] is not None or row["participation_score"] is None for row in rows)
@@ -0,0 +1,62 @@
+# tests/test_system.py
+from conftest import run_app
+
+
+def test_summary_rebuild_invalidates_cached_reports_and_responses():
+    result = run_app(
+        """
+        from database import SessionLocal
+        from modules.items.models import Student
+
+        client.post("/students/bulk", headers=admin, json=make_students(40))
+        path = "/analytics/activity-correlation/final-score"
+        before = client.get(path, headers=admin)
+
+        # out-of-band write: no summary update, no data version bump
+        with SessionLocal() as db:
+            db.query(Student).update({Student.final_score: 100 - Student.final_score}, synchronize_session=False)
+            db.commit()
+        stale = client.get(path, headers=admin).json()
+
+        client.post("/system/analytics-summary/rebuild", headers=admin)
+        after = client.get(
+            path, headers={**admin, "If-None-Match": before.headers["etag"]},
+        )
+        quiz_r = lambda body: body["metrics"][0]["pearson_r"]
+        print(json.dumps({
+            "before": quiz_r(before.json()),
+            "stale": quiz_r(stale),
+            "after_status": after.status_code,
+            "after": quiz_r(after.json()),
+            "versions": [before.json()["data_version"], after.json()["data_version"]],
+        }))
+        """,
+    )
+    assert result["stale"] == result["before"]
+    assert result["after_status"] == 200
+    assert abs(result["after"] + result["before"]) < 1e-9
+    assert result["versions"][1] > result["versions"][0]
+
+
+def test_search_index_rebuild_expires_cached_name_matches():
+    result = run_app(
+        """
+        from database import SessionLocal
+        from modules.items.models import Student
+
+        zelda = {"department": "CS", "study_hours_per_week": 10, "first_name": "Zelda"}
+        client.post("/students/", headers=admin, json={**zelda, "student_id": "Z0", "last_name": "Api"})
+        path = "/analytics/study-duration/CS/zelda"
+        matched = lambda: [s["student_id"] for s in client.get(path, headers=admin).json()["students"]]
+        before = matched()
+        # out-of-band insert: no trigram rows, no data version bump
+        with SessionLocal() as db:
+            db.add(Student(**zelda, student_id="Z1", last_name="Quokka"))
+            db.commit()
+        stale = matched()
+        client.post("/system/search-index/rebuild", headers=admin)
+        print(json.dumps({"before": before, "stale": stale, "after": matched()}))
+        """,
+    )
+    assert result["before"] == result["stale"] == ["Z0"]
+    assert sorted(result["after"]) == ["Z0", "Z1"]
@@ -0,0 +1,78 @@
+# tests/test_trend.py
+import numpy as np
+import pytest
+
+
+def _deltas():
+    from database import SessionLocal
+    from modules.items.models import Student
+
+    with SessionLocal() as db:
+        rows = db.query(Student.id, Student.student_id, Student.midterm_score, Student.final_score).all()
+    return [(r.final_score - r.midterm_score, r.id, r.student_id) for r in rows if None not in (r.midterm_score, r.final_score)]
+
+
+def test_activity_trend_top_n_matches_a_full_sort(client, admin_headers, students):
+    deltas = _deltas()
+    improving = sorted((d for d in deltas if d[0] > 0), key=lambda d: (-d[0], d[1]))
+    declining = sorted((d for d in deltas if d[0] < 0), key=lambda d: (d[0], d[1]))
+    values = np.array([d[0] for d in deltas])
+
+    for exact in ("false", "true"):
+        body = client.get(f"/analytics/activity-trend?top_n=4&exact={exact}", headers=admin_headers).json()
+        assert [s["student_id"] for s in body["top_improving"]] == [d[2] for d in improving[:4]]
+        assert [s["student_id"] for s in body["top_declining"]] == [d[2] for d in declining[:4]]
+        assert (body["count"], body["improving_count"], body["declining_count"]) == (
+            len(deltas), len(improving), len(declining),
+        )
+        assert body["mean_delta"] == pytest.approx(values.mean())
+        assert body["median_delta"] == pytest.approx(np.median(values))
+
+    assert client.get("/analytics/activity-trend?top_n=0", headers=admin_headers).json()["top_improving"] == []
+    student = client.get("/analytics/activity-trend/T0001", headers=admin_headers).json()
+    assert student["delta_score"] == pytest.approx(student["final_score"] - student["midterm_score"])
+
+
+def test_trend_counts_come_from_the_summary_and_top_n_from_the_index(client, admin_headers, students):
+    from sqlalchemy import event
+
+    from database import engine
+
+    client.get("/analytics/activity-trend?top_n=2", headers=admin_headers)  # summary/sketches built
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if "FROM students" in statement:
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        client.get("/analytics/activity-trend?top_n=3", headers=admin_headers)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    # only the two top-N reads touch students, and both stop at LIMIT
+    assert len(statements) == 2 and all("LIMIT" in s for s, _ in statements)
+
+    with engine.connect() as conn:
+        for statement, parameters in statements:
+            plan = " ".join(row[-1] for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters))
+            assert "ix_students_score_delta" in plan, plan
+
+
+def test_migration_adds_the_generated_delta_column(tmp_path):
+    from sqlalchemy import create_engine, text
+
+    from modules.items.migrations import _ensure_score_delta
+
+    legacy = create_engine(f"sqlite:///{tmp_path}/legacy.db")
+    with legacy.begin() as conn:
+        conn.execute(text("CREATE TABLE students (id INTEGER PRIMARY KEY, midterm_score FLOAT, final_score FLOAT)"))
+        conn.execute(text("INSERT INTO students VALUES (1, 60, 75), (2, 80, NULL)"))
+    _ensure_score_delta(legacy)
+    _ensure_score_delta(legacy)
+    with legacy.begin() as conn:
+        conn.execute(text("UPDATE students SET final_score = 70 WHERE id = 2"))
+        rows = conn.execute(text("SELECT score_delta FROM students ORDER BY id")).scalars().all()
+        indexes = [row[1] for row in conn.execute(text("PRAGMA index_list(students)"))]
+    assert rows == [15.0, -10.0]
+    assert "ix_students_score_delta" in indexes